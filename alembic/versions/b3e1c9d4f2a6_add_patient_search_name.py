@@ -0,0 +1,122 @@
+"""add patient search_name and search indexes
+
+Revision ID: b3e1c9d4f2a6
+Revises: a7d4e2f9c1b3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b3e1c9d4f2a6"
+down_revision = "a7d4e2f9c1b3"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 5000
+
+
+def _search_name(apellidos: str, nombres: str) -> str:
+    # Frozen copy of app.crud.patients.search_name_for.
+    decomposed = unicodedata.normalize("NFKD", f"{apellidos} {nombres}")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())[:255]
+
+
+def _backfill(conn) -> None:
+    patients = sa.table(
+        "patients",
+        sa.column("id", sa.UUID()),
+        sa.column("apellidos", sa.String()),
+        sa.column("nombres", sa.String()),
+        sa.column("search_name", sa.String()),
+    )
+    rows = conn.execute(sa.select(patients.c.id, patients.c.apellidos, patients.c.nombres)).all()
+    update = (
+        sa.update(patients)
+        .where(patients.c.id == sa.bindparam("patient_id"))
+        .values(search_name=sa.bindparam("value"))
+    )
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(
+            update,
+            [
+                {"patient_id": row.id, "value": _search_name(row.apellidos, row.nombres)}
+                for row in rows[start : start + BATCH_SIZE]
+            ],
+        )
+
+
+# C collation lets both LIKE 'prefix%' and ORDER BY use the index under any
+# database locale; crud.patients.search_async queries with COLLATE "C".
+PREFIX_INDEXES = [
+    ("ix_patients_search_name_prefix", 'search_name COLLATE "C", id'),
+    ("ix_patients_cedula_prefix", 'cedula COLLATE "C"'),
+]
+TRIGRAM_INDEX = "ix_patients_search_name_trgm"
+
+
+def _drop_if_invalid(conn, name: str) -> None:
+    # A cancelled CREATE INDEX CONCURRENTLY leaves an INVALID index behind,
+    # which IF NOT EXISTS would then silently accept.
+    invalid = conn.execute(
+        sa.text(
+            "select 1 from pg_index i join pg_class c on c.oid = i.indexrelid "
+            "where c.relname = :name and not i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+def _ensure_trigram(conn) -> bool:
+    """True once pg_trgm is installed; the trigram search tier is optional."""
+    installed = conn.execute(sa.text("select exists(select 1 from pg_extension where extname = 'pg_trgm')")).scalar()
+    if installed:
+        return True
+    available = conn.execute(
+        sa.text("select exists(select 1 from pg_available_extensions where name = 'pg_trgm')")
+    ).scalar()
+    if not available:
+        print("pg_trgm is not available; skipping the trigram search index")
+        return False
+    try:
+        conn.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except sa.exc.DBAPIError as exc:
+        # Managed databases often reserve CREATE EXTENSION for an admin role.
+        print(f"Could not create pg_trgm ({exc.orig}); skipping the trigram search index")
+        return False
+    return True
+
+
+def upgrade() -> None:
+    op.add_column(
+        "patients",
+        sa.Column("search_name", sa.String(length=255), server_default="", nullable=False),
+    )
+    _backfill(op.get_bind())
+    # CONCURRENTLY cannot run inside a transaction; the autocommit block keeps
+    # writes to patients flowing while the indexes build. Outside a
+    # transaction a failed CREATE EXTENSION does not abort the migration.
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        for name, columns in PREFIX_INDEXES:
+            _drop_if_invalid(conn, name)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON patients ({columns})")
+        if _ensure_trigram(conn):
+            _drop_if_invalid(conn, TRIGRAM_INDEX)
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {TRIGRAM_INDEX} ON patients USING gin (search_name gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in [TRIGRAM_INDEX, *(name for name, _ in reversed(PREFIX_INDEXES))]:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    op.drop_column("patients", "search_name")
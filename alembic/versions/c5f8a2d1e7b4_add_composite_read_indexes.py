@@ -0,0 +1,58 @@
+"""add composite and partial indexes for hot read paths
+
+Revision ID: c5f8a2d1e7b4
+Revises: b3e1c9d4f2a6
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c5f8a2d1e7b4"
+down_revision = "b3e1c9d4f2a6"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    (
+        "ix_consultations_patient_created",
+        "consultations",
+        [sa.text("patient_id"), sa.text("created_at DESC"), sa.text("id DESC")],
+        {},
+    ),
+    ("ix_medications_consultation_sort", "medications", ["consultation_id", "sort_order", "created_at"], {}),
+    ("ix_consulta_labs_consulta_creado", "consulta_labs", ["consulta_id", "creado_en"], {}),
+    ("ix_catalogo_labs_activo_orden", "catalogo_labs", ["orden", "nombre"], {"postgresql_where": sa.text("activo")}),
+]
+
+
+def _drop_if_invalid(conn, name: str) -> None:
+    # A cancelled CREATE INDEX CONCURRENTLY leaves an INVALID index behind,
+    # which IF NOT EXISTS would then silently accept.
+    invalid = conn.execute(
+        sa.text(
+            "select 1 from pg_index i join pg_class c on c.oid = i.indexrelid "
+            "where c.relname = :name and not i.indisvalid"
+        ),
+        {"name": name},
+    ).scalar()
+    if invalid:
+        op.drop_index(name, postgresql_concurrently=True, if_exists=True)
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction; the autocommit block keeps
+    # writes to these tables flowing while the indexes build.
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        for name, table, columns, kwargs in INDEXES:
+            _drop_if_invalid(conn, name)
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kwargs)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,44 @@
+"""add patient_summary
+
+Revision ID: d9b4e6a3c8f1
+Revises: c5f8a2d1e7b4
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d9b4e6a3c8f1"
+down_revision = "c5f8a2d1e7b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "patient_summary",
+        sa.Column("patient_id", sa.UUID(), nullable=False),
+        sa.Column("latest_consultation_id", sa.UUID(), nullable=True),
+        sa.Column("latest_consultation_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("consultation_count", sa.Integer(), server_default=sa.text("0"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["patient_id"], ["patients.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["latest_consultation_id"], ["consultations.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("patient_id"),
+    )
+    op.execute(
+        """
+        insert into patient_summary
+            (patient_id, latest_consultation_id, latest_consultation_at, consultation_count, updated_at)
+        select distinct on (patient_id)
+            patient_id, id, created_at, count(*) over (partition by patient_id), now()
+        from consultations
+        order by patient_id, created_at desc, id desc
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("patient_summary")
@@ -0,0 +1,42 @@
+"""add consultations.version and updated_at
+
+Revision ID: e1a7c3f5b9d2
+Revises: d9b4e6a3c8f1
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e1a7c3f5b9d2"
+down_revision = "d9b4e6a3c8f1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "consultations",
+        sa.Column("version", sa.Integer(), server_default=sa.text("1"), nullable=False),
+    )
+    op.add_column(
+        "consultations",
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    # Best known last change for existing rows; writes keep it current from here on.
+    op.execute(
+        """
+        update consultations c set updated_at = greatest(
+            c.created_at,
+            (select max(m.updated_at) from medications m where m.consultation_id = c.id),
+            (select max(l.creado_en) from consulta_labs l where l.consulta_id = c.id)
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("consultations", "updated_at")
+    op.drop_column("consultations", "version")
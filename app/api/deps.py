@@ -1,14 +1,30 @@
-from fastapi import Depends, HTTPException, status
+import hashlib
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable
+
+from fastapi import Depends, HTTPException, Query, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.pagination import Page, clamp_limit
 from app.core.security import ALGORITHM
-from app.core.database import SessionLocal
+from app.core.serialization import render
+from app.core.database import AsyncSessionLocal, SessionLocal, replica_configured
 from app.models.user import User
 from app.models.patient import Patient
 
+logger = logging.getLogger(__name__)
+
 security = HTTPBearer(
     auto_error=False,
     description="Enter the token without the Bearer prefix",
@@ -23,59 +39,258 @@ def get_db():
         db.close()
 
 
+async def get_async_db() -> AsyncSession:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def _get_token(credentials: HTTPAuthorizationCredentials | None) -> str:
     if credentials is None or not credentials.credentials:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     return credentials.credentials
 
 
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl=settings.TOKEN_CACHE_MAX_TTL_SECONDS,
+)
+
+
+@lru_cache(maxsize=4)
+def _secret_fingerprint(secret_key: str) -> bytes:
+    return hashlib.sha256(secret_key.encode("utf-8")).digest()
+
+
+def decode_token(token: str) -> dict:
+    cache_key = hashlib.sha256(_secret_fingerprint(settings.SECRET_KEY) + token.encode("utf-8")).digest()
+    payload = token_cache.get(cache_key)
+    if payload is not None:
+        return payload
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(cache_key, payload, ttl=exp - time.time())
+    return payload
+
+
 def get_current_token(credentials: HTTPAuthorizationCredentials | None = Depends(security)) -> dict:
     token = _get_token(credentials)
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return decode_token(token)
     except JWTError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 
 class AuthUser:
-    def __init__(self, user_id, username: str, role: str, activo: bool) -> None:
+    def __init__(self, user_id, username: str, role: str, activo: bool, patient_id=None) -> None:
         self.id = user_id
         self.username = username
         self.role = role
         self.activo = activo
+        self.patient_id = patient_id
 
 
-def get_current_user(
-    db: Session = Depends(get_db),
-    credentials: HTTPAuthorizationCredentials | None = Depends(security),
-) -> User | AuthUser:
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+# Invalidated principals are reloaded from the primary until the replica has
+# caught up with the change that invalidated them (see _read_from_replica).
+def invalidate_principal(*subs) -> None:
+    for sub in subs:
+        if sub is not None:
+            principal_cache.discard(str(sub))
+            mark_recent_write(sub)
+
+
+def invalidate_principal_username(username: str | None) -> None:
+    if username:
+        for sub in principal_cache.discard_where(lambda principal: principal.username == username):
+            mark_recent_write(sub)
+
+
+def resolve_patient_id(db: Session, cedula: str):
+    return db.query(Patient.id).filter(Patient.cedula == cedula).scalar()
+
+
+def _patient_id_claim(payload: dict) -> uuid.UUID | None:
+    value = payload.get("patient_id")
+    if not value:
+        return None
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _load_principal(db: Session, user_id: str, role: str, patient_id=None) -> AuthUser | None:
+    user = db.query(User).filter(User.id == user_id).first()
+    if user:
+        if (user.role or "").strip().lower() == "patient" and patient_id is None:
+            patient_id = resolve_patient_id(db, user.username)
+        return AuthUser(user.id, user.username, user.role, bool(user.activo), patient_id)
+    if role != "PATIENT":
+        return None
+    patient = db.query(Patient).filter(Patient.id == user_id).first()
+    if not patient:
+        return None
+    return AuthUser(patient.id, patient.cedula, "patient", bool(patient.activo), patient.id)
+
+
+async def resolve_patient_id_async(db: AsyncSession, cedula: str):
+    return await db.scalar(select(Patient.id).where(Patient.cedula == cedula))
+
+
+async def _load_principal_async(db: AsyncSession, user_id: str, role: str, patient_id=None) -> AuthUser | None:
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if user:
+        if (user.role or "").strip().lower() == "patient" and patient_id is None:
+            patient_id = await resolve_patient_id_async(db, user.username)
+        return AuthUser(user.id, user.username, user.role, bool(user.activo), patient_id)
+    if role != "PATIENT":
+        return None
+    patient = await db.scalar(select(Patient).where(Patient.id == user_id))
+    if not patient:
+        return None
+    return AuthUser(patient.id, patient.cedula, "patient", bool(patient.activo), patient.id)
+
+
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Principals that issued a write recently read from the primary until the
+# replica has had time to catch up (read-your-writes).
+recent_writers = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.DB_REPLICA_STICKY_SECONDS,
+)
+_read_routing = {"replica": 0, "primary": 0, "pinned": 0}
+
+
+def mark_recent_write(principal_id) -> None:
+    recent_writers.set(str(principal_id), True)
+
+
+def reads_pinned_to_primary(principal_id) -> bool:
+    return recent_writers.get(str(principal_id)) is not None
+
+
+def _read_from_replica(principal_id) -> bool:
+    return replica_configured() and not reads_pinned_to_primary(principal_id)
+
+
+def read_routing_stats() -> dict:
+    return {"replica_configured": replica_configured(), **_read_routing}
+
+
+def _token_principal_key(credentials: HTTPAuthorizationCredentials | None) -> tuple[str, str, uuid.UUID | None]:
     payload = get_current_token(credentials)
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-
     role = (payload.get("role") or "").strip().upper()
-    if role == "PATIENT":
-        user = db.query(User).filter(User.id == user_id).first()
-        if user:
-            if not user.activo:
-                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
-            return user
-
-        patient = db.query(Patient).filter(Patient.id == user_id).first()
-        if not patient:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-        if not patient.activo:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
-        return AuthUser(patient.id, patient.cedula, "patient", bool(patient.activo))
+    return str(user_id), role, _patient_id_claim(payload)
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+
+def _cache_principal(user_id: str, principal: AuthUser | None) -> AuthUser:
+    if principal is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    if not user.activo:
+    principal_cache.set(user_id, principal)
+    return principal
+
+
+def _admit(request: Request, principal: AuthUser) -> AuthUser:
+    if not principal.activo:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
-    return user
+    if request.method not in SAFE_METHODS:
+        mark_recent_write(principal.id)
+    return principal
+
+
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+) -> AuthUser:
+    user_id, role, patient_id = _token_principal_key(credentials)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        principal = _cache_principal(user_id, _load_principal(db, user_id, role, patient_id))
+    return _admit(request, principal)
+
+
+async def get_current_user_async(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+) -> AuthUser:
+    """get_current_user for async routes: a cache miss is loaded without leaving the event loop.
+
+    The lookup takes the same replica-or-primary route as the request's reads.
+    """
+    user_id, role, patient_id = _token_principal_key(credentials)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        async with AsyncSessionLocal(replica=_read_from_replica(user_id)) as db:
+            principal = _cache_principal(user_id, await _load_principal_async(db, user_id, role, patient_id))
+    return _admit(request, principal)
+
+
+async def get_read_db(current_user: AuthUser = Depends(get_current_user_async)) -> AsyncSession:
+    use_replica = _read_from_replica(current_user.id)
+    if not use_replica and replica_configured():
+        _read_routing["pinned"] += 1
+    _read_routing["replica" if use_replica else "primary"] += 1
+    async with AsyncSessionLocal(replica=use_replica) as db:
+        yield db
+
+
+@dataclass
+class PageParams:
+    cursor: str | None
+    limit: int
+    legacy: bool
+    request: Request
+    response: Response
+
+    def respond(self, page: Page, serialize: Callable[[Any], Any] | None = None):
+        items = page.items if serialize is None else [serialize(item) for item in page.items]
+        if self.legacy:
+            if page.next_cursor:
+                # The bare list used to be unbounded; make the cut visible.
+                logger.warning(
+                    "Legacy list %s truncated to %d items; client should page with ?limit=",
+                    self.request.url.path,
+                    self.limit,
+                )
+                self.response.headers["X-Next-Cursor"] = page.next_cursor
+                self.response.headers["Deprecation"] = "true"
+                self.response.headers["Warning"] = (
+                    f'299 - "Truncated to {self.limit} items; page with limit and cursor"'
+                )
+            return items
+        return {"items": items, "next_cursor": page.next_cursor}
+
+    def render(self, page: Page, model: type[BaseModel], headers: dict | None = None) -> Response:
+        """respond() through the single-pass encoder; rows are validated into ``model`` once."""
+        body = self.respond(page, model.model_validate)
+        # A returned Response bypasses the injected one, so carry its headers over.
+        return render(self.request, body, headers={**self.response.headers, **(headers or {})})
+
+
+def get_page_params(
+    request: Request,
+    response: Response,
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    limit: int | None = Query(None, ge=1, description=f"Page size, at most {settings.PAGINATION_MAX_LIMIT}"),
+) -> PageParams:
+    # Compatibility mode: callers that send neither parameter keep getting a
+    # bare list, bounded by PAGINATION_LEGACY_LIMIT. When the list is cut
+    # short the response carries X-Next-Cursor, Deprecation and Warning
+    # headers, and the cut is logged.
+    if cursor is None and limit is None:
+        return PageParams(cursor=None, limit=settings.PAGINATION_LEGACY_LIMIT, legacy=True, request=request, response=response)
+    return PageParams(cursor=cursor, limit=clamp_limit(limit), legacy=False, request=request, response=response)
 
 
 def require_admin(payload: dict = Depends(get_current_token)) -> dict:
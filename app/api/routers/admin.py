@@ -1,19 +1,33 @@
 import logging
 from datetime import date, datetime, time
-from fastapi import APIRouter, Depends, HTTPException, status
+from html import escape
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import HTMLResponse
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import (
+    PageParams,
+    get_db,
+    get_page_params,
+    get_read_db,
+    invalidate_principal,
+    invalidate_principal_username,
+)
 from app.core.config import settings
-from app.core.dependencies import require_admin
+from app.core.dependencies import require_admin_async
+from app.core.pagination import InvalidCursor
 from app.core.security import get_password_hash
+from app.core.serialization import render
 from app.crud import patients as patient_crud
 from app.crud import medications as medication_crud
 from app.crud import visits as visit_crud
 from app.crud import consultas as consulta_crud
 from app.crud import consultations as consultation_crud
+from app.crud import patient_summaries as patient_summary_crud
+from app.crud import refresh_tokens as refresh_token_crud
 from app.models.consultation import Consultation
 from app.models.consultation_medication import Medication
 from app.models.user import User
@@ -21,16 +35,19 @@ from app.schemas.patient import (
     PatientCreate,
     PatientUpdate,
     PatientOut,
+    PatientListItem,
     PatientLookupOut,
+    PatientSearchOut,
     ResetPatientPasswordRequest,
 )
 from app.schemas.medication import MedicationCreate, MedicationUpdate, MedicationOut
 from app.schemas.visit import VisitCreate, VisitOut, VisitListItem
 from app.schemas.consulta import ConsultaCreate, ConsultaOut, ConsultaSummary
 from app.schemas.consultation import ConsultationCreate, ConsultationOut
+from app.schemas.pagination import CursorPage
 from app.schemas.user import PatientUserCreate, UserOut
 
-router = APIRouter(dependencies=[Depends(require_admin)])
+router = APIRouter(dependencies=[Depends(require_admin_async)])
 logger = logging.getLogger(__name__)
 
 
@@ -47,27 +64,18 @@ def _int_to_text(value: int | None) -> str | None:
     return str(int(value))
 
 
-def _serialize_consultation(consultation: Consultation) -> dict:
+def _serialize_patient_list_item(patient) -> dict:
+    summary = patient.summary
     return {
-        "id": str(consultation.id),
-        "created_at": consultation.created_at,
-        "diagnosis": consultation.diagnosis,
-        "notes": consultation.notes,
-        "indications": consultation.indications,
-        "medications": [
-            {
-                "id": str(med.id),
-                "consultation_id": str(med.consultation_id),
-                "drug_name": med.drug_name,
-                "quantity": med.quantity,
-                "description": med.description,
-                "duration_days": med.duration_days,
-                "sort_order": med.sort_order,
-                "created_at": med.created_at,
-                "updated_at": med.updated_at,
-            }
-            for med in consultation.medications
-        ],
+        "id": str(patient.id),
+        "cedula": patient.cedula,
+        "apellidos": patient.apellidos,
+        "nombres": patient.nombres,
+        "fecha_nacimiento": patient.fecha_nacimiento,
+        "email": patient.email,
+        "activo": patient.activo,
+        "latest_consultation_at": summary.latest_consultation_at if summary else None,
+        "consultation_count": summary.consultation_count if summary else 0,
     }
 
 
@@ -90,8 +98,26 @@ def _get_patient(db: Session, cedula: str):
     return patient
 
 
-@router.get("/patients", response_model=PatientLookupOut | list[PatientOut])
-def list_patients(cedula: str | None = None, db: Session = Depends(get_db)):
+async def _get_patient_user_async(db: AsyncSession, username: str) -> User:
+    user = await db.scalar(select(User).where(User.username == username))
+    if not user or user.role.lower() != "patient":
+        raise HTTPException(status_code=404, detail="Patient not found")
+    return user
+
+
+async def _get_patient_async(db: AsyncSession, cedula: str):
+    patient = await patient_crud.get_by_cedula_async(db, cedula)
+    if not patient:
+        raise HTTPException(status_code=404, detail=f"Patient not found for cedula {cedula}")
+    return patient
+
+
+@router.get("/patients", response_model=PatientLookupOut | CursorPage[PatientListItem] | list[PatientListItem])
+def list_patients(
+    cedula: str | None = None,
+    db: Session = Depends(get_db),
+    page: PageParams = Depends(get_page_params),
+):
     try:
         if cedula:
             patient = patient_crud.get_by_cedula(db, cedula)
@@ -104,8 +130,8 @@ def list_patients(cedula: str | None = None, db: Session = Depends(get_db)):
                 apellidos=patient.apellidos,
                 fecha_nacimiento=patient.fecha_nacimiento,
             )
-        return patient_crud.list_patients(db)
-    except HTTPException:
+        return page.respond(patient_crud.list_patients(db, page.cursor, page.limit), _serialize_patient_list_item)
+    except (HTTPException, InvalidCursor):
         raise
     except Exception as exc:
         logger.exception("Failed to list patients", extra={"cedula": cedula})
@@ -122,8 +148,10 @@ def create_patient(data: PatientCreate | PatientUserCreate, db: Session = Depend
             user.password_hash = get_password_hash(data.password)
             user.role = "patient"
             user.activo = True
+            refresh_token_crud.revoke_for_user(db, user.id)
             db.commit()
             db.refresh(user)
+            invalidate_principal(user.id)
             return UserOut(id=str(user.id), username=user.username, role=user.role, activo=bool(user.activo))
 
         user = User(
@@ -152,6 +180,7 @@ def create_patient(data: PatientCreate | PatientUserCreate, db: Session = Depend
             user.password_hash = password_hash
             user.role = "patient"
             user.activo = True
+            refresh_token_crud.revoke_for_user(db, user.id)
         else:
             user = User(
                 username=username,
@@ -163,6 +192,7 @@ def create_patient(data: PatientCreate | PatientUserCreate, db: Session = Depend
 
         db.commit()
         db.refresh(patient)
+        invalidate_principal(patient.id, user.id)
         return patient
     except HTTPException:
         db.rollback()
@@ -176,6 +206,16 @@ def create_patient(data: PatientCreate | PatientUserCreate, db: Session = Depend
         raise HTTPException(status_code=500, detail="Error creating patient") from exc
 
 
+# Declared before /patients/{patient_id} so "search" is not taken as an id.
+@router.get("/patients/search", response_model=list[PatientSearchOut])
+async def search_patients(
+    q: str = Query(..., min_length=2, max_length=120),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_read_db),
+):
+    return await patient_crud.search_async(db, q, limit)
+
+
 @router.get("/patients/{patient_id}", response_model=PatientOut)
 def get_patient(patient_id: str, db: Session = Depends(get_db)):
     patient = patient_crud.get(db, patient_id)
@@ -189,20 +229,23 @@ def reset_patient_password(
     patient_id: str,
     data: ResetPatientPasswordRequest,
     db: Session = Depends(get_db),
-    current_admin=Depends(require_admin),
+    current_admin=Depends(require_admin_async),
 ):
     patient = patient_crud.get(db, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
 
+    # Outside the try: a saturated hashing pool must surface as 503, not 500.
+    new_hash = get_password_hash(data.new_password)
     try:
-        new_hash = get_password_hash(data.new_password)
         patient.password_hash = new_hash
         user = db.query(User).filter(User.username == patient.cedula).first()
         if user and user.role.lower() == "patient":
             user.password_hash = new_hash
             user.activo = True
+            refresh_token_crud.revoke_for_user(db, user.id)
         db.commit()
+        invalidate_principal(patient.id, user.id if user else None)
         return {"success": True}
     except Exception as exc:
         db.rollback()
@@ -214,7 +257,10 @@ def update_patient(patient_id: str, data: PatientUpdate, db: Session = Depends(g
     patient = patient_crud.get(db, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
-    return patient_crud.update(db, patient, data)
+    updated = patient_crud.update(db, patient, data)
+    invalidate_principal(patient.id)
+    invalidate_principal_username(patient.cedula)
+    return updated
 
 
 @router.delete("/patients/{patient_id}", response_model=PatientOut)
@@ -222,12 +268,15 @@ def delete_patient(patient_id: str, db: Session = Depends(get_db)):
     patient = patient_crud.get(db, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
-    return patient_crud.deactivate(db, patient)
+    deactivated = patient_crud.deactivate(db, patient)
+    invalidate_principal(patient.id)
+    invalidate_principal_username(patient.cedula)
+    return deactivated
 
 
-@router.get("/medications", response_model=list[MedicationOut])
-def list_medications(db: Session = Depends(get_db)):
-    return medication_crud.list_all(db)
+@router.get("/medications", response_model=CursorPage[MedicationOut] | list[MedicationOut])
+def list_medications(db: Session = Depends(get_db), page: PageParams = Depends(get_page_params)):
+    return page.respond(medication_crud.list_all(db, page.cursor, page.limit))
 
 
 @router.post("/medications", response_model=MedicationOut, status_code=status.HTTP_201_CREATED)
@@ -251,12 +300,12 @@ def delete_medication(med_id: str, db: Session = Depends(get_db)):
     return medication_crud.deactivate(db, med)
 
 
-@router.get("/patients/{patient_id}/visits", response_model=list[VisitListItem])
-def list_visits(patient_id: str, db: Session = Depends(get_db)):
+@router.get("/patients/{patient_id}/visits", response_model=CursorPage[VisitListItem] | list[VisitListItem])
+def list_visits(patient_id: str, db: Session = Depends(get_db), page: PageParams = Depends(get_page_params)):
     patient = patient_crud.get(db, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
-    return visit_crud.list_by_patient(db, patient_id)
+    return page.respond(visit_crud.list_by_patient(db, patient_id, page.cursor, page.limit))
 
 
 @router.post("/patients/{patient_id}/visits", response_model=VisitOut, status_code=status.HTTP_201_CREATED)
@@ -289,14 +338,14 @@ def create_consulta(
     patient_username: str,
     data: ConsultaCreate,
     db: Session = Depends(get_db),
-    current_user=Depends(require_admin),
+    current_user=Depends(require_admin_async),
 ):
     patient_user = _get_patient_user(db, patient_username)
     return consulta_crud.create(db, patient_user.id, current_user.id, data)
 
 
 @router.post("/consultations", response_model=ConsultationOut, status_code=status.HTTP_201_CREATED)
-def create_consultation(data: ConsultationCreate, db: Session = Depends(get_db)):
+def create_consultation(data: ConsultationCreate, request: Request, db: Session = Depends(get_db)):
     patient = patient_crud.get_by_cedula(db, data.cedula)
     if not patient:
         raise HTTPException(
@@ -348,9 +397,10 @@ def create_consultation(data: ConsultationCreate, db: Session = Depends(get_db))
             db.add(medication)
             consultation.medications.append(medication)
 
+        patient_summary_crud.record_consultation(db, consultation.id)
         db.commit()
         db.refresh(consultation)
-        return _serialize_consultation(consultation)
+        return render(request, ConsultationOut.model_validate(consultation), status_code=status.HTTP_201_CREATED)
     except HTTPException:
         db.rollback()
         raise
@@ -369,34 +419,41 @@ def create_consultation(data: ConsultationCreate, db: Session = Depends(get_db))
         raise HTTPException(status_code=500, detail=detail) from exc
 
 
-@router.get("/consultations", response_model=list[ConsultationOut])
-def list_consultations(cedula: str, db: Session = Depends(get_db)):
-    patient = _get_patient(db, cedula)
-    consultations = consultation_crud.list_by_patient(db, patient.id)
-    return [_serialize_consultation(item) for item in consultations]
+@router.get("/consultations", response_model=CursorPage[ConsultationOut] | list[ConsultationOut])
+async def list_consultations(
+    cedula: str,
+    db: AsyncSession = Depends(get_read_db),
+    page: PageParams = Depends(get_page_params),
+):
+    patient = await _get_patient_async(db, cedula)
+    consultations = await consultation_crud.list_by_patient_async(db, patient.id, page.cursor, page.limit)
+    return page.render(consultations, ConsultationOut)
 
 
 @router.get("/patients/{cedula}/current-medications", response_model=ConsultationOut)
-def get_current_medications(cedula: str, db: Session = Depends(get_db)):
+def get_current_medications(cedula: str, request: Request, db: Session = Depends(get_db)):
     patient = _get_patient(db, cedula)
     consultation = consultation_crud.get_latest_by_patient(db, patient.id)
     if not consultation:
         raise HTTPException(status_code=404, detail="No hay consultas registradas")
-    return _serialize_consultation(consultation)
+    return render(request, ConsultationOut.model_validate(consultation))
 
 
-@router.get("/patients/{patient_username}/consultas", response_model=list[ConsultaSummary])
-def list_consultas_by_patient(
+@router.get("/patients/{patient_username}/consultas", response_model=CursorPage[ConsultaSummary] | list[ConsultaSummary])
+async def list_consultas_by_patient(
     patient_username: str,
-    db: Session = Depends(get_db),
-    current_user=Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(require_admin_async),
+    page: PageParams = Depends(get_page_params),
 ):
-    patient_user = _get_patient_user(db, patient_username)
-    return consulta_crud.list_by_patient_user(db, patient_user.id)
+    patient_user = await _get_patient_user_async(db, patient_username)
+    return page.respond(
+        await consulta_crud.list_by_patient_user_async(db, patient_user.id, page.cursor, page.limit)
+    )
 
 
 @router.get("/consultas/{consulta_id}", response_model=ConsultaOut)
-def get_consulta(consulta_id: str, db: Session = Depends(get_db), current_user=Depends(require_admin)):
+def get_consulta(consulta_id: str, db: Session = Depends(get_db), current_user=Depends(require_admin_async)):
     consulta = consulta_crud.get(db, consulta_id)
     if not consulta:
         raise HTTPException(status_code=404, detail="Consulta not found")
@@ -405,16 +462,17 @@ def get_consulta(consulta_id: str, db: Session = Depends(get_db), current_user=D
 
 @router.get("/consultations/{consulta_id}/print", response_class=HTMLResponse)
 def print_consultation(consulta_id: str, db: Session = Depends(get_db)):
-    consultation = consultation_crud.get(db, consulta_id)
+    consultation = consultation_crud.get(db, consulta_id, options=consultation_crud.FOR_PRINT)
     if not consultation:
         raise HTTPException(status_code=404, detail="Consulta no existe")
 
-    patient = patient_crud.get(db, consultation.patient_id)
+    patient = consultation.patient
     if not patient:
         raise HTTPException(status_code=404, detail="Paciente no existe")
 
     meds_html = "".join(
-        f"<tr><td>{med.drug_name}</td><td>{med.quantity or ''}</td><td>{med.description or ''}</td>"
+        f"<tr><td>{escape(med.drug_name)}</td><td>{med.quantity or ''}</td>"
+        f"<td>{escape(med.description or '')}</td>"
         f"<td>{f'{med.duration_days} dias' if med.duration_days is not None else ''}</td></tr>"
         for med in consultation.medications
     )
@@ -438,11 +496,11 @@ def print_consultation(consulta_id: str, db: Session = Depends(get_db)):
         <h1>Consulta Clinica</h1>
         <div class="muted">Fecha: {consultation.created_at.date()}</div>
         <h2>Paciente</h2>
-        <div>{patient.nombres} {patient.apellidos} - Cedula: {patient.cedula}</div>
+        <div>{escape(patient.nombres)} {escape(patient.apellidos)} - Cedula: {escape(patient.cedula)}</div>
         <h2>Consulta</h2>
-        <div><strong>Diagnostico:</strong> {consultation.diagnosis or ''}</div>
-        <div><strong>Notas:</strong> {consultation.notes or ''}</div>
-        <div><strong>Indicaciones:</strong> {consultation.indications or ''}</div>
+        <div><strong>Diagnostico:</strong> {escape(consultation.diagnosis or '')}</div>
+        <div><strong>Notas:</strong> {escape(consultation.notes or '')}</div>
+        <div><strong>Indicaciones:</strong> {escape(consultation.indications or '')}</div>
         <h2>Medicamentos</h2>
         <table>
           <thead>
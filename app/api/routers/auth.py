@@ -1,43 +1,139 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+from typing import NoReturn
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db, get_current_user
-from app.core.security import verify_password, create_access_token
+from app.api.deps import get_db, get_current_user, resolve_patient_id
+from app.core.config import settings
+from app.core.rate_limit import get_login_throttle
+from app.core.security import create_access_token, verify_password_and_update
+from app.crud import refresh_tokens as refresh_token_crud
 from app.models.user import User
-from app.schemas.auth import Token, PatientLogin, AdminLogin
+from app.schemas.auth import Token, PatientLogin, AdminLogin, RefreshRequest
 from app.schemas.user import UserOut
 
 router = APIRouter(prefix="/auth")
+logger = logging.getLogger(__name__)
+
+
+def verify_user_password(db: Session, user: User, password: str) -> bool:
+    valid, new_hash = verify_password_and_update(password, user.password_hash)
+    if valid and new_hash:
+        try:
+            user.password_hash = new_hash
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            logger.exception("Failed to upgrade password hash for user %s", user.id)
+    return valid
+
+
+def client_ip(request: Request) -> str:
+    """Address login throttling keys on.
+
+    Behind WEB_TRUSTED_PROXY_HOPS proxies the socket peer is always a proxy,
+    so take the X-Forwarded-For entry the outermost trusted proxy appended;
+    entries left of it are client-supplied and never trusted.
+    """
+    hops = settings.WEB_TRUSTED_PROXY_HOPS
+    if hops > 0:
+        forwarded = [
+            host.strip()
+            for header in request.headers.getlist("x-forwarded-for")
+            for host in header.split(",")
+            if host.strip()
+        ]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.client.host if request.client else "unknown"
+
+
+def reject_login(identifier: str, ip: str) -> NoReturn:
+    get_login_throttle().record_failure(identifier, ip)
+    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+
+def access_token_for(db: Session, user: User, role: str) -> str:
+    claims = {"sub": str(user.id), "role": role}
+    if role == "PATIENT":
+        patient_id = resolve_patient_id(db, user.username)
+        if patient_id is not None:
+            claims["patient_id"] = str(patient_id)
+    return create_access_token(claims)
+
+
+def issue_tokens(db: Session, user: User, role: str) -> Token:
+    refresh_token, _ = refresh_token_crud.issue(db, user.id)
+    db.commit()
+    return Token(access_token=access_token_for(db, user, role), refresh_token=refresh_token)
 
 
 @router.post("/patient/login", response_model=Token)
-def login_patient(data: PatientLogin, db: Session = Depends(get_db)):
+def login_patient(data: PatientLogin, request: Request, db: Session = Depends(get_db)):
+    ip = client_ip(request)
+    throttle = get_login_throttle()
+    attempt = throttle.check(data.cedula, ip)
     user = db.query(User).filter(User.username == data.cedula).first()
     if not user or user.role.lower() != "patient":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        reject_login(data.cedula, ip)
     if not user.activo:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
-    if not verify_password(data.password, user.password_hash):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-    token = create_access_token({"sub": str(user.id), "role": "PATIENT"})
-    return Token(access_token=token)
+    if not verify_user_password(db, user, data.password):
+        reject_login(data.cedula, ip)
+    throttle.record_success(data.cedula, ip, attempt)
+    return issue_tokens(db, user, "PATIENT")
 
 
 @router.post("/admin/login", response_model=Token)
-def login_admin(data: AdminLogin, db: Session = Depends(get_db)):
+def login_admin(data: AdminLogin, request: Request, db: Session = Depends(get_db)):
+    ip = client_ip(request)
+    throttle = get_login_throttle()
+    attempt = throttle.check(data.username, ip)
     user = db.query(User).filter(User.username == data.username).first()
     if not user or not user.activo or user.role.lower() != "admin":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        reject_login(data.username, ip)
+
+    if not verify_user_password(db, user, data.password):
+        reject_login(data.username, ip)
+
+    throttle.record_success(data.username, ip, attempt)
+    return issue_tokens(db, user, "ADMIN")
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(data: RefreshRequest, db: Session = Depends(get_db)):
+    stored = refresh_token_crud.get_for_update(db, data.refresh_token)
+    if not stored:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    if stored.revoked_at is not None:
+        logger.warning("Refresh token reuse detected for user %s", stored.user_id)
+        refresh_token_crud.revoke_family(db, stored.family_id)
+        db.commit()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    if not refresh_token_crud.is_usable(stored):
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
-    if not verify_password(data.password, user.password_hash):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    user = db.query(User).filter(User.id == stored.user_id).first()
+    if not user or not user.activo:
+        refresh_token_crud.revoke_family(db, stored.family_id)
+        db.commit()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
 
-    token = create_access_token({"sub": str(user.id), "role": "ADMIN"})
-    return Token(access_token=token)
+    refresh_token, _ = refresh_token_crud.rotate(db, stored)
+    db.commit()
+    return Token(access_token=access_token_for(db, user, user.role.upper()), refresh_token=refresh_token)
 
 
 @router.post("/logout")
-def logout():
+def logout(data: RefreshRequest | None = None, db: Session = Depends(get_db)):
+    if data is not None:
+        stored = refresh_token_crud.get_for_update(db, data.refresh_token)
+        if stored:
+            refresh_token_crud.revoke_family(db, stored.family_id)
+        db.commit()
     return {"message": "Logged out"}
 
 
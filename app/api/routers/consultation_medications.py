@@ -36,8 +36,8 @@ def _ensure_patient_access(db: Session, patient_id: str, current_user) -> None:
         return
     if role != "patient":
         raise HTTPException(status_code=403, detail="Acceso denegado")
-    patient = patient_crud.get_by_cedula(db, current_user.username)
-    if not patient or str(patient.id) != str(patient_id):
+    own_patient_id = getattr(current_user, "patient_id", None)
+    if own_patient_id is None or str(own_patient_id) != str(patient_id):
         raise HTTPException(status_code=403, detail="Acceso denegado")
 
 
@@ -122,7 +122,7 @@ def get_current_medications(
 ):
     _ensure_patient_access(db, patient_id, current_user)
     _get_patient_or_404(db, patient_id)
-    latest = consultation_crud.get_latest_by_patient(db, patient_id)
+    latest = consultation_crud.get_latest_by_patient(db, patient_id, options=())
     if not latest:
         return []
     return med_crud.list_by_consultation(db, latest.id)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user_async, get_read_db
+from app.core.http_cache import is_conditional, is_not_modified, not_modified, validator_headers, weak_etag
+from app.core.pdf import LAYOUT_VERSION
+from app.core.pdf_cache import consultation_pdf
+from app.core.serialization import render, response_media_type
 from app.crud import consultations as consultation_crud
-from app.crud import patients as patient_crud
 from app.schemas.consultation_print import (
     ConsultationPrintOut,
     PrintConsultation,
@@ -15,36 +18,45 @@ from app.schemas.consultation_print import (
 router = APIRouter()
 
 
-def _get_consultation_or_404(db: Session, consultation_id: str):
-    consultation = consultation_crud.get(db, consultation_id)
-    if not consultation:
-        raise HTTPException(status_code=404, detail="Consulta no existe")
-    return consultation
-
-
-def _ensure_access(db: Session, consultation, current_user) -> None:
+def _ensure_access(consultation, current_user) -> None:
     role = str(getattr(current_user, "role", "")).strip().lower()
     if role == "admin":
         return
     if role != "patient":
         raise HTTPException(status_code=403, detail="Acceso denegado")
-    patient = patient_crud.get_by_cedula(db, current_user.username)
-    if not patient or str(patient.id) != str(consultation.patient_id):
+    own_patient_id = getattr(current_user, "patient_id", None)
+    if own_patient_id is None or str(own_patient_id) != str(consultation.patient_id):
         raise HTTPException(status_code=403, detail="Acceso denegado")
 
 
-@router.get("/consultations/{consultation_id}/print", response_model=ConsultationPrintOut)
-def get_consultation_print(
-    consultation_id: str,
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
-):
-    consultation = _get_consultation_or_404(db, consultation_id)
-    _ensure_access(db, consultation, current_user)
+# Patient and lab-name edits bump the version too, so it covers everything
+# the print views render. A conditional request checks it with one narrow
+# query and answers 304 without loading the graph.
+async def _print_not_modified(request: Request, db: AsyncSession, consultation_id: str, current_user, *parts):
+    if not is_conditional(request):
+        return None
+    version = await consultation_crud.get_version_async(db, consultation_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Consulta no existe")
+    _ensure_access(version, current_user)
+    etag = weak_etag(*parts, consultation_id, version.version)
+    if is_not_modified(request, etag, version.updated_at):
+        return not_modified(validator_headers(etag, version.updated_at))
+    return None
 
-    patient = patient_crud.get(db, consultation.patient_id)
-    if not patient:
+
+async def _load_for_print(db: AsyncSession, consultation_id: str, current_user):
+    consultation = await consultation_crud.get_for_print_async(db, consultation_id)
+    if not consultation:
+        raise HTTPException(status_code=404, detail="Consulta no existe")
+    _ensure_access(consultation, current_user)
+    if not consultation.patient:
         raise HTTPException(status_code=404, detail="Paciente no existe")
+    return consultation
+
+
+def _build_printout(consultation) -> ConsultationPrintOut:
+    patient = consultation.patient
 
     medications = [
         PrintMedication(
@@ -56,7 +68,6 @@ def get_consultation_print(
         for item in consultation.medications
     ]
 
-    labs_sorted = sorted(consultation.labs, key=lambda item: item.creado_en)
     labs = [
         PrintLab(
             lab_nombre=lab.lab.nombre if lab.lab else "",
@@ -65,7 +76,7 @@ def get_consultation_print(
             unidad_snapshot=lab.unidad_snapshot,
             rango_ref_snapshot=lab.rango_ref_snapshot,
         )
-        for lab in labs_sorted
+        for lab in consultation.labs
     ]
 
     return ConsultationPrintOut(
@@ -84,3 +95,46 @@ def get_consultation_print(
         medications=medications,
         labs=labs,
     )
+
+
+@router.get("/consultations/{consultation_id}/print", response_model=ConsultationPrintOut)
+async def get_consultation_print(
+    consultation_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user_async),
+):
+    media_type = response_media_type(request)
+    cached = await _print_not_modified(request, db, consultation_id, current_user, "print", media_type)
+    if cached is not None:
+        return cached
+
+    consultation = await _load_for_print(db, consultation_id, current_user)
+    etag = weak_etag("print", media_type, consultation_id, consultation.version)
+    headers = validator_headers(etag, consultation.updated_at)
+    return render(request, _build_printout(consultation), headers=headers)
+
+
+@router.get(
+    "/consultations/{consultation_id}/print.pdf",
+    response_class=Response,
+    responses={200: {"content": {"application/pdf": {}}, "description": "Printable consultation"}},
+)
+async def get_consultation_print_pdf(
+    consultation_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db),
+    current_user=Depends(get_current_user_async),
+):
+    # The layout version is part of the validator, so a new design is not
+    # answered with 304 for a PDF rendered under the old one.
+    cached = await _print_not_modified(request, db, consultation_id, current_user, "print.pdf", LAYOUT_VERSION)
+    if cached is not None:
+        return cached
+
+    consultation = await _load_for_print(db, consultation_id, current_user)
+    body = await consultation_pdf(_build_printout(consultation))
+    etag = weak_etag("print.pdf", LAYOUT_VERSION, consultation_id, consultation.version)
+    headers = validator_headers(etag, consultation.updated_at)
+    headers["Content-Disposition"] = f'inline; filename="consulta-{consultation_id}.pdf"'
+    return Response(content=body, media_type="application/pdf", headers=headers)
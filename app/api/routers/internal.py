@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+
+from app.api.deps import principal_cache, read_routing_stats, token_cache
+from app.core.compression import compression_metrics
+from app.core.database import get_async_engine, get_engine, get_replica_async_engine
+from app.core.db_pool import pool_stats
+from app.core.dependencies import require_admin
+from app.core.pdf_cache import pdf_stats
+from app.core.rate_limit import get_login_throttle
+from app.core.security import get_hashing_executor
+from app.core.sql_stats import sql_metrics
+from app.core.startup import startup_report
+from app.crud.lab_catalog import snapshot_stats as lab_catalog_snapshot_stats
+
+router = APIRouter(prefix="/internal", dependencies=[Depends(require_admin)])
+
+
+@router.get("/metrics")
+def get_metrics():
+    return {
+        "token_cache": token_cache.stats(),
+        "principal_cache": principal_cache.stats(),
+        "lab_catalog_snapshot": lab_catalog_snapshot_stats(),
+        "hashing_executor": get_hashing_executor().stats(),
+        "print_pdf": pdf_stats(),
+        "login_throttle": get_login_throttle().stats(),
+        "db_pool": {
+            "primary": pool_stats(get_engine(), "primary"),
+            "primary_async": pool_stats(get_async_engine(), "primary_async"),
+            "replica_async": pool_stats(get_replica_async_engine(), "replica_async"),
+        },
+        "read_routing": read_routing_stats(),
+        "sql": sql_metrics.snapshot(),
+        "compression": compression_metrics.snapshot(),
+        "startup": startup_report.snapshot(),
+    }
@@ -1,18 +1,16 @@
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_async_db, get_current_user, get_current_user_async, get_db
 from app.core.dependencies import require_admin
+from app.core.http_cache import cached_response
 from app.crud import consultations as consultation_crud
 from app.crud import consulta_labs as consulta_labs_crud
 from app.crud import lab_catalog as lab_catalog_crud
-from app.crud import patients as patient_crud
-from app.models.consulta_lab import ConsultaLab
-from app.models.catalog_lab import CatalogLab
 from app.schemas.consulta_lab import ConsultaLabCreate, ConsultaLabOut
 from app.schemas.lab_catalog import CatalogLabCreate, CatalogLabOut, CatalogLabUpdate
 
@@ -31,43 +29,15 @@ def _format_rango(min_value: float | None, max_value: float | None) -> str | Non
     return f"{min_value} - {max_value}"
 
 
-def _list_catalog_sql(db: Session) -> list[CatalogLabOut]:
-    rows = db.execute(
-        text(
-            """
-            select id, nombre, unidad, rango_ref_min, rango_ref_max, activo, categoria, orden
-            from public.catalogo_labs
-            where activo = true
-            order by orden, nombre
-            """
-        )
-    ).mappings()
-    response: list[CatalogLabOut] = []
-    for row in rows:
-        response.append(
-            CatalogLabOut(
-                id=str(row["id"]),
-                nombre=row["nombre"],
-                unidad=row["unidad"],
-                rango_ref_min=row["rango_ref_min"],
-                rango_ref_max=row["rango_ref_max"],
-                activo=bool(row["activo"]),
-                categoria=row.get("categoria"),
-                orden=row.get("orden"),
-            )
-        )
-    return response
+_CATALOG_UNAVAILABLE = "Catalogo de laboratorios no disponible. Ejecuta alembic upgrade head."
 
 
-def _list_catalog_safe(db: Session) -> list[CatalogLabOut]:
+async def _catalog_snapshot_safe(db: AsyncSession) -> lab_catalog_crud.CatalogSnapshot:
     try:
-        return _list_catalog_sql(db)
+        return await lab_catalog_crud.get_snapshot_async(db)
     except (ProgrammingError, OperationalError) as exc:
         logger.warning("Lab catalog unavailable: %s", exc)
-        raise HTTPException(
-            status_code=503,
-            detail="Catalogo de laboratorios no disponible. Ejecuta alembic upgrade head.",
-        ) from exc
+        raise HTTPException(status_code=503, detail=_CATALOG_UNAVAILABLE) from exc
 
 
 def _get_consulta_or_404(db: Session, consulta_id: str):
@@ -84,33 +54,17 @@ def _ensure_consulta_access(db: Session, consulta_id: str, current_user) -> None
     if role != "patient":
         raise HTTPException(status_code=403, detail="Acceso denegado")
     consulta = _get_consulta_or_404(db, consulta_id)
-    patient = patient_crud.get_by_cedula(db, current_user.username)
-    if not patient or str(patient.id) != str(consulta.patient_id):
+    own_patient_id = getattr(current_user, "patient_id", None)
+    if own_patient_id is None or str(own_patient_id) != str(consulta.patient_id):
         raise HTTPException(status_code=403, detail="Acceso denegado")
 
 
+# The catalog changes a few times a year: responses come pre-rendered from
+# the in-process snapshot and clients revalidate with If-None-Match.
 @router.get("/labs/catalogo")
-def list_catalog(db: Session = Depends(get_db)):
+def list_catalog(request: Request, db: Session = Depends(get_db)):
     try:
-        rows = (
-            db.query(CatalogLab)
-            .filter(CatalogLab.activo == True)
-            .order_by(CatalogLab.orden.asc(), CatalogLab.nombre.asc())
-            .all()
-        )
-        return [
-            {
-                "id": str(row.id),
-                "nombre": row.nombre,
-                "unidad": row.unidad,
-                "rango_ref_min": row.rango_ref_min,
-                "rango_ref_max": row.rango_ref_max,
-                "categoria": row.categoria,
-                "orden": row.orden,
-                "activo": row.activo,
-            }
-            for row in rows
-        ]
+        snapshot = lab_catalog_crud.get_snapshot(db)
     except (ProgrammingError, OperationalError) as exc:
         logger.exception("Catalogo labs unavailable")
         raise HTTPException(
@@ -120,22 +74,29 @@ def list_catalog(db: Session = Depends(get_db)):
     except Exception as exc:
         logger.exception("Error loading catalogo_labs")
         raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return cached_response(request, snapshot.legacy_body, snapshot.legacy_etag, "no-cache")
 
 
+# Snapshots are built from the primary: a replica lagging behind a catalog
+# write would otherwise be cached until the TTL runs out.
 @router.get("/labs/catalog", response_model=list[CatalogLabOut])
-def list_catalog_auth(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+async def list_catalog_auth(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
 ):
-    return _list_catalog_safe(db)
+    snapshot = await _catalog_snapshot_safe(db)
+    return cached_response(request, snapshot.body, snapshot.etag, "private, no-cache")
 
 
 @router.get("/lab-catalog", response_model=list[CatalogLabOut])
-def list_catalog_alias(
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+async def list_catalog_alias(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user=Depends(get_current_user_async),
 ):
-    return _list_catalog_safe(db)
+    snapshot = await _catalog_snapshot_safe(db)
+    return cached_response(request, snapshot.body, snapshot.etag, "private, no-cache")
 
 
 @router.post("/labs/catalogo", response_model=CatalogLabOut, status_code=status.HTTP_201_CREATED)
@@ -202,45 +163,46 @@ def save_consulta_labs(
     current_user=Depends(require_admin),
 ):
     consulta = _get_consulta_or_404(db, consulta_id)
-    consulta_labs_crud.delete_by_consulta(db, consulta_id)
-
-    items = []
-    for item in data:
-        lab = lab_catalog_crud.get(db, item.lab_id)
-        if not lab:
-            lab = lab_catalog_crud.get_by_name_normalized(db, item.lab_id)
-        if not lab:
-            lab = lab_catalog_crud.find_by_name_contains(db, item.lab_id)
-        if not lab:
-            raise HTTPException(status_code=400, detail="Laboratorio no pertenece al catalogo")
-        rango_snapshot = _format_rango(lab.rango_ref_min, lab.rango_ref_max)
-        items.append(
-            ConsultaLab(
-                consulta_id=consulta.id,
-                lab_id=lab.id,
-                valor_num=item.valor_num,
-                valor_texto=None,
-                unidad_snapshot=lab.unidad,
-                rango_ref_snapshot=rango_snapshot,
-            )
+
+    # Identifiers resolve against the cached catalog snapshot; one that misses
+    # forces a single re-read in case the lab was added by another worker.
+    snapshot = lab_catalog_crud.get_snapshot(db)
+    labs = [snapshot.index.resolve(item.lab_id) for item in data]
+    if any(lab is None for lab in labs):
+        snapshot = lab_catalog_crud.get_snapshot(db, refresh=True)
+        labs = [snapshot.index.resolve(item.lab_id) for item in data]
+    if any(lab is None for lab in labs):
+        raise HTTPException(status_code=400, detail="Laboratorio no pertenece al catalogo")
+
+    rows = []
+    names = []
+    for item, lab in zip(data, labs):
+        names.append(lab.nombre)
+        rows.append(
+            {
+                "consulta_id": consulta.id,
+                "lab_id": lab.id,
+                "valor_num": item.valor_num,
+                "valor_texto": None,
+                "unidad_snapshot": lab.unidad,
+                "rango_ref_snapshot": _format_rango(lab.rango_ref_min, lab.rango_ref_max),
+            }
         )
 
-    created = consulta_labs_crud.create_many(db, items) if items else []
+    created = consulta_labs_crud.replace_for_consulta(db, consulta.id, rows)
     logger.info("Saved %s labs for consulta %s", len(created), consulta_id)
 
-    response: list[ConsultaLabOut] = []
-    for lab in created:
-        response.append(
-            ConsultaLabOut(
-                id=str(lab.id),
-                consulta_id=str(lab.consulta_id),
-                lab_id=str(lab.lab_id),
-                lab_nombre=lab.lab.nombre if lab.lab else "",
-                valor_num=lab.valor_num,
-                valor_texto=lab.valor_texto,
-                unidad_snapshot=lab.unidad_snapshot,
-                rango_ref_snapshot=lab.rango_ref_snapshot,
-                creado_en=lab.creado_en,
-            )
+    return [
+        ConsultaLabOut(
+            id=str(lab.id),
+            consulta_id=str(lab.consulta_id),
+            lab_id=str(lab.lab_id),
+            lab_nombre=nombre,
+            valor_num=lab.valor_num,
+            valor_texto=lab.valor_texto,
+            unidad_snapshot=lab.unidad_snapshot,
+            rango_ref_snapshot=lab.rango_ref_snapshot,
+            creado_en=lab.creado_en,
         )
-    return response
+        for lab, nombre in zip(created, names)
+    ]
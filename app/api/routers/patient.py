@@ -1,84 +1,149 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
 
-from app.api.deps import get_db
-from app.core.dependencies import require_patient
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import PageParams, get_page_params, get_read_db
+from app.core.dependencies import require_patient_async
+from app.core.http_cache import is_conditional, is_not_modified, not_modified, validator_headers, weak_etag
+from app.core.pagination import Page
+from app.core.serialization import render, response_media_type
 from app.crud import visits as visit_crud
 from app.crud import consultas as consulta_crud
 from app.crud import consultations as consultation_crud
-from app.crud import patients as patient_crud
 from app.schemas.consulta import ConsultaOut, ConsultaSummary
 from app.schemas.consultation import ConsultationOut
+from app.schemas.pagination import CursorPage
 from app.schemas.visit import VisitListItem, VisitOut
 
-router = APIRouter(dependencies=[Depends(require_patient)])
+router = APIRouter(dependencies=[Depends(require_patient_async)])
 
 
-def get_patient_by_user(db: Session, current_user):
-    patient = patient_crud.get_by_cedula(db, current_user.username)
-    if not patient:
+def get_patient_id(current_user):
+    patient_id = getattr(current_user, "patient_id", None)
+    if patient_id is None:
         raise HTTPException(status_code=404, detail="Paciente no encontrado")
-    return patient
+    return patient_id
 
 
 @router.get("/me/current-medication", response_model=VisitOut | None)
-def get_current_medication(current_user = Depends(require_patient), db: Session = Depends(get_db)):
-    patient = get_patient_by_user(db, current_user)
-    visits = visit_crud.list_by_patient(db, patient.id)
-    return visits[0] if visits else None
+async def get_current_medication(current_user = Depends(require_patient_async), db: AsyncSession = Depends(get_read_db)):
+    patient_id = get_patient_id(current_user)
+    return await visit_crud.get_latest_by_patient_async(db, patient_id)
 
 
-@router.get("/me/visits", response_model=list[VisitListItem])
-def list_my_visits(current_user = Depends(require_patient), db: Session = Depends(get_db)):
-    patient = get_patient_by_user(db, current_user)
-    return visit_crud.list_by_patient(db, patient.id)
+@router.get("/me/visits", response_model=CursorPage[VisitListItem] | list[VisitListItem])
+async def list_my_visits(
+    current_user = Depends(require_patient_async),
+    db: AsyncSession = Depends(get_read_db),
+    page: PageParams = Depends(get_page_params),
+):
+    patient_id = get_patient_id(current_user)
+    return page.respond(await visit_crud.list_by_patient_async(db, patient_id, page.cursor, page.limit))
 
 
 @router.get("/me/visits/{visit_id}", response_model=VisitOut)
-def get_my_visit(visit_id: str, current_user = Depends(require_patient), db: Session = Depends(get_db)):
-    patient = get_patient_by_user(db, current_user)
-    visit = visit_crud.get(db, visit_id)
-    if not visit or str(visit.patient_id) != str(patient.id):
+async def get_my_visit(visit_id: str, current_user = Depends(require_patient_async), db: AsyncSession = Depends(get_read_db)):
+    patient_id = get_patient_id(current_user)
+    visit = await visit_crud.get_async(db, visit_id)
+    if not visit or str(visit.patient_id) != str(patient_id):
         raise HTTPException(status_code=404, detail="Visit not found")
     return visit
 
 
 @router.get("/portal")
-def patient_portal(current_user = Depends(require_patient)):
+def patient_portal(current_user = Depends(require_patient_async)):
     return {"message": "Patient portal", "patient_id": str(current_user.id)}
 
 
-@router.get("/consultas", response_model=list[ConsultaSummary])
-def list_consultas(current_user = Depends(require_patient), db: Session = Depends(get_db)):
-    return consulta_crud.list_by_patient_user(db, str(current_user.id))
+@router.get("/consultas", response_model=CursorPage[ConsultaSummary] | list[ConsultaSummary])
+async def list_consultas(
+    current_user = Depends(require_patient_async),
+    db: AsyncSession = Depends(get_read_db),
+    page: PageParams = Depends(get_page_params),
+):
+    return page.respond(
+        await consulta_crud.list_by_patient_user_async(db, str(current_user.id), page.cursor, page.limit)
+    )
+
+
+# Consultation reads carry validators built from consultations.version and
+# updated_at. A conditional request runs one narrow version query first and
+# returns 304 without loading the graph when nothing changed. The negotiated
+# media type is part of the tag because JSON and msgpack bodies differ.
+def _page_validators(page: Page, params: PageParams) -> tuple[str, datetime | None]:
+    etag = weak_etag(
+        response_media_type(params.request),
+        params.legacy,
+        page.next_cursor,
+        *(f"{item.id}:{item.version}" for item in page.items),
+    )
+    return etag, max((item.updated_at for item in page.items), default=None)
+
+
+def _check_consultation_owner(consultation, patient_id) -> None:
+    if not consultation:
+        raise HTTPException(status_code=404, detail="Consulta no existe")
+    if str(consultation.patient_id) != str(patient_id):
+        raise HTTPException(status_code=403, detail="Not allowed")
 
 
-@router.get("/consultations", response_model=list[ConsultationOut])
-def list_consultations(current_user = Depends(require_patient), db: Session = Depends(get_db)):
-    patient = get_patient_by_user(db, current_user)
-    return consultation_crud.list_by_patient(db, patient.id)
+@router.get("/consultations", response_model=CursorPage[ConsultationOut] | list[ConsultationOut])
+async def list_consultations(
+    request: Request,
+    current_user = Depends(require_patient_async),
+    db: AsyncSession = Depends(get_read_db),
+    page: PageParams = Depends(get_page_params),
+):
+    patient_id = get_patient_id(current_user)
+    if is_conditional(request):
+        versions = await consultation_crud.list_versions_async(db, patient_id, page.cursor, page.limit)
+        etag, last_modified = _page_validators(versions, page)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(validator_headers(etag, last_modified))
+    result = await consultation_crud.list_by_patient_async(db, patient_id, page.cursor, page.limit)
+    return page.render(result, ConsultationOut, headers=validator_headers(*_page_validators(result, page)))
 
 
 @router.get("/consultations/{consultation_id}", response_model=ConsultationOut)
-def get_consultation(consultation_id: str, current_user = Depends(require_patient), db: Session = Depends(get_db)):
-    patient = get_patient_by_user(db, current_user)
-    consultation = consultation_crud.get(db, consultation_id)
-    if not consultation:
-        raise HTTPException(status_code=404, detail="Consulta no existe")
-    if str(consultation.patient_id) != str(patient.id):
-        raise HTTPException(status_code=403, detail="Not allowed")
-    return consultation
+async def get_consultation(
+    consultation_id: str,
+    request: Request,
+    current_user = Depends(require_patient_async),
+    db: AsyncSession = Depends(get_read_db),
+):
+    patient_id = get_patient_id(current_user)
+    media_type = response_media_type(request)
+    if is_conditional(request):
+        version = await consultation_crud.get_version_async(db, consultation_id)
+        _check_consultation_owner(version, patient_id)
+        etag = weak_etag(media_type, consultation_id, version.version)
+        if is_not_modified(request, etag, version.updated_at):
+            return not_modified(validator_headers(etag, version.updated_at))
+    consultation = await consultation_crud.get_async(db, consultation_id)
+    _check_consultation_owner(consultation, patient_id)
+    etag = weak_etag(media_type, consultation_id, consultation.version)
+    return render(
+        request,
+        ConsultationOut.model_validate(consultation),
+        headers=validator_headers(etag, consultation.updated_at),
+    )
 
 
 @router.get("/medication/current", response_model=ConsultationOut | None)
-def get_current_consultation(current_user = Depends(require_patient), db: Session = Depends(get_db)):
-    patient = get_patient_by_user(db, current_user)
-    return consultation_crud.get_latest_by_patient(db, patient.id)
+async def get_current_consultation(
+    request: Request,
+    current_user = Depends(require_patient_async),
+    db: AsyncSession = Depends(get_read_db),
+):
+    patient_id = get_patient_id(current_user)
+    consultation = await consultation_crud.get_latest_by_patient_async(db, patient_id)
+    return render(request, ConsultationOut.model_validate(consultation) if consultation else None)
 
 
 @router.get("/consultas/{consulta_id}", response_model=ConsultaOut)
-def get_consulta(consulta_id: str, current_user = Depends(require_patient), db: Session = Depends(get_db)):
-    consulta = consulta_crud.get(db, consulta_id)
+async def get_consulta(consulta_id: str, current_user = Depends(require_patient_async), db: AsyncSession = Depends(get_read_db)):
+    consulta = await consulta_crud.get_async(db, consulta_id)
     if not consulta:
         raise HTTPException(status_code=404, detail="Consulta not found")
     if str(consulta.patient_user_id) != str(current_user.id):
@@ -87,8 +152,8 @@ def get_consulta(consulta_id: str, current_user = Depends(require_patient), db:
 
 
 @router.get("/medicacion-actual", response_model=ConsultaOut)
-def get_current_consulta(current_user = Depends(require_patient), db: Session = Depends(get_db)):
-    consulta = consulta_crud.get_latest_by_patient(db, str(current_user.id))
+async def get_current_consulta(current_user = Depends(require_patient_async), db: AsyncSession = Depends(get_read_db)):
+    consulta = await consulta_crud.get_latest_by_patient_async(db, str(current_user.id))
     if not consulta:
         raise HTTPException(status_code=404, detail="No hay consultas registradas")
     return consulta
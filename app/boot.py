@@ -0,0 +1,91 @@
+"""Start the web process, migrating first only when the schema is behind.
+
+Usage: python -m app.boot uvicorn app.main:app --host 0.0.0.0 --port $PORT
+"""
+import logging
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import psycopg
+from dotenv import load_dotenv
+
+from app.core.schema import SCHEMA_HEAD
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+# Arbitrary but fixed key shared by every replica of this app.
+MIGRATION_LOCK_KEY = 0x77656264696162  # "webdiab"
+
+logger = logging.getLogger("app.boot")
+
+
+def libpq_url(url: str) -> str:
+    return re.sub(r"^postgres(?:ql)?(?:\+\w+)?://", "postgresql://", url)
+
+
+def current_revisions(conn: psycopg.Connection) -> set[str]:
+    try:
+        with conn.cursor() as cur:
+            cur.execute("select version_num from alembic_version")
+            return {row[0] for row in cur.fetchall()}
+    except psycopg.errors.UndefinedTable:
+        return set()
+
+
+def run_alembic_upgrade() -> None:
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(BASE_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BASE_DIR / "alembic"))
+    command.upgrade(config, "head")
+    # env.py calls fileConfig(), which disables loggers created before it.
+    logger.disabled = False
+
+
+def ensure_schema(database_url: str, lock_timeout_seconds: float = 300.0) -> bool:
+    """Return True when a migration ran, False when the schema was already current."""
+    with psycopg.connect(libpq_url(database_url), autocommit=True) as conn:
+        revisions = current_revisions(conn)
+        if revisions == {SCHEMA_HEAD}:
+            logger.info("Schema at %s, skipping migrations", SCHEMA_HEAD)
+            return False
+
+        logger.info("Schema at %s, expected %s; waiting for migration lock", sorted(revisions) or "empty", SCHEMA_HEAD)
+        conn.execute(f"set lock_timeout = {int(lock_timeout_seconds * 1000)}")
+        conn.execute("select pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+        try:
+            # Another replica may have migrated while we waited for the lock.
+            if current_revisions(conn) == {SCHEMA_HEAD}:
+                logger.info("Schema migrated by another process")
+                return False
+            started = time.perf_counter()
+            run_alembic_upgrade()
+            logger.info("Migrated to %s in %.1f s", SCHEMA_HEAD, time.perf_counter() - started)
+            return True
+        finally:
+            conn.execute("select pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+
+
+def main(argv: list[str] | None = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    logging.basicConfig(format="%(levelname)-5.5s [%(name)s] %(message)s")
+    logger.setLevel(logging.INFO)
+    load_dotenv(BASE_DIR / ".env")
+
+    database_url = os.environ.get("DATABASE_URL", "")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is not set")
+    started = time.perf_counter()
+    ensure_schema(database_url, float(os.environ.get("MIGRATION_LOCK_TIMEOUT_SECONDS", "300")))
+    logger.info("Schema check finished in %.0f ms", (time.perf_counter() - started) * 1000)
+
+    if argv:
+        os.execvp(argv[0], argv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import threading
+import time
+import zlib
+from typing import Any
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is negotiated
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/problem+json", "application/javascript", "text/")
+COMPRESS_MS_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100)
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    accepted: dict[str, float] = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+def negotiate(header: str, brotli_available: bool | None = None) -> str | None:
+    """Pick br or gzip from an Accept-Encoding header, or None for identity."""
+    if brotli_available is None:
+        brotli_available = brotli is not None
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    offers = ["br", "gzip"] if brotli_available else ["gzip"]
+    # Ties go to the first offer, so br wins when the client rates both equally.
+    best, best_quality = None, 0.0
+    for encoding in offers:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Compressor:
+    def __init__(self, encoding: str) -> None:
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31 writes the gzip container rather than raw zlib.
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush, so a streaming client gets each chunk promptly."""
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.compressed: dict[str, int] = {"gzip": 0, "br": 0}
+        self.streamed = 0
+        self.skipped_small = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_ms = Histogram(COMPRESS_MS_BUCKETS)
+
+    def observe(self, encoding: str, bytes_in: int, bytes_out: int, cpu_ms: float, streamed: bool) -> None:
+        with self._lock:
+            self.compressed[encoding] += 1
+            self.streamed += int(streamed)
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+        self.compress_ms.observe(cpu_ms)
+
+    def skip_small(self) -> None:
+        with self._lock:
+            self.skipped_small += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            bytes_in, bytes_out = self.bytes_in, self.bytes_out
+            compressed, streamed, skipped = dict(self.compressed), self.streamed, self.skipped_small
+        return {
+            "enabled": settings.COMPRESSION_ENABLED,
+            "brotli_available": brotli is not None,
+            "min_size": settings.COMPRESSION_MIN_SIZE,
+            "compressed": compressed,
+            "streamed": streamed,
+            "skipped_below_min_size": skipped,
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "bytes_saved": bytes_in - bytes_out,
+            "ratio": round(bytes_out / bytes_in, 4) if bytes_in else None,
+            "compress_cpu_ms": self.compress_ms.snapshot(),
+        }
+
+
+compression_metrics = CompressionMetrics()
+
+
+def _header(headers: list, name: bytes) -> bytes | None:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _compressible(status: int, headers: list) -> bool:
+    if status < 200 or status in (204, 206, 304):
+        return False
+    if _header(headers, b"content-encoding") is not None:
+        return False
+    if b"no-transform" in (_header(headers, b"cache-control") or b"").lower():
+        return False
+    content_type = (_header(headers, b"content-type") or b"").decode("latin-1").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def _with_vary(headers: list) -> list:
+    vary = _header(headers, b"vary")
+    if vary is None:
+        return [*headers, (b"vary", b"Accept-Encoding")]
+    if b"accept-encoding" in vary.lower() or vary.strip() == b"*":
+        return headers
+    return [(key, value + b", Accept-Encoding" if key.lower() == b"vary" else value) for key, value in headers]
+
+
+def _weak_etag(headers: list) -> list:
+    # Encoded bytes differ from the identity ones, so a strong validator no
+    # longer holds; If-None-Match compares weakly, so revalidation still works.
+    return [
+        (key, b"W/" + value if key.lower() == b"etag" and not value.startswith(b"W/") else value)
+        for key, value in headers
+    ]
+
+
+def _encoded_headers(headers: list, encoding: str, length: int | None) -> list:
+    updated = [(key, value) for key, value in _weak_etag(headers) if key.lower() != b"content-length"]
+    updated.append((b"content-encoding", encoding.encode("latin-1")))
+    if length is not None:
+        updated.append((b"content-length", str(length).encode("latin-1")))
+    return updated
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/br response compression.
+
+    Complete bodies under COMPRESSION_MIN_SIZE pass through untouched. A body
+    sent in several messages (StreamingResponse) is compressed incrementally
+    and flushed per message, so streaming keeps working; its length is then
+    unknown and Content-Length is dropped.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED or scope.get("method") == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        accept = _header(scope.get("headers", []), b"accept-encoding")
+        encoding = negotiate(accept.decode("latin-1")) if accept else None
+
+        start: dict | None = None
+        compressor: _Compressor | None = None
+        passthrough = False
+        bytes_in = bytes_out = chunks = 0
+        cpu_ms = 0.0
+
+        async def send_compressed(message) -> None:
+            nonlocal start, compressor, passthrough, bytes_in, bytes_out, chunks, cpu_ms
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if message["status"] == 304 and encoding is not None:
+                    # Match the validator the client got on the encoded 200.
+                    passthrough = True
+                    await send({**message, "headers": _weak_etag(headers)})
+                    return
+                if not _compressible(message["status"], headers):
+                    passthrough = True
+                    await send(message)
+                    return
+                start = {**message, "headers": _with_vary(headers)}
+                if encoding is None:
+                    passthrough = True
+                    await send(start)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < settings.COMPRESSION_MIN_SIZE:
+                    passthrough = True
+                    compression_metrics.skip_small()
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+            # Thread CPU time: compression runs on the event loop thread, and
+            # wall time would also count whatever else the loop was doing.
+            started = time.thread_time()
+            data = compressor.chunk(body) if more_body else compressor.finish(body)
+            cpu_ms += (time.thread_time() - started) * 1000
+            if chunks == 0:
+                start["headers"] = _encoded_headers(start["headers"], encoding, None if more_body else len(data))
+                await send(start)
+            chunks += 1
+            bytes_in += len(body)
+            bytes_out += len(data)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+            if not more_body:
+                compression_metrics.observe(encoding, bytes_in, bytes_out, cpu_ms, streamed=chunks > 1)
+
+        await self.app(scope, receive, send_compressed)
@@ -5,12 +5,67 @@ class Settings(BaseSettings):
     APP_NAME: str = "WEB DIABETES API"
     ENV: str = "development"
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_PRE_PING_SKIP_SECONDS: float = 0.0
+    DB_POOL_WARM_CONNECTIONS: int = 1
+    DB_CONNECTION_BUDGET: int | None = None
+    DATABASE_REPLICA_URL: str | None = None
+    DB_REPLICA_STICKY_SECONDS: float = 5.0
+    DB_STATS_ENABLED: bool = True
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+    PAGINATION_DEFAULT_LIMIT: int = 50
+    PAGINATION_MAX_LIMIT: int = 200
+    PAGINATION_LEGACY_LIMIT: int = 1000
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     ADMIN_USERNAME: str
     ADMIN_PASSWORD: str | None = None
     ADMIN_PASSWORD_HASH: str | None = None
     CORS_ORIGINS: str | None = None
+    STARTUP_BUDGET_MS: float = 3000.0
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    WEB_CONCURRENCY: int | None = None
+    WEB_PRELOAD: bool = True
+    WEB_MAX_REQUESTS: int = 2000
+    WEB_MAX_REQUESTS_JITTER: int = 200
+    WEB_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    WEB_TIMEOUT_SECONDS: int = 60
+    WEB_KEEPALIVE_SECONDS: int = 5
+    WEB_FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+    WEB_TRUSTED_PROXY_HOPS: int = 1
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 2048
+    TOKEN_CACHE_MAX_SIZE: int = 4096
+    TOKEN_CACHE_MAX_TTL_SECONDS: int = 3600
+    LAB_CATALOG_SNAPSHOT_TTL_SECONDS: int = 300
+    PATIENT_SEARCH_TRIGRAM_PROBE_TTL_SECONDS: int = 300
+    BCRYPT_ROUNDS: int | None = None
+    HASH_EXECUTOR_KIND: str = "thread"
+    HASH_EXECUTOR_WORKERS: int = 2
+    HASH_EXECUTOR_MAX_QUEUE: int = 8
+    HASH_EXECUTOR_TIMEOUT_SECONDS: float = 10.0
+    PDF_EXECUTOR_KIND: str = "process"
+    PDF_EXECUTOR_WORKERS: int = 2
+    PDF_EXECUTOR_MAX_QUEUE: int = 16
+    PDF_EXECUTOR_TIMEOUT_SECONDS: float = 30.0
+    PDF_CACHE_DIR: str | None = None
+    PDF_CACHE_MAX_ENTRIES: int = 5000
+    LOGIN_THROTTLE_WINDOW_SECONDS: int = 300
+    LOGIN_THROTTLE_MAX_PER_IDENTIFIER: int = 5
+    LOGIN_THROTTLE_MAX_PER_IP: int = 30
+    LOGIN_THROTTLE_REDIS_URL: str | None = None
+    LOGIN_THROTTLE_MEMORY_MAX_KEYS: int = 10000
 
     model_config = {
         "env_file": ".env",
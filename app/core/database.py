@@ -1,8 +1,12 @@
 import os
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from app.core.db_pool import InstrumentedAsyncAdaptedQueuePool, engine_options, instrument_engine
+from app.core.sql_stats import instrument_queries
+
 Base = declarative_base()
 
 _engine = None
@@ -12,21 +16,52 @@ _SessionFactory = sessionmaker(
     expire_on_commit=False,
 )
 
+_async_engine = None
+_AsyncSessionFactory = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+)
 
-def get_database_url() -> str:
-    url = os.environ.get("DATABASE_URL", "")
+_replica_async_engine = None
+_ReplicaAsyncSessionFactory = async_sessionmaker(
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+
+def _normalize_url(url: str) -> str:
     if url.startswith("postgresql://"):
         url = url.replace("postgresql://", "postgresql+psycopg://", 1)
     return url
 
 
+def _async_url(url: str) -> str:
+    if url.startswith("postgresql+psycopg2://"):
+        url = url.replace("postgresql+psycopg2://", "postgresql+psycopg://", 1)
+    return url
+
+
+def get_database_url() -> str:
+    return _normalize_url(os.environ.get("DATABASE_URL", ""))
+
+
+def get_async_database_url() -> str:
+    return _async_url(get_database_url())
+
+
+def get_replica_async_database_url() -> str:
+    return _async_url(_normalize_url(os.environ.get("DATABASE_REPLICA_URL", "")))
+
+
 def get_engine():
     global _engine
     if _engine is None:
         url = get_database_url()
         if not url:
             return None
-        _engine = create_engine(url, pool_pre_ping=True)
+        _engine = create_engine(url, **engine_options("primary"))
+        instrument_engine(_engine, "primary")
+        instrument_queries(_engine)
         _SessionFactory.configure(bind=_engine)
     return _engine
 
@@ -34,3 +69,57 @@ def get_engine():
 def SessionLocal():
     get_engine()
     return _SessionFactory()
+
+
+def get_async_engine():
+    global _async_engine
+    if _async_engine is None:
+        url = get_async_database_url()
+        if not url:
+            return None
+        _async_engine = create_async_engine(
+            url, **engine_options("primary_async", poolclass=InstrumentedAsyncAdaptedQueuePool)
+        )
+        instrument_engine(_async_engine.sync_engine, "primary_async")
+        instrument_queries(_async_engine.sync_engine)
+        _AsyncSessionFactory.configure(bind=_async_engine)
+    return _async_engine
+
+
+def get_replica_async_engine():
+    global _replica_async_engine
+    if _replica_async_engine is None:
+        url = get_replica_async_database_url()
+        if not url:
+            return None
+        _replica_async_engine = create_async_engine(
+            url, **engine_options("replica_async", poolclass=InstrumentedAsyncAdaptedQueuePool)
+        )
+        instrument_engine(_replica_async_engine.sync_engine, "replica_async")
+        instrument_queries(_replica_async_engine.sync_engine)
+        _ReplicaAsyncSessionFactory.configure(bind=_replica_async_engine)
+    return _replica_async_engine
+
+
+def replica_configured() -> bool:
+    return bool(get_replica_async_database_url())
+
+
+def AsyncSessionLocal(replica: bool = False):
+    if replica and get_replica_async_engine() is not None:
+        return _ReplicaAsyncSessionFactory()
+    get_async_engine()
+    return _AsyncSessionFactory()
+
+
+async def dispose_engines() -> None:
+    global _engine, _async_engine, _replica_async_engine
+    if _replica_async_engine is not None:
+        await _replica_async_engine.dispose()
+        _replica_async_engine = None
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+    if _engine is not None:
+        _engine.dispose()
+        _engine = None
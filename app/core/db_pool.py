@@ -0,0 +1,164 @@
+import logging
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkout_wait_ms = Histogram()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.pings = 0
+        self.pings_skipped = 0
+        self.ping_failures = 0
+
+    def incr(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+            "pings": self.pings,
+            "pings_skipped": self.pings_skipped,
+            "ping_failures": self.ping_failures,
+            "checkout_wait_ms": self.checkout_wait_ms.snapshot(),
+        }
+
+
+_metrics: dict[str, PoolMetrics] = {}
+_metrics_lock = threading.Lock()
+
+
+def get_pool_metrics(name: str) -> PoolMetrics:
+    with _metrics_lock:
+        if name not in _metrics:
+            _metrics[name] = PoolMetrics()
+        return _metrics[name]
+
+
+class InstrumentedPoolMixin:
+    def connect(self):
+        metrics = get_pool_metrics(self._orig_logging_name or "default")
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            metrics.incr("timeouts")
+            raise
+        finally:
+            metrics.checkout_wait_ms.observe((time.perf_counter() - started) * 1000)
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# Each worker keeps a sync and an async pool against the primary.
+ENGINES_PER_WORKER = 2
+
+
+def pool_sizes_for_budget(budget: int, workers: int, engines: int = ENGINES_PER_WORKER) -> tuple[int, int]:
+    """Split a global connection budget into (pool_size, max_overflow) per engine.
+
+    workers * engines * (pool_size + max_overflow) never exceeds the budget,
+    except that every engine keeps at least one connection.
+    """
+    per_engine = max(budget // max(workers * engines, 1), 1)
+    pool_size = max(per_engine // 2, 1)
+    return pool_size, per_engine - pool_size
+
+
+def engine_options(name: str, poolclass=InstrumentedQueuePool) -> dict[str, Any]:
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": False,
+        "pool_logging_name": name,
+    }
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    metrics = get_pool_metrics(name)
+    pre_ping = settings.DB_POOL_PRE_PING
+    skip_seconds = settings.DB_PRE_PING_SKIP_SECONDS
+    dialect = engine.dialect
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.incr("connects")
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics.incr("checkouts")
+        if not pre_ping:
+            return
+        last_used = connection_record.info.get("last_checkin")
+        if last_used is not None and time.monotonic() - last_used < skip_seconds:
+            metrics.incr("pings_skipped")
+            return
+        metrics.incr("pings")
+        try:
+            dialect.do_ping(dbapi_connection)
+        except Exception as ping_error:
+            metrics.incr("ping_failures")
+            logger.warning("Discarding stale %s pool connection: %s", name, ping_error)
+            raise exc.DisconnectionError() from ping_error
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("invalidations")
+
+    @event.listens_for(engine, "soft_invalidate")
+    def _on_soft_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("soft_invalidations")
+
+
+def pool_stats(engine: Engine | None, name: str) -> dict[str, Any] | None:
+    if engine is None:
+        return None
+    pool = engine.pool
+    stats: dict[str, Any] = {"status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+            }
+        )
+    stats.update(get_pool_metrics(name).snapshot())
+    return stats
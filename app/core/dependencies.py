@@ -1,6 +1,6 @@
 from fastapi import Depends, HTTPException, status
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, get_current_user_async
 from app.models.user import User
 
 
@@ -8,13 +8,23 @@ def _normalize_role(value: str | None) -> str:
     return (value or "").strip().lower()
 
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
-    if _normalize_role(getattr(current_user, "role", None)) != "admin":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+def _require_role(current_user: User, role: str, detail: str) -> User:
+    if _normalize_role(getattr(current_user, "role", None)) != role:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
     return current_user
 
 
+def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    return _require_role(current_user, "admin", "Admin only")
+
+
 def require_patient(current_user: User = Depends(get_current_user)) -> User:
-    if _normalize_role(getattr(current_user, "role", None)) != "patient":
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Patient only")
-    return current_user
+    return _require_role(current_user, "patient", "Patient only")
+
+
+async def require_admin_async(current_user: User = Depends(get_current_user_async)) -> User:
+    return _require_role(current_user, "admin", "Admin only")
+
+
+async def require_patient_async(current_user: User = Depends(get_current_user_async)) -> User:
+    return _require_role(current_user, "patient", "Patient only")
@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import BrokenExecutor, Executor, Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from app.core.metrics import Histogram
+
+
+class ExecutorBusyError(RuntimeError):
+    pass
+
+
+def _timed_call(fn: Callable[..., Any], *args: Any) -> tuple[float, float, Any]:
+    started_at = time.time()
+    started = time.perf_counter()
+    result = fn(*args)
+    return started_at, (time.perf_counter() - started) * 1000, result
+
+
+class BoundedExecutor:
+    def __init__(
+        self,
+        name: str,
+        kind: str = "thread",
+        max_workers: int = 2,
+        max_queue: int = 64,
+        timeout: float | None = None,
+    ) -> None:
+        kind = (kind or "thread").strip().lower()
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(int(max_workers), 1)
+        self.max_queue = max(int(max_queue), 0)
+        self.timeout = timeout
+        self._pool: Executor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.max_in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.restarts = 0
+        self.wait_ms = Histogram()
+        self.run_ms = Histogram()
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.name,
+                )
+        return self._pool
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorBusyError(f"{self.name} executor is saturated")
+            pool = self._get_pool()
+            self._in_flight += 1
+            self.submitted += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+
+        submitted_at = time.time()
+        outer: Future = Future()
+
+        def _done(inner: Future) -> None:
+            with self._lock:
+                self._in_flight -= 1
+            # False once the caller timed out and cancelled ``outer``; the job
+            # ran on regardless and its outcome has nobody to go to.
+            delivered = outer.set_running_or_notify_cancel()
+            try:
+                started_at, run_ms, result = inner.result()
+            except BaseException as exc:
+                broken = None
+                with self._lock:
+                    if delivered:
+                        self.failed += 1
+                    # A worker that died (OOM, segfault) poisons a process
+                    # pool for good; the next submit starts a fresh one.
+                    if isinstance(exc, BrokenExecutor) and self._pool is pool:
+                        broken, self._pool = pool, None
+                        self.restarts += 1
+                if broken is not None:
+                    broken.shutdown(wait=False, cancel_futures=True)
+                if delivered:
+                    outer.set_exception(exc)
+                return
+            if not delivered:
+                return
+            self.wait_ms.observe(max(started_at - submitted_at, 0.0) * 1000)
+            self.run_ms.observe(run_ms)
+            with self._lock:
+                self.completed += 1
+            outer.set_result(result)
+
+        try:
+            inner = pool.submit(_timed_call, fn, *args)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        inner.add_done_callback(_done)
+        return outer
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError as exc:
+            future.cancel()
+            self._timed_out()
+            raise ExecutorBusyError(f"{self.name} executor timed out") from exc
+
+    async def run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        future = self.submit(fn, *args)
+        try:
+            # Cancelling the wrapper on timeout cancels ``future`` as well.
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+        except asyncio.TimeoutError as exc:
+            self._timed_out()
+            raise ExecutorBusyError(f"{self.name} executor timed out") from exc
+
+    def _timed_out(self) -> None:
+        with self._lock:
+            self.timed_out += 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            in_flight = self._in_flight
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "queue_depth": max(in_flight - self.max_workers, 0),
+            "max_in_flight": self.max_in_flight,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "restarts": self.restarts,
+            "wait_ms": self.wait_ms.snapshot(),
+            "run_ms": self.run_ms.snapshot(),
+        }
@@ -0,0 +1,98 @@
+import base64
+import binascii
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Generic, Sequence, TypeVar
+
+from sqlalchemy import tuple_
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    next_cursor: str | None = None
+
+
+def page_size(limit: int | None) -> int:
+    return max(int(limit), 1) if limit else settings.PAGINATION_DEFAULT_LIMIT
+
+
+def clamp_limit(limit: int | None) -> int:
+    """Page size for a client-supplied limit, capped at PAGINATION_MAX_LIMIT."""
+    return min(page_size(limit), settings.PAGINATION_MAX_LIMIT)
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _from_json(value: Any, python_type: type) -> Any:
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    if not isinstance(value, python_type):
+        raise TypeError(f"expected {python_type.__name__}")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+class Keyset:
+    """Seek pagination over an ordered, unique column tuple.
+
+    The last column must be unique (the primary key) so ties in the leading
+    columns still give a total order. All columns sort in the same direction,
+    which lets Postgres compare row values against a composite index.
+    """
+
+    def __init__(self, *columns, descending: bool = False) -> None:
+        self.columns = columns
+        self.descending = descending
+
+    def decode(self, cursor: str) -> tuple:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.columns):
+                raise ValueError("cursor arity mismatch")
+            return tuple(
+                _from_json(value, column.type.python_type) for value, column in zip(values, self.columns)
+            )
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+            raise InvalidCursor("Invalid cursor") from exc
+
+    def apply(self, stmt, cursor: str | None, limit: int):
+        """Filter past the cursor, order by the key and fetch one extra row."""
+        if cursor:
+            key = tuple_(*self.columns)
+            values = tuple_(*self.decode(cursor))
+            stmt = stmt.where(key < values if self.descending else key > values)
+        order = [column.desc() if self.descending else column.asc() for column in self.columns]
+        return stmt.order_by(*order).limit(limit + 1)
+
+    def page(self, rows: Sequence[T], limit: int) -> Page[T]:
+        items = list(rows[:limit])
+        if len(rows) <= limit:
+            return Page(items=items)
+        last = items[-1]
+        return Page(items=items, next_cursor=encode_cursor([getattr(last, column.key) for column in self.columns]))
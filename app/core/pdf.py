@@ -0,0 +1,231 @@
+"""Minimal PDF writer and the consultation print layout.
+
+Stdlib only, so pool workers import it quickly: A4 pages of Helvetica text
+(WinAnsi encoding) with word wrap, simple ruled tables and page breaks.
+Output is deterministic, so the same payload always yields the same bytes.
+"""
+import zlib
+from typing import Any
+
+# Bump whenever the layout changes, so cached files keyed on the payload
+# alone are not served for the old design.
+LAYOUT_VERSION = 1
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+CONTENT_WIDTH = PAGE_WIDTH - 2 * MARGIN
+CELL_PADDING = 4
+
+# Advance widths for chars 32..126 from the Helvetica AFM, in 1/1000 em.
+_HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_DEFAULT_WIDTH = 556
+# Helvetica-Bold runs slightly wider; close enough for wrapping.
+_BOLD_FACTOR = 1.07
+
+
+def text_width(text: str, size: float, bold: bool = False) -> float:
+    units = sum(
+        _HELVETICA_WIDTHS[ord(char) - 32] if 32 <= ord(char) <= 126 else _DEFAULT_WIDTH for char in text
+    )
+    return units * size / 1000 * (_BOLD_FACTOR if bold else 1)
+
+
+def wrap(text: str, width: float, size: float, bold: bool = False) -> list[str]:
+    """Greedy word wrap; words longer than a line are split by character."""
+    lines: list[str] = []
+    for paragraph in (text or "").splitlines() or [""]:
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if text_width(candidate, size, bold) <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            line = ""
+            for char in word:
+                if line and text_width(line + char, size, bold) > width:
+                    lines.append(line)
+                    line = ""
+                line += char
+        lines.append(line)
+    return lines
+
+
+def _literal(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _number(value: float) -> bytes:
+    return f"{value:.2f}".rstrip("0").rstrip(".").encode("ascii")
+
+
+class Document:
+    """Top-down writer: each call draws at the cursor and moves it down."""
+
+    def __init__(self) -> None:
+        self.pages: list[list[bytes]] = []
+        self._new_page()
+
+    def _new_page(self) -> None:
+        self.pages.append([])
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def ensure(self, height: float) -> bool:
+        """Start a new page unless ``height`` still fits; True if it broke."""
+        if self.y - height >= MARGIN:
+            return False
+        self._new_page()
+        return True
+
+    def _text_at(self, x: float, baseline: float, text: str, size: float, bold: bool, gray: float) -> None:
+        font = b"/F2" if bold else b"/F1"
+        self.pages[-1].append(
+            b"BT %s g %s %s Tf %s %s Td %s Tj ET"
+            % (_number(gray), font, _number(size), _number(x), _number(baseline), _literal(text))
+        )
+
+    def _rule(self, y: float, gray: float = 0.8) -> None:
+        self.pages[-1].append(
+            b"%s G 0.5 w %s %s m %s %s l S"
+            % (_number(gray), _number(MARGIN), _number(y), _number(PAGE_WIDTH - MARGIN), _number(y))
+        )
+
+    def space(self, height: float) -> None:
+        self.y -= height
+
+    def paragraph(self, text: str, size: float = 10, bold: bool = False, gray: float = 0) -> None:
+        leading = size * 1.3
+        for line in wrap(text, CONTENT_WIDTH, size, bold):
+            self.ensure(leading)
+            self.y -= leading
+            self._text_at(MARGIN, self.y + size * 0.25, line, size, bold, gray)
+
+    def heading(self, text: str, size: float = 12) -> None:
+        # Keep a heading together with at least one line of what follows.
+        self.ensure(size * 3.5)
+        self.space(size * 0.6)
+        self.paragraph(text, size, bold=True)
+        self.space(size * 0.2)
+
+    def table(self, columns: list[tuple[str, float]], rows: list[list[str]], size: float = 9) -> None:
+        """Ruled table; ``columns`` are (title, share of the content width)."""
+        widths = [CONTENT_WIDTH * share for _, share in columns]
+        leading = size * 1.3
+
+        def draw_row(cells: list[str], bold: bool) -> None:
+            wrapped = [wrap(cell, width - 2 * CELL_PADDING, size, bold) for cell, width in zip(cells, widths)]
+            height = max(len(lines) for lines in wrapped) * leading + 2 * CELL_PADDING
+            if self.ensure(height) and not bold:
+                draw_row([title for title, _ in columns], bold=True)
+            top = self.y
+            x = MARGIN
+            for lines, width in zip(wrapped, widths):
+                for index, line in enumerate(lines):
+                    baseline = top - CELL_PADDING - (index + 1) * leading + size * 0.25
+                    self._text_at(x + CELL_PADDING, baseline, line, size, bold, 0)
+                x += width
+            self.y = top - height
+            self._rule(self.y, 0.4 if bold else 0.8)
+
+        draw_row([title for title, _ in columns], bold=True)
+        for row in rows:
+            draw_row(row, bold=False)
+
+    def build(self) -> bytes:
+        objects: list[bytes] = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"",  # page tree, filled in once page object numbers are known
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        ]
+        kids = []
+        for operations in self.pages:
+            stream = zlib.compress(b"\n".join(operations), 6)
+            objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                % (PAGE_WIDTH, PAGE_HEIGHT, len(objects))
+            )
+            kids.append(b"%d 0 R" % len(objects))
+        objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(out)
+
+
+def _lab_result(lab: dict[str, Any]) -> str:
+    value = lab.get("valor_num")
+    if value is None:
+        return lab.get("valor_texto") or ""
+    text = str(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+def render_consultation(payload: dict[str, Any]) -> bytes:
+    """Lay out a ConsultationPrintOut dumped in JSON mode.
+
+    Runs in the PDF pool; takes plain data so the worker never needs the
+    schemas or the database.
+    """
+    patient = payload["patient"]
+    consultation = payload["consultation"]
+    doc = Document()
+    doc.paragraph("Consulta Clinica", size=18, bold=True)
+    doc.paragraph(f"Fecha: {consultation['created_at'][:10]}", size=9, gray=0.4)
+
+    doc.heading("Paciente")
+    doc.paragraph(f"{patient['nombres']} {patient['apellidos']} - Cedula: {patient['cedula']}")
+    doc.paragraph(f"Fecha de nacimiento: {patient['fecha_nacimiento']}")
+
+    doc.heading("Consulta")
+    doc.paragraph(f"Diagnostico: {consultation.get('diagnosis') or ''}")
+    doc.paragraph(f"Notas: {consultation.get('notes') or ''}")
+    doc.paragraph(f"Indicaciones: {consultation.get('indications') or ''}")
+
+    doc.heading("Medicamentos")
+    doc.table(
+        [("Medicamento", 0.3), ("Cantidad", 0.12), ("Descripcion", 0.43), ("Duracion (dias)", 0.15)],
+        [
+            [
+                med["drug_name"],
+                "" if med.get("quantity") is None else str(med["quantity"]),
+                med.get("description") or "",
+                "" if med.get("duration_days") is None else str(med["duration_days"]),
+            ]
+            for med in payload["medications"]
+        ],
+    )
+
+    if payload["labs"]:
+        doc.heading("Laboratorios")
+        doc.table(
+            [("Examen", 0.34), ("Resultado", 0.2), ("Unidad", 0.16), ("Referencia", 0.3)],
+            [
+                [
+                    lab["lab_nombre"],
+                    _lab_result(lab),
+                    lab.get("unidad_snapshot") or "",
+                    lab.get("rango_ref_snapshot") or "",
+                ]
+                for lab in payload["labs"]
+            ],
+        )
+    return doc.build()
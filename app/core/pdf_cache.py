@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.core.executor import BoundedExecutor
+from app.core.pdf import LAYOUT_VERSION, render_consultation
+
+
+def payload_key(data: dict[str, Any]) -> str:
+    """Content hash of a dumped print payload; identical reprints share one file."""
+    body = orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(b"layout-%d\n" % LAYOUT_VERSION + body).hexdigest()
+
+
+class PdfCache:
+    """Rendered PDFs on local disk, one file per payload hash.
+
+    Files are written under a temporary name and renamed into place, so a
+    concurrent render of the same payload (in this or another web worker)
+    never exposes a partial file. Past max_entries the least recently used
+    files go first; a hit refreshes the file's mtime.
+    """
+
+    def __init__(self, directory: str | os.PathLike, max_entries: int = 5000) -> None:
+        self.directory = Path(directory)
+        self.max_entries = max(int(max_entries), 1)
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evicted = 0
+        self.bytes_written = 0
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.pdf"
+
+    def get(self, key: str) -> bytes | None:
+        path = self.path(key)
+        try:
+            body = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:  # pruned meanwhile; the bytes are still good
+            pass
+        with self._lock:
+            self.hits += 1
+        return body
+
+    def put(self, key: str, body: bytes) -> None:
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(body)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self.writes += 1
+            self.bytes_written += len(body)
+            self._writes_since_prune += 1
+            # Scanning the tree is O(entries), so only do it every tenth of the cap.
+            due = self._writes_since_prune >= max(self.max_entries // 10, 1)
+            if due:
+                self._writes_since_prune = 0
+        if due:
+            self.prune()
+
+    def prune(self) -> int:
+        entries = []
+        for path in self.directory.glob("*/*.pdf"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return 0
+        entries.sort()
+        for _, path in entries[:excess]:
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self.evicted += excess
+        return excess
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "directory": str(self.directory),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evicted": self.evicted,
+                "bytes_written": self.bytes_written,
+            }
+
+
+_pdf_cache: PdfCache | None = None
+_pdf_executor: BoundedExecutor | None = None
+
+
+def get_pdf_cache() -> PdfCache:
+    global _pdf_cache
+    if _pdf_cache is None:
+        directory = settings.PDF_CACHE_DIR or Path(tempfile.gettempdir()) / "consultation-pdf"
+        _pdf_cache = PdfCache(directory, settings.PDF_CACHE_MAX_ENTRIES)
+    return _pdf_cache
+
+
+def get_pdf_executor() -> BoundedExecutor:
+    global _pdf_executor
+    if _pdf_executor is None:
+        _pdf_executor = BoundedExecutor(
+            "pdf",
+            kind=settings.PDF_EXECUTOR_KIND,
+            max_workers=settings.PDF_EXECUTOR_WORKERS,
+            max_queue=settings.PDF_EXECUTOR_MAX_QUEUE,
+            timeout=settings.PDF_EXECUTOR_TIMEOUT_SECONDS,
+        )
+    return _pdf_executor
+
+
+def shutdown_pdf_executor() -> None:
+    global _pdf_executor
+    if _pdf_executor is not None:
+        _pdf_executor.shutdown()
+        _pdf_executor = None
+
+
+async def consultation_pdf(payload: BaseModel) -> bytes:
+    """PDF for a ConsultationPrintOut, from disk when this payload was rendered before.
+
+    Layout runs in the PDF pool (processes by default), so it never holds the
+    event loop or the GIL of the web worker; file I/O goes to a thread.
+    """
+    cache = get_pdf_cache()
+    data = payload.model_dump(mode="json")
+    key = payload_key(data)
+    body = await asyncio.to_thread(cache.get, key)
+    if body is None:
+        body = await get_pdf_executor().run_async(render_consultation, data)
+        await asyncio.to_thread(cache.put, key, body)
+    return body
+
+
+def pdf_stats() -> dict[str, Any]:
+    return {"cache": get_pdf_cache().stats(), "executor": get_pdf_executor().stats()}
@@ -0,0 +1,248 @@
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    """Per-process sliding windows, bounded to ``max_keys`` identifiers and IPs.
+
+    Past the bound, keys whose window has expired are swept first and then the
+    least recently attempted keys are dropped, so spraying random identifiers
+    costs memory only up to the bound.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = 10000) -> None:
+        self._events: OrderedDict[str, deque[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_keys = max(int(max_keys), 1)
+        self.evicted = 0
+
+    def _prune(self, key: str, window: float, now: float) -> deque[float] | None:
+        events = self._events.get(key)
+        if events is None:
+            return None
+        while events and events[0] <= now - window:
+            events.popleft()
+        if not events:
+            del self._events[key]
+            return None
+        return events
+
+    def _evict(self, window: float, now: float) -> None:
+        # Keys are kept in order of their last attempt, so expired ones lead.
+        while self._events and next(iter(self._events.values()))[-1] <= now - window:
+            self._events.popitem(last=False)
+        while len(self._events) > self.max_keys:
+            self._events.popitem(last=False)
+            self.evicted += 1
+
+    def acquire(self, limits: list[tuple[str, int]], window: float) -> tuple[float | None, float]:
+        """Count one attempt on every key unless one is at its limit.
+
+        Returns (token, 0) when counted, or (None, seconds until a slot frees).
+        Check and add happen under one lock, so parallel attempts cannot all
+        see the same count.
+        """
+        now = time.time()
+        with self._lock:
+            retry_after = 0.0
+            for key, limit in limits:
+                events = self._prune(key, window, now)
+                if events and len(events) >= limit:
+                    retry_after = max(retry_after, events[0] + window - now)
+            if retry_after > 0:
+                return None, retry_after
+            for key, _ in limits:
+                events = self._events.get(key)
+                if events is None:
+                    events = self._events[key] = deque()
+                else:
+                    self._events.move_to_end(key)
+                events.append(now)
+            if len(self._events) > self.max_keys:
+                self._evict(window, now)
+        return now, 0.0
+
+    def release(self, key: str, token: float) -> None:
+        with self._lock:
+            events = self._events.get(key)
+            if events is not None and token in events:
+                events.remove(token)
+                if not events:
+                    del self._events[key]
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._events.pop(key, None)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"keys": len(self._events), "keys_evicted": self.evicted}
+
+
+class RedisBackend:
+    name = "redis"
+
+    def __init__(self, url: str) -> None:
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("LOGIN_THROTTLE_REDIS_URL is set but the redis package is not installed") from exc
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def acquire(self, limits: list[tuple[str, int]], window: float) -> tuple[str | None, float]:
+        # Add first, then count, in one MULTI: every attempt sees the ones
+        # before it. Attempts over the limit take their entry back out.
+        now = time.time()
+        token = f"{now}:{uuid.uuid4().hex}"
+        pipe = self._client.pipeline(transaction=True)
+        for key, _ in limits:
+            pipe.zremrangebyscore(key, 0, now - window)
+            pipe.zadd(key, {token: now})
+            pipe.zcard(key)
+            pipe.zrange(key, 0, 0, withscores=True)
+            pipe.expire(key, int(math.ceil(window)))
+        replies = pipe.execute()
+        retry_after = 0.0
+        for index, (_, limit) in enumerate(limits):
+            _, _, count, oldest, _ = replies[index * 5 : index * 5 + 5]
+            if int(count) > limit:
+                retry_after = max(retry_after, (oldest[0][1] if oldest else now) + window - now)
+        if retry_after > 0:
+            pipe = self._client.pipeline(transaction=True)
+            for key, _ in limits:
+                pipe.zrem(key, token)
+            pipe.execute()
+            return None, retry_after
+        return token, 0.0
+
+    def release(self, key: str, token: str) -> None:
+        self._client.zrem(key, token)
+
+    def reset(self, key: str) -> None:
+        self._client.delete(key)
+
+    def stats(self) -> dict[str, Any]:
+        return {}
+
+
+class LoginThrottle:
+    def __init__(
+        self,
+        backend,
+        window_seconds: float,
+        max_per_identifier: int,
+        max_per_ip: int,
+    ) -> None:
+        self.backend = backend
+        self.window = float(window_seconds)
+        self.max_per_identifier = int(max_per_identifier)
+        self.max_per_ip = int(max_per_ip)
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.rejected = 0
+        self.failures = 0
+        self.backend_errors = 0
+
+    @staticmethod
+    def _identifier_key(identifier: str) -> str:
+        return f"login-throttle:id:{(identifier or '').strip().lower()}"
+
+    @staticmethod
+    def _ip_key(client_ip: str) -> str:
+        return f"login-throttle:ip:{client_ip}"
+
+    def _incr(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def check(self, identifier: str, client_ip: str) -> Any:
+        """Count this attempt against both keys, or raise 429 before any password check.
+
+        Counting happens here rather than after a failed verify, so a burst of
+        parallel guesses is cut off at the limit instead of all reaching
+        bcrypt. Pass the returned token to record_success.
+        """
+        self._incr("checks")
+        limits = [
+            (key, limit)
+            for key, limit in (
+                (self._identifier_key(identifier), self.max_per_identifier),
+                (self._ip_key(client_ip), self.max_per_ip),
+            )
+            if limit > 0
+        ]
+        if not limits:
+            return None
+        try:
+            token, retry_after = self.backend.acquire(limits, self.window)
+        except Exception:
+            self._incr("backend_errors")
+            logger.warning("Login throttle backend unavailable; allowing attempt", exc_info=True)
+            return None
+        if token is None:
+            self._incr("rejected")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many login attempts, try again later",
+                headers={"Retry-After": str(max(int(math.ceil(retry_after)), 1))},
+            )
+        return token
+
+    def record_failure(self, identifier: str, client_ip: str) -> None:
+        # The attempt was already counted by check(); this only feeds stats.
+        self._incr("failures")
+
+    def record_success(self, identifier: str, client_ip: str, token: Any) -> None:
+        """Clear the identifier's window and give the attempt back to the IP."""
+        try:
+            self.backend.reset(self._identifier_key(identifier))
+            if token is not None and self.max_per_ip > 0:
+                self.backend.release(self._ip_key(client_ip), token)
+        except Exception:
+            self._incr("backend_errors")
+            logger.warning("Login throttle backend unavailable; reset skipped", exc_info=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "backend": self.backend.name,
+            "window_seconds": self.window,
+            "max_per_identifier": self.max_per_identifier,
+            "max_per_ip": self.max_per_ip,
+            "checks": self.checks,
+            "verifications_avoided": self.rejected,
+            "failures_recorded": self.failures,
+            "backend_errors": self.backend_errors,
+            **self.backend.stats(),
+        }
+
+
+_login_throttle: LoginThrottle | None = None
+
+
+def get_login_throttle() -> LoginThrottle:
+    global _login_throttle
+    if _login_throttle is None:
+        if settings.LOGIN_THROTTLE_REDIS_URL:
+            backend = RedisBackend(settings.LOGIN_THROTTLE_REDIS_URL)
+        else:
+            backend = MemoryBackend(settings.LOGIN_THROTTLE_MEMORY_MAX_KEYS)
+        _login_throttle = LoginThrottle(
+            backend,
+            window_seconds=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+            max_per_identifier=settings.LOGIN_THROTTLE_MAX_PER_IDENTIFIER,
+            max_per_ip=settings.LOGIN_THROTTLE_MAX_PER_IP,
+        )
+    return _login_throttle
@@ -0,0 +1,4 @@
+# Alembic head this build ships with. The boot fast path compares it with
+# alembic_version instead of loading the revision graph; bump it together
+# with every new migration (tests/test_boot.py checks they agree).
+SCHEMA_HEAD = "e1a7c3f5b9d2"
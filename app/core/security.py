@@ -1,28 +1,121 @@
+import statistics
+import time
 from datetime import datetime, timedelta
-from typing import Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
 from jose import jwt
-from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.executor import BoundedExecutor
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
 
 SECRET_KEY = "CHANGE_ME_LATER"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt_sha256", "bcrypt"], deprecated="auto")
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+
+
+def _build_pwd_context(rounds: int | None = None) -> "CryptContext":
+    # passlib is only needed once a password is hashed or checked, so keep it
+    # out of the boot import chain.
+    from passlib.context import CryptContext
+
+    # Pinning min and max to the configured cost makes verify_and_update
+    # rehash on login in both directions: weaker hashes are upgraded and,
+    # after BCRYPT_ROUNDS is lowered, costlier ones are brought back down.
+    options: dict[str, Any] = {}
+    if rounds is not None:
+        options["bcrypt_sha256__default_rounds"] = rounds
+        options["bcrypt_sha256__min_rounds"] = rounds
+        options["bcrypt_sha256__max_rounds"] = rounds
+    return CryptContext(schemes=["bcrypt_sha256", "bcrypt"], deprecated="auto", **options)
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context() -> "CryptContext":
+    return _build_pwd_context(settings.BCRYPT_ROUNDS)
+
+_hashing_executor: BoundedExecutor | None = None
+
+
+def get_hashing_executor() -> BoundedExecutor:
+    global _hashing_executor
+    if _hashing_executor is None:
+        _hashing_executor = BoundedExecutor(
+            "hashing",
+            kind=settings.HASH_EXECUTOR_KIND,
+            max_workers=settings.HASH_EXECUTOR_WORKERS,
+            max_queue=settings.HASH_EXECUTOR_MAX_QUEUE,
+            timeout=settings.HASH_EXECUTOR_TIMEOUT_SECONDS,
+        )
+    return _hashing_executor
+
+
+def shutdown_hashing_executor() -> None:
+    global _hashing_executor
+    if _hashing_executor is not None:
+        _hashing_executor.shutdown()
+        _hashing_executor = None
 
 
 def _normalize_password(password: str) -> str:
     return password.strip()
 
 
+def _hash_password(password: str) -> str:
+    return get_pwd_context().hash(password)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def _verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(_normalize_password(password))
+    return get_hashing_executor().run(_hash_password, _normalize_password(password))
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(_normalize_password(plain_password), hashed_password)
+    return get_hashing_executor().run(
+        _verify_password, _normalize_password(plain_password), hashed_password
+    )
+
+
+def verify_password_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return get_hashing_executor().run(
+        _verify_and_update_password, _normalize_password(plain_password), hashed_password
+    )
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int = MIN_BCRYPT_ROUNDS,
+    max_rounds: int = MAX_BCRYPT_ROUNDS,
+    samples: int = 3,
+) -> tuple[int, dict[int, float]]:
+    timings: dict[int, float] = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        context = _build_pwd_context(rounds)
+        hashed = context.hash("calibration-password")
+        durations = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            context.verify("calibration-password", hashed)
+            durations.append((time.perf_counter() - started) * 1000)
+        timings[rounds] = statistics.median(durations)
+        if timings[rounds] > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
 
 
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
@@ -0,0 +1,83 @@
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+try:
+    import msgpack
+except ImportError:  # optional: without it every client gets JSON
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_ALIASES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+
+def _accept_quality(accept: str, media_types: tuple[str, ...]) -> float:
+    quality = 0.0
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        if media_type.strip().lower() not in media_types:
+            continue
+        value = 1.0
+        for param in params.split(";"):
+            key, _, raw = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    value = float(raw)
+                except ValueError:
+                    value = 0.0
+        quality = max(quality, value)
+    return quality
+
+
+def response_media_type(request: Request) -> str:
+    """application/msgpack when the client prefers it and msgpack is installed."""
+    accept = request.headers.get("accept")
+    if msgpack is None or not accept:
+        return JSON_MEDIA_TYPE
+    wanted = _accept_quality(accept, _MSGPACK_ALIASES)
+    # JSON wins ties, so "*/*" or an unqualified list keeps the default.
+    if wanted > 0 and wanted > _accept_quality(accept, (JSON_MEDIA_TYPE, "application/*", "*/*")):
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def _dump(value: Any, mode: str) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode=mode)
+    if isinstance(value, list):
+        return [_dump(item, mode) for item in value]
+    if isinstance(value, dict):
+        return {key: _dump(item, mode) for key, item in value.items()}
+    return value
+
+
+def encode(value: Any, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    """Serialize already-validated output models in one pass.
+
+    JSON hands datetimes and UUIDs to orjson natively; OPT_UTC_Z keeps the
+    "Z" suffix pydantic writes for UTC, so output matches the response_model
+    path byte for byte on these schemas, except that floats in exponent form
+    lose the padded zero (1e-7, not 1e-07). msgpack has no datetime/UUID
+    types, so it gets pydantic's JSON-mode strings.
+    """
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(_dump(value, "json"))
+    return orjson.dumps(_dump(value, "python"), option=orjson.OPT_UTC_Z)
+
+
+def render(request: Request, value: Any, status_code: int = 200, headers: dict | None = None) -> Response:
+    """Response for hot endpoints that skips FastAPI's response_model pass.
+
+    ``value`` must already be output models (or lists/dicts of them); the
+    route keeps ``response_model`` for the OpenAPI schema only.
+    """
+    media_type = response_media_type(request)
+    return Response(
+        content=encode(value, media_type),
+        status_code=status_code,
+        media_type=media_type,
+        headers={**(headers or {}), "Vary": "Accept"},
+    )
@@ -0,0 +1,190 @@
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class QueryStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.slow = 0
+        self.statements: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed_ms: float, slow: bool) -> None:
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.statements[statement] += 1
+            if slow:
+                self.slow += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        with self._lock:
+            return [(sql, n) for sql, n in self.statements.most_common() if n >= threshold]
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class SQLMetrics:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.queries = 0
+        self.slow_queries = 0
+        self.n_plus_one_requests = 0
+        self.queries_per_request = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_ms_per_request = Histogram()
+
+    def observe_request(self, stats: QueryStats, flagged: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.queries += stats.count
+            self.slow_queries += stats.slow
+            if flagged:
+                self.n_plus_one_requests += 1
+        self.queries_per_request.observe(stats.count)
+        self.db_ms_per_request.observe(stats.total_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "slow_queries": self.slow_queries,
+            "n_plus_one_requests": self.n_plus_one_requests,
+            "queries_per_request": self.queries_per_request.snapshot(),
+            "db_ms_per_request": self.db_ms_per_request.snapshot(),
+        }
+
+
+sql_metrics = SQLMetrics()
+
+_request_stats: ContextVar[QueryStats | None] = ContextVar("request_query_stats", default=None)
+_captures: list[QueryStats] = []
+_captures_lock = threading.Lock()
+
+
+def redact_params(parameters: Any) -> Any:
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"<{len(parameters)} parameter sets>"
+        return tuple(f"<{type(value).__name__}>" for value in parameters)
+    return parameters
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    context._stats_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started_at = getattr(context, "_stats_started_at", None)
+    if started_at is None:
+        return
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+    slow = elapsed_ms >= settings.DB_SLOW_QUERY_MS
+    if slow:
+        logger.warning(
+            "Slow query (%.1f ms): %s params=%s",
+            elapsed_ms,
+            statement,
+            redact_params(parameters),
+        )
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms, slow)
+    if _captures:
+        with _captures_lock:
+            captures = list(_captures)
+        for capture in captures:
+            capture.record(statement, elapsed_ms, slow)
+
+
+def instrument_queries(engine: Engine) -> None:
+    if not settings.DB_STATS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def begin_request() -> tuple[QueryStats, Any]:
+    stats = QueryStats()
+    return stats, _request_stats.set(stats)
+
+
+def end_request(stats: QueryStats, token: Any, label: str) -> None:
+    _request_stats.reset(token)
+    repeated = stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD)
+    for statement, count in repeated:
+        logger.warning("Possible N+1 in %s: %d executions of %s", label, count, statement)
+    sql_metrics.observe_request(stats, bool(repeated))
+
+
+def server_timing(stats: QueryStats) -> str:
+    return f'db;dur={stats.total_ms:.2f};desc="queries={stats.count}"'
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Collect every statement run on any instrumented engine, from any thread."""
+    stats = QueryStats()
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(budget: int) -> Iterator[QueryStats]:
+    with capture_queries() as stats:
+        yield stats
+    if stats.count > budget:
+        listing = "\n".join(f"  {n}x {sql}" for sql, n in stats.statements.most_common())
+        raise QueryBudgetExceeded(f"{stats.count} queries executed, budget is {budget}:\n{listing}")
+
+
+class SQLStatsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.DB_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = begin_request()
+        started_at = time.perf_counter()
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start":
+                total_ms = (time.perf_counter() - started_at) * 1000
+                headers = list(message.get("headers", []))
+                value = f"{server_timing(stats)}, app;dur={total_ms:.2f}"
+                headers.append((b"server-timing", value.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(stats, token, f"{scope.get('method')} {scope.get('path')}")
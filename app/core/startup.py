@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from sqlalchemy.orm import configure_mappers
+
+from app.core.config import settings
+from app.core.database import get_async_engine, get_engine, get_replica_async_engine
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.phases: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+        self.ready_at: float | None = None
+
+    def record(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            self.phases[name] = round(elapsed_ms, 2)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as exc:
+            self.errors[name] = str(exc)
+            logger.warning("Startup phase %s failed: %s", name, exc)
+        finally:
+            self.record(name, (time.perf_counter() - started) * 1000)
+
+    @property
+    def total_ms(self) -> float:
+        with self._lock:
+            return round(sum(self.phases.values()), 2)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            phases = dict(self.phases)
+            errors = dict(self.errors)
+        return {
+            "phases_ms": phases,
+            "total_ms": round(sum(phases.values()), 2),
+            "budget_ms": settings.STARTUP_BUDGET_MS,
+            "ready": self.ready_at is not None,
+            "errors": errors,
+        }
+
+
+startup_report = StartupReport()
+
+
+def _warm_sync_pool(engine, connections: int) -> int:
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
+
+
+async def _warm_async_pool(engine, connections: int) -> int:
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(connections)), return_exceptions=True
+    )
+    opened = [conn for conn in results if not isinstance(conn, BaseException)]
+    for conn in opened:
+        await conn.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return len(opened)
+
+
+async def warm_up(report: StartupReport = startup_report) -> StartupReport:
+    with report.phase("configure_mappers"):
+        configure_mappers()
+
+    connections = min(settings.DB_POOL_WARM_CONNECTIONS, settings.DB_POOL_SIZE)
+    engine = get_engine()
+    if engine is not None and connections > 0:
+        with report.phase("warm_pool_primary"):
+            await asyncio.to_thread(_warm_sync_pool, engine, connections)
+
+    for name, async_engine in (
+        ("warm_pool_primary_async", get_async_engine()),
+        ("warm_pool_replica_async", get_replica_async_engine()),
+    ):
+        if async_engine is not None and connections > 0:
+            with report.phase(name):
+                await _warm_async_pool(async_engine, connections)
+
+    report.ready_at = time.time()
+    level = logging.WARNING if report.total_ms > settings.STARTUP_BUDGET_MS else logging.INFO
+    logger.log(
+        level,
+        "Startup ready in %.1f ms (budget %.0f ms): %s",
+        report.total_ms,
+        settings.STARTUP_BUDGET_MS,
+        report.phases,
+    )
+    return report
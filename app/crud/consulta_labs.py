@@ -1,25 +1,46 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session, joinedload
 
+from app.crud import consultations as consultation_crud
 from app.models.consulta_lab import ConsultaLab
 
 
 def list_by_consulta(db: Session, consulta_id: str) -> list[ConsultaLab]:
     return (
         db.query(ConsultaLab)
+        .options(joinedload(ConsultaLab.lab))
         .filter(ConsultaLab.consulta_id == consulta_id)
         .order_by(ConsultaLab.creado_en.asc())
         .all()
     )
 
 
-def delete_by_consulta(db: Session, consulta_id: str) -> None:
-    db.query(ConsultaLab).filter(ConsultaLab.consulta_id == consulta_id).delete()
-    db.commit()
+def replace_for_consulta(db: Session, consulta_id, rows: list[dict]) -> list:
+    """Swap a consulta's lab results in one transaction.
 
-
-def create_many(db: Session, items: list[ConsultaLab]) -> list[ConsultaLab]:
-    db.add_all(items)
-    db.commit()
-    for item in items:
-        db.refresh(item)
-    return items
+    Inserts all rows in a single statement and returns the stored columns
+    (including server-side creado_en) in input order, so callers do not
+    need a refresh per row.
+    """
+    try:
+        db.execute(delete(ConsultaLab).where(ConsultaLab.consulta_id == consulta_id))
+        created = []
+        if rows:
+            stmt = insert(ConsultaLab).returning(
+                ConsultaLab.id,
+                ConsultaLab.consulta_id,
+                ConsultaLab.lab_id,
+                ConsultaLab.valor_num,
+                ConsultaLab.valor_texto,
+                ConsultaLab.unidad_snapshot,
+                ConsultaLab.rango_ref_snapshot,
+                ConsultaLab.creado_en,
+                sort_by_parameter_order=True,
+            )
+            created = db.execute(stmt, rows).all()
+        consultation_crud.touch(db, consulta_id)
+        db.commit()
+        return created
+    except Exception:
+        db.rollback()
+        raise
@@ -1,31 +1,65 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
+from app.core.pagination import Keyset, Page, page_size
 from app.models.consulta import Consulta
 from app.models.medicamento import Medicamento
 
+CONSULTA_KEYSET = Keyset(Consulta.fecha, Consulta.id, descending=True)
 
-def list_by_patient_user(db: Session, patient_user_id: str) -> list[Consulta]:
-    return (
-        db.query(Consulta)
-        .filter(Consulta.patient_user_id == patient_user_id)
-        .order_by(Consulta.fecha.desc())
-        .all()
-    )
 
+# Loader options for responses that render ConsultaOut.
+WITH_MEDICAMENTOS = (selectinload(Consulta.medicamentos),)
 
-def get(db: Session, consulta_id: str) -> Consulta | None:
-    return db.query(Consulta).filter(Consulta.id == consulta_id).first()
+
+def list_by_patient_user(
+    db: Session, patient_user_id: str, cursor: str | None = None, limit: int | None = None
+) -> Page[Consulta]:
+    limit = page_size(limit)
+    query = db.query(Consulta).filter(Consulta.patient_user_id == patient_user_id)
+    return CONSULTA_KEYSET.page(CONSULTA_KEYSET.apply(query, cursor, limit).all(), limit)
+
+
+def get(db: Session, consulta_id: str, options=WITH_MEDICAMENTOS) -> Consulta | None:
+    return db.query(Consulta).options(*options).filter(Consulta.id == consulta_id).first()
 
 
 def get_latest_by_patient(db: Session, patient_user_id: str) -> Consulta | None:
     return (
         db.query(Consulta)
+        .options(*WITH_MEDICAMENTOS)
         .filter(Consulta.patient_user_id == patient_user_id)
         .order_by(Consulta.fecha.desc())
         .first()
     )
 
 
+async def list_by_patient_user_async(
+    db: AsyncSession, patient_user_id: str, cursor: str | None = None, limit: int | None = None
+) -> Page[Consulta]:
+    limit = page_size(limit)
+    stmt = select(Consulta).where(Consulta.patient_user_id == patient_user_id)
+    result = await db.scalars(CONSULTA_KEYSET.apply(stmt, cursor, limit))
+    return CONSULTA_KEYSET.page(result.all(), limit)
+
+
+async def get_async(db: AsyncSession, consulta_id: str) -> Consulta | None:
+    return await db.scalar(
+        select(Consulta).options(*WITH_MEDICAMENTOS).where(Consulta.id == consulta_id)
+    )
+
+
+async def get_latest_by_patient_async(db: AsyncSession, patient_user_id: str) -> Consulta | None:
+    return await db.scalar(
+        select(Consulta)
+        .options(*WITH_MEDICAMENTOS)
+        .where(Consulta.patient_user_id == patient_user_id)
+        .order_by(Consulta.fecha.desc())
+        .limit(1)
+    )
+
+
 def create(db: Session, patient_user_id: str, admin_user_id: str, data) -> Consulta:
     consulta = Consulta(
         patient_user_id=patient_user_id,
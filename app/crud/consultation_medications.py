@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 
+from app.crud import consultations as consultation_crud
 from app.models.consultation_medication import Medication
 
 
@@ -45,6 +46,7 @@ def create_many(db: Session, consultation_id: str, items) -> list[Medication]:
             )
         )
     db.add_all(created)
+    consultation_crud.touch(db, consultation_id)
     db.commit()
     for med in created:
         db.refresh(med)
@@ -66,6 +68,7 @@ def update(db: Session, medication: Medication, data) -> Medication:
     if any(key in payload for key in ("drug_name", "quantity", "duration_days", "description")):
         medication.route = None
         medication.frequency = None
+    consultation_crud.touch(db, medication.consultation_id)
     db.commit()
     db.refresh(medication)
     return medication
@@ -73,4 +76,5 @@ def update(db: Session, medication: Medication, data) -> Medication:
 
 def delete(db: Session, medication: Medication) -> None:
     db.delete(medication)
+    consultation_crud.touch(db, medication.consultation_id)
     db.commit()
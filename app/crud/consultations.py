@@ -1,11 +1,17 @@
 import logging
 from datetime import date, datetime, time
 
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 
+from app.core.pagination import Keyset, Page, page_size
+from app.crud import patient_summaries as patient_summary_crud
+from app.models.consulta_lab import ConsultaLab
 from app.models.consultation import Consultation
 from app.models.consultation_medication import Medication
+from app.models.patient_summary import PatientSummary
 
 logger = logging.getLogger(__name__)
 
@@ -43,28 +49,120 @@ def _normalize_fecha(value) -> datetime | None:
     return None
 
 
-def list_by_patient(db: Session, patient_id: str) -> list[Consultation]:
+# Loader options per read path. Each tuple loads everything the matching
+# response model touches, so the query count does not grow with the number
+# of consultations, medications or labs.
+WITH_MEDICATIONS = (selectinload(Consultation.medications),)
+FOR_PRINT = (
+    joinedload(Consultation.patient),
+    selectinload(Consultation.medications),
+    selectinload(Consultation.labs).joinedload(ConsultaLab.lab),
+)
+
+CONSULTATION_KEYSET = Keyset(Consultation.created_at, Consultation.id, descending=True)
+
+
+def list_by_patient(
+    db: Session,
+    patient_id: str,
+    cursor: str | None = None,
+    limit: int | None = None,
+    options=WITH_MEDICATIONS,
+) -> Page[Consultation]:
+    limit = page_size(limit)
+    query = db.query(Consultation).options(*options).filter(Consultation.patient_id == patient_id)
+    return CONSULTATION_KEYSET.page(CONSULTATION_KEYSET.apply(query, cursor, limit).all(), limit)
+
+
+def get(db: Session, consultation_id: str, options=()) -> Consultation | None:
+    return db.query(Consultation).options(*options).filter(Consultation.id == consultation_id).first()
+
+
+def _latest_via_summary(patient_id):
+    # patient_summary already points at the latest consultation, so this is a
+    # primary-key join instead of a per-patient sort.
     return (
-        db.query(Consultation)
-        .filter(Consultation.patient_id == patient_id)
-        .order_by(Consultation.created_at.desc())
-        .all()
+        select(Consultation)
+        .join(PatientSummary, PatientSummary.latest_consultation_id == Consultation.id)
+        .where(PatientSummary.patient_id == patient_id)
     )
 
 
-def get(db: Session, consultation_id: str) -> Consultation | None:
-    return db.query(Consultation).filter(Consultation.id == consultation_id).first()
+def get_latest_by_patient(db: Session, patient_id: str, options=WITH_MEDICATIONS) -> Consultation | None:
+    return db.scalar(_latest_via_summary(patient_id).options(*options))
 
 
-def get_latest_by_patient(db: Session, patient_id: str) -> Consultation | None:
-    return (
-        db.query(Consultation)
-        .filter(Consultation.patient_id == patient_id)
-        .order_by(Consultation.created_at.desc())
-        .first()
+async def list_by_patient_async(
+    db: AsyncSession, patient_id: str, cursor: str | None = None, limit: int | None = None
+) -> Page[Consultation]:
+    limit = page_size(limit)
+    stmt = select(Consultation).options(*WITH_MEDICATIONS).where(Consultation.patient_id == patient_id)
+    result = await db.scalars(CONSULTATION_KEYSET.apply(stmt, cursor, limit))
+    return CONSULTATION_KEYSET.page(result.all(), limit)
+
+
+async def get_async(db: AsyncSession, consultation_id: str, options=WITH_MEDICATIONS) -> Consultation | None:
+    return await db.scalar(select(Consultation).options(*options).where(Consultation.id == consultation_id))
+
+
+async def get_latest_by_patient_async(db: AsyncSession, patient_id: str) -> Consultation | None:
+    return await db.scalar(_latest_via_summary(patient_id).options(*WITH_MEDICATIONS))
+
+
+async def get_for_print_async(db: AsyncSession, consultation_id: str) -> Consultation | None:
+    return await get_async(db, consultation_id, options=FOR_PRINT)
+
+
+async def get_version_async(db: AsyncSession, consultation_id: str):
+    """(patient_id, version, updated_at) of one consultation, or None.
+
+    Enough to authorise a read and answer a conditional request without
+    loading the consultation graph.
+    """
+    result = await db.execute(
+        select(Consultation.patient_id, Consultation.version, Consultation.updated_at).where(
+            Consultation.id == consultation_id
+        )
+    )
+    return result.first()
+
+
+async def list_versions_async(
+    db: AsyncSession, patient_id: str, cursor: str | None = None, limit: int | None = None
+) -> Page:
+    """The page list_by_patient_async would return, as (id, created_at, version, updated_at) rows."""
+    limit = page_size(limit)
+    stmt = select(
+        Consultation.id, Consultation.created_at, Consultation.version, Consultation.updated_at
+    ).where(Consultation.patient_id == patient_id)
+    result = await db.execute(CONSULTATION_KEYSET.apply(stmt, cursor, limit))
+    return CONSULTATION_KEYSET.page(result.all(), limit)
+
+
+def _touch(db: Session, condition) -> None:
+    db.execute(
+        update(Consultation)
+        .where(condition)
+        .values(version=Consultation.version + 1, updated_at=func.now())
+        .execution_options(synchronize_session=False)
     )
 
 
+def touch(db: Session, consultation_id) -> None:
+    """Mark a consultation changed; call inside the writing transaction."""
+    _touch(db, Consultation.id == consultation_id)
+
+
+def touch_patient(db: Session, patient_id) -> None:
+    """Patient fields appear in the print view of every consultation."""
+    _touch(db, Consultation.patient_id == patient_id)
+
+
+def touch_lab(db: Session, lab_id) -> None:
+    """Catalog lab names appear in the print view of consultations using them."""
+    _touch(db, Consultation.id.in_(select(ConsultaLab.consulta_id).where(ConsultaLab.lab_id == lab_id)))
+
+
 def create(db: Session, patient_id: str, data) -> Consultation:
     try:
         created_at = _normalize_fecha(getattr(data, "fecha", None))
@@ -96,6 +194,7 @@ def create(db: Session, patient_id: str, data) -> Consultation:
                 )
             )
 
+        patient_summary_crud.record_consultation(db, consultation.id)
         logger.info("Committing consultation %s", consultation.id)
         db.commit()
         db.refresh(consultation)
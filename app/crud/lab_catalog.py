@@ -1,7 +1,18 @@
-from sqlalchemy import func
+import hashlib
+import json
+import threading
+import uuid
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud import consultations as consultation_crud
 from app.models.catalog_lab import CatalogLab
+from app.schemas.lab_catalog import CatalogLabOut
 
 
 def list_catalog(db: Session) -> list[CatalogLab]:
@@ -46,6 +57,156 @@ def find_by_name_contains(db: Session, nombre: str) -> CatalogLab | None:
     )
 
 
+class CatalogIndex:
+    """In-memory lab lookup with the same precedence as resolving one
+    identifier through get, get_by_name_normalized and find_by_name_contains.
+
+    ``rows`` must be ordered by nombre, which decides ties for the
+    normalized-name and substring matches just as the SQL versions do.
+    """
+
+    def __init__(self, rows) -> None:
+        self._rows = list(rows)
+        self._by_id = {str(row.id): row for row in self._rows}
+        self._by_name: dict = {}
+        for row in self._rows:
+            self._by_name.setdefault(row.nombre.lower(), row)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def resolve(self, identifier: str):
+        try:
+            row = self._by_id.get(str(uuid.UUID(identifier)))
+        except ValueError:
+            row = None
+        if row is not None:
+            return row
+        lowered = _normalize_name(identifier).lower()
+        if not lowered:
+            return None
+        row = self._by_name.get(lowered)
+        if row is not None:
+            return row
+        return next((row for row in self._rows if lowered in row.nombre.lower()), None)
+
+
+_SNAPSHOT_SQL = select(
+    CatalogLab.id,
+    CatalogLab.nombre,
+    CatalogLab.unidad,
+    CatalogLab.rango_ref_min,
+    CatalogLab.rango_ref_max,
+    CatalogLab.categoria,
+    CatalogLab.orden,
+    CatalogLab.activo,
+).order_by(CatalogLab.nombre.asc())
+
+
+def _render(items: list[dict]) -> tuple[bytes, str]:
+    # Same rendering as fastapi's JSONResponse, so cached bytes match what the
+    # endpoints used to return.
+    body = json.dumps(items, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+    return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Every catalog row, its lookup index and the rendered list responses.
+
+    ``body`` is the ``list[CatalogLabOut]`` shape served by /labs/catalog and
+    /lab-catalog; ``legacy_body`` is the plain dict shape of /labs/catalogo.
+    Both hold active labs only, in (orden, nombre) order.
+    """
+
+    generation: int
+    index: CatalogIndex
+    body: bytes
+    etag: str
+    legacy_body: bytes
+    legacy_etag: str
+
+
+def build_snapshot(rows, generation: int = 0) -> CatalogSnapshot:
+    rows = list(rows)
+    # Stable sort keeps the database's nombre collation order within orden.
+    active = sorted((row for row in rows if row.activo), key=lambda row: row.orden)
+    body, etag = _render(
+        [
+            CatalogLabOut(
+                id=str(row.id),
+                nombre=row.nombre,
+                unidad=row.unidad,
+                rango_ref_min=row.rango_ref_min,
+                rango_ref_max=row.rango_ref_max,
+                activo=bool(row.activo),
+                categoria=row.categoria,
+                orden=row.orden,
+            ).model_dump()
+            for row in active
+        ]
+    )
+    legacy_body, legacy_etag = _render(
+        [
+            {
+                "id": str(row.id),
+                "nombre": row.nombre,
+                "unidad": row.unidad,
+                "rango_ref_min": row.rango_ref_min,
+                "rango_ref_max": row.rango_ref_max,
+                "categoria": row.categoria,
+                "orden": row.orden,
+                "activo": row.activo,
+            }
+            for row in active
+        ]
+    )
+    return CatalogSnapshot(generation, CatalogIndex(rows), body, etag, legacy_body, legacy_etag)
+
+
+# One entry: the current snapshot. Writes in this process drop it at once;
+# other workers pick changes up when the TTL expires.
+snapshot_cache = TTLCache(maxsize=1, ttl=settings.LAB_CATALOG_SNAPSHOT_TTL_SECONDS)
+_generation = 0
+_generation_lock = threading.Lock()
+
+
+def _install(rows, generation: int) -> CatalogSnapshot:
+    snapshot = build_snapshot(rows, generation)
+    with _generation_lock:
+        # A write that landed while we were reading makes these rows stale.
+        if generation == _generation:
+            snapshot_cache.set("snapshot", snapshot)
+    return snapshot
+
+
+def get_snapshot(db: Session, refresh: bool = False) -> CatalogSnapshot:
+    snapshot = None if refresh else snapshot_cache.get("snapshot")
+    if snapshot is not None:
+        return snapshot
+    generation = _generation
+    return _install(db.execute(_SNAPSHOT_SQL).all(), generation)
+
+
+async def get_snapshot_async(db: AsyncSession) -> CatalogSnapshot:
+    snapshot = snapshot_cache.get("snapshot")
+    if snapshot is not None:
+        return snapshot
+    generation = _generation
+    return _install((await db.execute(_SNAPSHOT_SQL)).all(), generation)
+
+
+def invalidate_snapshot() -> None:
+    global _generation
+    with _generation_lock:
+        _generation += 1
+        snapshot_cache.clear()
+
+
+def snapshot_stats() -> dict:
+    return {**snapshot_cache.stats(), "generation": _generation}
+
+
 def create(db: Session, data) -> CatalogLab:
     lab = CatalogLab(
         nombre=data.nombre,
@@ -58,13 +219,18 @@ def create(db: Session, data) -> CatalogLab:
     )
     db.add(lab)
     db.commit()
+    invalidate_snapshot()
     db.refresh(lab)
     return lab
 
 
 def update(db: Session, lab: CatalogLab, data) -> CatalogLab:
-    for field, value in data.model_dump(exclude_unset=True).items():
+    payload = data.model_dump(exclude_unset=True)
+    for field, value in payload.items():
         setattr(lab, field, value)
+    if "nombre" in payload:
+        consultation_crud.touch_lab(db, lab.id)
     db.commit()
+    invalidate_snapshot()
     db.refresh(lab)
     return lab
@@ -1,14 +1,19 @@
 from sqlalchemy.orm import Session
 
+from app.core.pagination import Keyset, Page, page_size
 from app.models.medication import MedicationCatalog
 
+MEDICATION_KEYSET = Keyset(MedicationCatalog.nombre_generico, MedicationCatalog.id)
+
 
 def get(db: Session, med_id: str) -> MedicationCatalog | None:
     return db.query(MedicationCatalog).filter(MedicationCatalog.id == med_id).first()
 
 
-def list_all(db: Session) -> list[MedicationCatalog]:
-    return db.query(MedicationCatalog).order_by(MedicationCatalog.nombre_generico.asc()).all()
+def list_all(db: Session, cursor: str | None = None, limit: int | None = None) -> Page[MedicationCatalog]:
+    limit = page_size(limit)
+    rows = MEDICATION_KEYSET.apply(db.query(MedicationCatalog), cursor, limit).all()
+    return MEDICATION_KEYSET.page(rows, limit)
 
 
 def create(db: Session, data) -> MedicationCatalog:
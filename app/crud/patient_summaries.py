@@ -0,0 +1,81 @@
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.patient_summary import PatientSummary
+
+# Latest means highest (created_at, id), the same order list_by_patient uses.
+_RECORD_CONSULTATION_SQL = text(
+    """
+    insert into patient_summary
+        (patient_id, latest_consultation_id, latest_consultation_at, consultation_count, updated_at)
+    select patient_id, id, created_at, 1, now() from consultations where id = cast(:consultation_id as uuid)
+    on conflict (patient_id) do update set
+        consultation_count = patient_summary.consultation_count + 1,
+        latest_consultation_id = case
+            when patient_summary.latest_consultation_at is null
+              or (excluded.latest_consultation_at, excluded.latest_consultation_id)
+                 > (patient_summary.latest_consultation_at, patient_summary.latest_consultation_id)
+            then excluded.latest_consultation_id
+            else patient_summary.latest_consultation_id
+        end,
+        latest_consultation_at = greatest(excluded.latest_consultation_at, patient_summary.latest_consultation_at),
+        updated_at = now()
+    """
+)
+
+# Recomputes from consultations; :patient_id null means every patient.
+_REBUILD_SQL = text(
+    """
+    insert into patient_summary
+        (patient_id, latest_consultation_id, latest_consultation_at, consultation_count, updated_at)
+    select distinct on (patient_id)
+        patient_id, id, created_at, count(*) over (partition by patient_id), now()
+    from consultations
+    where cast(:patient_id as uuid) is null or patient_id = cast(:patient_id as uuid)
+    order by patient_id, created_at desc, id desc
+    on conflict (patient_id) do update set
+        latest_consultation_id = excluded.latest_consultation_id,
+        latest_consultation_at = excluded.latest_consultation_at,
+        consultation_count = excluded.consultation_count,
+        updated_at = now()
+    """
+)
+
+
+def record_consultation(db: Session, consultation_id) -> None:
+    """Fold a newly flushed consultation into its patient's summary.
+
+    Runs inside the caller's transaction, so the summary commits or rolls
+    back together with the consultation. The upsert takes the summary row
+    lock, which serialises concurrent creates for the same patient.
+    """
+    db.execute(_RECORD_CONSULTATION_SQL, {"consultation_id": str(consultation_id)})
+
+
+def refresh(db: Session, patient_id) -> None:
+    """Recompute one patient's summary from consultations.
+
+    For paths that delete or re-date consultations; none exist yet.
+    """
+    db.execute(_REBUILD_SQL, {"patient_id": str(patient_id)})
+    # Patients left with no consultations keep a zeroed row.
+    db.execute(
+        text(
+            "update patient_summary set latest_consultation_id = null, latest_consultation_at = null,"
+            " consultation_count = 0, updated_at = now()"
+            " where patient_id = cast(:patient_id as uuid)"
+            " and not exists (select 1 from consultations where patient_id = cast(:patient_id as uuid))"
+        ),
+        {"patient_id": str(patient_id)},
+    )
+
+
+def backfill(db: Session) -> int:
+    """Rebuild every summary from consultations; returns rows written."""
+    result = db.execute(_REBUILD_SQL, {"patient_id": None})
+    db.commit()
+    return result.rowcount
+
+
+def get(db: Session, patient_id) -> PatientSummary | None:
+    return db.get(PatientSummary, patient_id)
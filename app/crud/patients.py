@@ -1,23 +1,134 @@
-from sqlalchemy.orm import Session
+import unicodedata
 
+from sqlalchemy import String, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.pagination import Keyset, Page, page_size
 from app.core.security import get_password_hash
+from app.crud import consultations as consultation_crud
 from app.models.patient import Patient
 
+PATIENT_KEYSET = Keyset(Patient.apellidos, Patient.id)
+
+
+SEARCH_TRIGRAM_INDEX = "ix_patients_search_name_trgm"
+# Trigram indexes cannot serve tokens shorter than one trigram.
+SEARCH_TRIGRAM_MIN_TOKEN = 3
+
+# Re-probed after the TTL, so an index built (or dropped) after startup is
+# picked up without a restart.
+trigram_probe_cache = TTLCache(maxsize=1, ttl=settings.PATIENT_SEARCH_TRIGRAM_PROBE_TTL_SECONDS)
+
 
 def normalize_password_seed(apellidos: str, nombres: str) -> str:
     return f"{apellidos}{nombres}".replace(" ", "").lower()
 
 
+def normalize_search_text(value: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def search_name_for(apellidos: str, nombres: str) -> str:
+    return normalize_search_text(f"{apellidos} {nombres}")[:255]
+
+
+def _like_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def _trigram_available(db: AsyncSession) -> bool:
+    # pg_trgm is optional (not every managed Postgres ships it); the migration
+    # only builds the GIN index when the extension could be created.
+    present = trigram_probe_cache.get(SEARCH_TRIGRAM_INDEX)
+    if present is None:
+        present = bool(
+            await db.scalar(
+                text("select exists(select 1 from pg_indexes where indexname = :name)"),
+                {"name": SEARCH_TRIGRAM_INDEX},
+            )
+        )
+        trigram_probe_cache.set(SEARCH_TRIGRAM_INDEX, present)
+    return present
+
+
+_SEARCH_COLUMNS = (
+    Patient.id.cast(String).label("id"),
+    Patient.cedula,
+    Patient.apellidos,
+    Patient.nombres,
+    Patient.fecha_nacimiento,
+    Patient.activo,
+)
+
+
+async def search_async(db: AsyncSession, query: str, limit: int) -> list:
+    """Patients matching ``query``, best matches first.
+
+    Tiers, in order: exact cedula, cedula prefix, prefix of "apellidos
+    nombres", and (with pg_trgm) every query token anywhere in the name, by
+    trigram similarity. Each tier is its own query that walks an index in
+    result order and stops at ``limit``, so a common prefix never sorts the
+    whole match set.
+    """
+    cedula = query.strip()
+    normalized = normalize_search_text(query)
+    tokens = normalized.split()
+    if not tokens:
+        return []
+    # The prefix indexes are built with COLLATE "C", which is what lets
+    # LIKE 'prefix%' and the ORDER BY use them regardless of database locale.
+    cedula_c = Patient.cedula.collate("C")
+    name_c = Patient.search_name.collate("C")
+    tiers = [
+        select(*_SEARCH_COLUMNS).where(Patient.cedula == cedula),
+        select(*_SEARCH_COLUMNS)
+        .where(cedula_c.like(f"{_like_escape(cedula)}%", escape="\\"))
+        .order_by(cedula_c),
+        select(*_SEARCH_COLUMNS)
+        .where(name_c.like(f"{_like_escape(normalized)}%", escape="\\"))
+        .order_by(name_c, Patient.id),
+    ]
+    if max(len(token) for token in tokens) >= SEARCH_TRIGRAM_MIN_TOKEN and await _trigram_available(db):
+        tiers.append(
+            select(*_SEARCH_COLUMNS)
+            .where(*(Patient.search_name.like(f"%{_like_escape(token)}%", escape="\\") for token in tokens))
+            .order_by(func.similarity(Patient.search_name, normalized).desc(), name_c, Patient.id)
+        )
+
+    results, seen = [], set()
+    for stmt in tiers:
+        # Over-fetch by what is already collected, since earlier tiers may repeat.
+        for row in (await db.execute(stmt.limit(limit + len(results)))).mappings():
+            if row["id"] not in seen:
+                seen.add(row["id"])
+                results.append(row)
+        if len(results) >= limit:
+            break
+    return results[:limit]
+
+
 def get_by_cedula(db: Session, cedula: str) -> Patient | None:
     return db.query(Patient).filter(Patient.cedula == cedula).first()
 
 
+async def get_by_cedula_async(db: AsyncSession, cedula: str) -> Patient | None:
+    return await db.scalar(select(Patient).where(Patient.cedula == cedula))
+
+
 def get(db: Session, patient_id: str) -> Patient | None:
     return db.query(Patient).filter(Patient.id == patient_id).first()
 
 
-def list_patients(db: Session) -> list[Patient]:
-    return db.query(Patient).order_by(Patient.apellidos.asc()).all()
+def list_patients(db: Session, cursor: str | None = None, limit: int | None = None) -> Page[Patient]:
+    limit = page_size(limit)
+    query = db.query(Patient).options(joinedload(Patient.summary))
+    rows = PATIENT_KEYSET.apply(query, cursor, limit).all()
+    return PATIENT_KEYSET.page(rows, limit)
 
 
 def create(db: Session, data, password_hash: str | None = None, commit: bool = True) -> Patient:
@@ -30,6 +141,7 @@ def create(db: Session, data, password_hash: str | None = None, commit: bool = T
         email=data.email,
         activo=data.activo,
         password_hash=password_hash or get_password_hash(seed),
+        search_name=search_name_for(data.apellidos, data.nombres),
     )
     db.add(patient)
     if commit:
@@ -43,6 +155,8 @@ def create(db: Session, data, password_hash: str | None = None, commit: bool = T
 def update(db: Session, patient: Patient, data) -> Patient:
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(patient, field, value)
+    patient.search_name = search_name_for(patient.apellidos, patient.nombres)
+    consultation_crud.touch_patient(db, patient.id)
     db.commit()
     db.refresh(patient)
     return patient
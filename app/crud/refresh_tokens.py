@@ -0,0 +1,92 @@
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+
+
+def hash_token(raw_token: str) -> str:
+    return hashlib.sha256(raw_token.encode("utf-8")).hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def issue(db: Session, user_id, family_id=None) -> tuple[str, RefreshToken]:
+    raw_token = secrets.token_urlsafe(48)
+    token = RefreshToken(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        family_id=family_id or uuid.uuid4(),
+        token_hash=hash_token(raw_token),
+        expires_at=_utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+    db.add(token)
+    db.flush()
+    return raw_token, token
+
+
+def get_for_update(db: Session, raw_token: str) -> RefreshToken | None:
+    return (
+        db.query(RefreshToken)
+        .filter(RefreshToken.token_hash == hash_token(raw_token))
+        .with_for_update()
+        .first()
+    )
+
+
+def is_usable(token: RefreshToken) -> bool:
+    return token.revoked_at is None and token.expires_at > _utcnow()
+
+
+def rotate(db: Session, token: RefreshToken) -> tuple[str, RefreshToken]:
+    raw_token, replacement = issue(db, token.user_id, family_id=token.family_id)
+    token.revoked_at = _utcnow()
+    token.replaced_by_id = replacement.id
+    return raw_token, replacement
+
+
+def revoke_family(db: Session, family_id) -> None:
+    db.query(RefreshToken).filter(
+        RefreshToken.family_id == family_id,
+        RefreshToken.revoked_at.is_(None),
+    ).update({RefreshToken.revoked_at: _utcnow()}, synchronize_session=False)
+
+
+def revoke_for_user(db: Session, user_id) -> None:
+    db.query(RefreshToken).filter(
+        RefreshToken.user_id == user_id,
+        RefreshToken.revoked_at.is_(None),
+    ).update({RefreshToken.revoked_at: _utcnow()}, synchronize_session=False)
+
+
+def prune(db: Session) -> int:
+    """Delete rows that can no longer be used or matter for reuse detection.
+
+    Expired tokens go, and so do revoked ones once their family has no usable
+    token left. Rotated tokens of a live family stay until they expire, since
+    presenting one of them is what revokes the family.
+    """
+    now = _utcnow()
+    live_families = select(RefreshToken.family_id).where(
+        RefreshToken.revoked_at.is_(None),
+        RefreshToken.expires_at > now,
+    )
+    deleted = (
+        db.query(RefreshToken)
+        .filter(
+            or_(
+                RefreshToken.expires_at <= now,
+                and_(RefreshToken.revoked_at.is_not(None), RefreshToken.family_id.not_in(live_families)),
+            )
+        )
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+    return deleted
@@ -1,20 +1,50 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
+from app.core.pagination import Keyset, Page, page_size
 from app.models.visit import Visit
 from app.models.prescription import PrescriptionItem
 
+VISIT_KEYSET = Keyset(Visit.fecha_consulta, Visit.id, descending=True)
 
-def list_by_patient(db: Session, patient_id: str) -> list[Visit]:
-    return (
-        db.query(Visit)
-        .filter(Visit.patient_id == patient_id)
-        .order_by(Visit.fecha_consulta.desc())
-        .all()
-    )
+
+# Loader options for responses that render VisitOut (items and their
+# catalog medication names).
+WITH_ITEMS = (selectinload(Visit.items).selectinload(PrescriptionItem.medication),)
+
+
+def list_by_patient(db: Session, patient_id: str, cursor: str | None = None, limit: int | None = None) -> Page[Visit]:
+    limit = page_size(limit)
+    query = db.query(Visit).filter(Visit.patient_id == patient_id)
+    return VISIT_KEYSET.page(VISIT_KEYSET.apply(query, cursor, limit).all(), limit)
+
+
+def get(db: Session, visit_id: str, options=WITH_ITEMS) -> Visit | None:
+    return db.query(Visit).options(*options).filter(Visit.id == visit_id).first()
 
 
-def get(db: Session, visit_id: str) -> Visit | None:
-    return db.query(Visit).filter(Visit.id == visit_id).first()
+async def list_by_patient_async(
+    db: AsyncSession, patient_id: str, cursor: str | None = None, limit: int | None = None
+) -> Page[Visit]:
+    limit = page_size(limit)
+    stmt = select(Visit).where(Visit.patient_id == patient_id)
+    result = await db.scalars(VISIT_KEYSET.apply(stmt, cursor, limit))
+    return VISIT_KEYSET.page(result.all(), limit)
+
+
+async def get_async(db: AsyncSession, visit_id: str) -> Visit | None:
+    return await db.scalar(select(Visit).options(*WITH_ITEMS).where(Visit.id == visit_id))
+
+
+async def get_latest_by_patient_async(db: AsyncSession, patient_id: str) -> Visit | None:
+    return await db.scalar(
+        select(Visit)
+        .options(*WITH_ITEMS)
+        .where(Visit.patient_id == patient_id)
+        .order_by(Visit.fecha_consulta.desc())
+        .limit(1)
+    )
 
 
 def create(db: Session, patient_id: str, data) -> Visit:
@@ -1,18 +1,43 @@
+import time
+
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 BASE_DIR = Path(__file__).resolve().parents[1]
 load_dotenv(BASE_DIR / ".env")
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.database import dispose_engines
+from app.core.executor import ExecutorBusyError
+from app.core.pagination import InvalidCursor
+from app.core.pdf_cache import shutdown_pdf_executor
+from app.core.security import shutdown_hashing_executor
+from app.core.sql_stats import SQLStatsMiddleware
+from app.core.startup import startup_report, warm_up
 from app.api.routers import auth as api_auth, admin, patient, consultation_medications, labs
 from app.api.routers import consultations
 from app.api.routers import debug
+from app.api.routers import internal
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up(startup_report)
+    yield
+    shutdown_hashing_executor()
+    shutdown_pdf_executor()
+    await dispose_engines()
+
 
-app = FastAPI(title=settings.APP_NAME)
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
 origins = {
     "https://web-diabetes-production.up.railway.app",
@@ -21,13 +46,31 @@ origins = {
 if settings.CORS_ORIGINS:
     origins.update(o.strip() for o in settings.CORS_ORIGINS.split(",") if o.strip())
 
+app.add_middleware(SQLStatsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=sorted(origins),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Deprecation", "Warning"],
 )
+# Outermost, so it sees the final headers of every response.
+app.add_middleware(CompressionMiddleware)
+
+
+@app.exception_handler(ExecutorBusyError)
+async def executor_busy_handler(request: Request, exc: ExecutorBusyError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, try again"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return JSONResponse(status_code=400, content={"detail": "Invalid cursor"})
 
 
 app.include_router(api_auth.router, tags=["auth"])
@@ -37,3 +80,6 @@ app.include_router(consultation_medications.router, tags=["medications"])
 app.include_router(labs.router, tags=["labs"])
 app.include_router(consultations.router, tags=["consultations"])
 app.include_router(debug.router, tags=["debug"])
+app.include_router(internal.router, tags=["internal"])
+
+startup_report.record("import_app", (time.perf_counter() - _import_started) * 1000)
@@ -9,6 +9,8 @@ from app.models.consultation import Consultation
 from app.models.consultation_medication import Medication
 from app.models.catalog_lab import CatalogLab
 from app.models.consulta_lab import ConsultaLab
+from app.models.refresh_token import RefreshToken
+from app.models.patient_summary import PatientSummary
 
 __all__ = [
     "Patient",
@@ -22,4 +24,6 @@ __all__ = [
     "Medication",
     "CatalogLab",
     "ConsultaLab",
+    "RefreshToken",
+    "PatientSummary",
 ]
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Boolean, Column, Float, Integer, Text, text
+from sqlalchemy import Boolean, Column, Float, Index, Integer, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -19,3 +19,7 @@ class CatalogLab(Base):
     activo = Column(Boolean, default=True, nullable=False)
 
     consulta_labs = relationship("ConsultaLab", back_populates="lab")
+
+
+# Only active rows are ever listed, in (orden, nombre) order.
+Index("ix_catalogo_labs_activo_orden", CatalogLab.orden, CatalogLab.nombre, postgresql_where=CatalogLab.activo)
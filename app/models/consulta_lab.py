@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, DateTime, ForeignKey, Float, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Float, Index, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -21,3 +21,6 @@ class ConsultaLab(Base):
 
     consultation = relationship("Consultation", back_populates="labs")
     lab = relationship("CatalogLab", back_populates="consulta_labs")
+
+
+Index("ix_consulta_labs_consulta_creado", ConsultaLab.consulta_id, ConsultaLab.creado_en)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, DateTime, ForeignKey, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Text, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -16,12 +16,31 @@ class Consultation(Base):
     notes = Column(Text, nullable=True)
     indications = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    # Bumped by crud.consultations.touch on any write that changes what the
+    # read endpoints render (medications, labs, patient data, lab names);
+    # the source of their ETag and Last-Modified.
+    version = Column(Integer, nullable=False, server_default=text("1"))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     patient = relationship("Patient", back_populates="consultations")
     medications = relationship(
         "Medication",
         back_populates="consultation",
         cascade="all, delete-orphan",
-        order_by="Medication.sort_order",
+        order_by="[Medication.sort_order, Medication.created_at]",
     )
-    labs = relationship("ConsultaLab", back_populates="consultation", cascade="all, delete-orphan")
+    labs = relationship(
+        "ConsultaLab",
+        back_populates="consultation",
+        cascade="all, delete-orphan",
+        order_by="ConsultaLab.creado_en",
+    )
+
+
+# Serves list_by_patient / get_latest_by_patient and the keyset cursor.
+Index(
+    "ix_consultations_patient_created",
+    Consultation.patient_id,
+    Consultation.created_at.desc(),
+    Consultation.id.desc(),
+)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -73,3 +73,6 @@ class Medication(Base):
         if self.indications:
             parts.append(f"Notas: {self.indications}")
         return " | ".join(parts) if parts else None
+
+
+Index("ix_medications_consultation_sort", Medication.consultation_id, Medication.sort_order, Medication.created_at)
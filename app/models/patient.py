@@ -17,6 +17,9 @@ class Patient(Base):
     email = Column(String(255), nullable=True)
     activo = Column(Boolean, default=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
+    # "apellidos nombres", accent- and case-folded; maintained by crud.patients.
+    search_name = Column(String(255), nullable=False, server_default="")
 
     consultations = relationship("Consultation", back_populates="patient", cascade="all, delete-orphan")
     visits = relationship("Visit", back_populates="patient", cascade="all, delete-orphan")
+    summary = relationship("PatientSummary", back_populates="patient", uselist=False, passive_deletes=True)
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class PatientSummary(Base):
+    """Per-patient consultation rollup, written in the same transaction as
+    each consultation (see crud.patient_summaries)."""
+
+    __tablename__ = "patient_summary"
+
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("patients.id", ondelete="CASCADE"), primary_key=True)
+    latest_consultation_id = Column(
+        UUID(as_uuid=True), ForeignKey("consultations.id", ondelete="SET NULL"), nullable=True
+    )
+    latest_consultation_at = Column(DateTime(timezone=True), nullable=True)
+    consultation_count = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    patient = relationship("Patient", back_populates="summary")
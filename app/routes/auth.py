@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db
-from app.core.security import create_access_token, verify_password
+from app.api.routers.auth import client_ip, issue_tokens, reject_login, verify_user_password
+from app.core.rate_limit import get_login_throttle
 from app.models.user import User
 from app.schemas.auth import Token
 from app.schemas.user import UserLogin
@@ -11,15 +12,17 @@ router = APIRouter(prefix="/auth")
 
 
 @router.post("/login", response_model=Token)
-def login(data: UserLogin, db: Session = Depends(get_db)) -> Token:
+def login(data: UserLogin, request: Request, db: Session = Depends(get_db)) -> Token:
+    ip = client_ip(request)
+    throttle = get_login_throttle()
+    attempt = throttle.check(data.identifier, ip)
     user = db.query(User).filter(User.username == data.identifier).first()
     if not user:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+        reject_login(data.identifier, ip)
     if not user.activo:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
-    if not verify_password(data.password, user.password_hash):
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-
-    token = create_access_token({"sub": str(user.id), "role": user.role.upper()})
-    return Token(access_token=token)
+    if not verify_user_password(db, user, data.password):
+        reject_login(data.identifier, ip)
+    throttle.record_success(data.identifier, ip, attempt)
+    return issue_tokens(db, user, user.role.upper())
 
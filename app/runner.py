@@ -0,0 +1,101 @@
+"""Production entry point: pre-forked uvicorn workers under gunicorn.
+
+Usage: python -m app.runner  (usually behind python -m app.boot, see Procfile)
+"""
+import logging
+import os
+
+from gunicorn.app.base import BaseApplication
+
+from app.core.config import settings
+from app.core.db_pool import ENGINES_PER_WORKER, pool_sizes_for_budget
+
+logger = logging.getLogger("app.runner")
+
+
+# Without WEB_CONCURRENCY, one worker per usable CPU up to this many: inside a
+# container both os.cpu_count() and the affinity mask can report every host
+# CPU, and each worker holds its own database pools.
+DEFAULT_MAX_WORKERS = 4
+
+
+def usable_cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_count() -> int:
+    if settings.WEB_CONCURRENCY:
+        return max(settings.WEB_CONCURRENCY, 1)
+    return max(min(usable_cpus(), DEFAULT_MAX_WORKERS), 1)
+
+
+def apply_connection_budget(workers: int) -> None:
+    if not settings.DB_CONNECTION_BUDGET:
+        if workers > 1:
+            worst_case = workers * ENGINES_PER_WORKER * (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW)
+            logger.warning(
+                "DB_CONNECTION_BUDGET is not set: %d workers may open up to %d database connections; "
+                "set it to the share of max_connections this service may use",
+                workers,
+                worst_case,
+            )
+        return
+    pool_size, max_overflow = pool_sizes_for_budget(settings.DB_CONNECTION_BUDGET, workers)
+    # Workers are forked after this point and inherit the adjusted settings;
+    # engines are created lazily inside each worker.
+    settings.DB_POOL_SIZE = pool_size
+    settings.DB_MAX_OVERFLOW = max_overflow
+    settings.DB_POOL_WARM_CONNECTIONS = min(settings.DB_POOL_WARM_CONNECTIONS, pool_size)
+
+
+def gunicorn_options(workers: int) -> dict:
+    return {
+        "bind": f"{settings.WEB_HOST}:{os.environ.get('PORT', settings.WEB_PORT)}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": settings.WEB_PRELOAD,
+        "max_requests": settings.WEB_MAX_REQUESTS,
+        "max_requests_jitter": settings.WEB_MAX_REQUESTS_JITTER,
+        "graceful_timeout": settings.WEB_GRACEFUL_TIMEOUT_SECONDS,
+        "timeout": settings.WEB_TIMEOUT_SECONDS,
+        "keepalive": settings.WEB_KEEPALIVE_SECONDS,
+        "accesslog": "-",
+        "errorlog": "-",
+        "forwarded_allow_ips": settings.WEB_FORWARDED_ALLOW_IPS,
+    }
+
+
+class Runner(BaseApplication):
+    def __init__(self, options: dict) -> None:
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+
+        return app
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-5.5s [%(name)s] %(message)s")
+    workers = worker_count()
+    apply_connection_budget(workers)
+    logger.info(
+        "Starting %d workers (preload=%s, pool_size=%d, max_overflow=%d, max_requests=%d)",
+        workers,
+        settings.WEB_PRELOAD,
+        settings.DB_POOL_SIZE,
+        settings.DB_MAX_OVERFLOW,
+        settings.WEB_MAX_REQUESTS,
+    )
+    Runner(gunicorn_options(workers)).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ from pydantic import BaseModel
 class Token(BaseModel):
     access_token: str
     token_type: str = "bearer"
+    refresh_token: str | None = None
 
 
 class PatientLogin(BaseModel):
@@ -14,3 +15,7 @@ class PatientLogin(BaseModel):
 class AdminLogin(BaseModel):
     username: str
     password: str
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
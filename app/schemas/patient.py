@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime
 from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
 
 
@@ -28,6 +28,16 @@ class PatientOut(PatientBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("id", mode="before")
+    @classmethod
+    def stringify_id(cls, value):
+        return str(value)
+
+
+class PatientListItem(PatientOut):
+    latest_consultation_at: datetime | None = None
+    consultation_count: int = 0
+
 
 class PatientLookupOut(BaseModel):
     id: str
@@ -39,6 +49,15 @@ class PatientLookupOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PatientSearchOut(BaseModel):
+    id: str
+    cedula: str
+    apellidos: str
+    nombres: str
+    fecha_nacimiento: date
+    activo: bool
+
+
 class ResetPatientPasswordRequest(BaseModel):
     new_password: str
 
@@ -0,0 +1,29 @@
+"""Rebuild patient_summary from consultations.
+
+The table is kept current on every consultation write; run this after
+bulk imports or manual SQL that bypassed the application.
+"""
+from pathlib import Path
+import sys
+import time
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.core.database import SessionLocal
+from app.crud import patient_summaries as patient_summary_crud
+
+
+def main() -> None:
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        rows = patient_summary_crud.backfill(db)
+    finally:
+        db.close()
+    print(f"patient_summary: {rows} rows rebuilt in {time.perf_counter() - started:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import os
+from pathlib import Path
+import sys
+import time
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+os.environ.setdefault("DATABASE_URL", "")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api import deps
+from app.core.security import create_access_token
+
+
+def _bench(label: str, iterations: int, credentials: HTTPAuthorizationCredentials) -> float:
+    deps.get_current_token(credentials)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        deps.get_current_token(credentials)
+    per_call_us = (time.perf_counter() - started) / iterations * 1_000_000
+    print(f"{label:<28} {per_call_us:8.2f} us/request")
+    return per_call_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-request token verification overhead.")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "00000000-0000-0000-0000-000000000001", "role": "PATIENT"})
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    cache = deps.token_cache
+    original_maxsize = cache.maxsize
+    cache.maxsize = 0
+    before = _bench("jwt.decode every request", args.iterations, credentials)
+    cache.maxsize = original_maxsize
+    cache.clear()
+    after = _bench("verified-token cache", args.iterations, credentials)
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Size and CPU cost of compressing consultation-list JSON at each level.
+
+Renders synthetic list[ConsultationOut] payloads the way the API does and
+compresses each with gzip (and brotli, when installed) at several levels,
+to help pick COMPRESSION_MIN_SIZE and the level settings. No database needed.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+import time
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+os.environ.setdefault("DATABASE_URL", "postgresql://bench@localhost/bench")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+
+from app.core.compression import brotli
+from app.schemas.consultation import ConsultationOut
+
+DRUGS = ["Metformina", "Glibenclamida", "Insulina NPH", "Losartan", "Atorvastatina", "Sitagliptina"]
+
+
+def payload(consultations: int, medications: int) -> bytes:
+    started = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    items = [
+        ConsultationOut(
+            id=uuid.uuid4(),
+            created_at=started + timedelta(days=30 * n),
+            diagnosis="Diabetes mellitus tipo 2 con control metabolico parcial",
+            notes=f"Control numero {n}. Paciente refiere adherencia irregular a la dieta.",
+            indications="Dieta hipocalorica, caminar 30 minutos diarios, control en 3 meses",
+            medications=[
+                {
+                    "id": uuid.uuid4(),
+                    "consultation_id": uuid.uuid4(),
+                    "drug_name": DRUGS[(n + m) % len(DRUGS)],
+                    "quantity": 30,
+                    "description": "1 tableta cada 12 horas despues de las comidas",
+                    "duration_days": 30,
+                    "sort_order": m,
+                    "created_at": started,
+                    "updated_at": started,
+                }
+                for m in range(medications)
+            ],
+        ).model_dump(mode="json")
+        for n in range(consultations)
+    ]
+    return json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def measure(compress, body: bytes, iterations: int) -> tuple[int, float]:
+    timings = []
+    for _ in range(iterations):
+        started = time.thread_time()
+        size = len(compress(body))
+        timings.append((time.thread_time() - started) * 1000)
+    return size, statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compression ratio and CPU cost per payload size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 5, 20, 100, 500], help="consultations per payload")
+    parser.add_argument("--medications", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    codecs = [(f"gzip-{level}", lambda body, level=level: zlib.compress(body, level, wbits=31)) for level in (1, 4, 6, 9)]
+    if brotli is not None:
+        codecs += [(f"br-{quality}", lambda body, q=quality: brotli.compress(body, quality=q)) for quality in (1, 4, 6, 11)]
+    else:
+        print("brotli not installed; gzip only")
+
+    print(f"{'consultations':>13} {'raw bytes':>10}  " + "  ".join(f"{name:>17}" for name, _ in codecs))
+    print(f"{'':>13} {'':>10}  " + "  ".join(f"{'bytes / cpu ms':>17}" for _ in codecs))
+    for size in args.sizes:
+        body = payload(size, args.medications)
+        cells = []
+        for _, compress in codecs:
+            compressed, cpu_ms = measure(compress, body, args.iterations)
+            cells.append(f"{compressed:>8} / {cpu_ms:6.3f}")
+        print(f"{size:>13} {len(body):>10}  " + "  ".join(f"{cell:>17}" for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
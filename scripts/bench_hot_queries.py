@@ -0,0 +1,204 @@
+"""Before/after latency of the hot read queries against their composite indexes.
+
+Seeds synthetic patients, consultations, medications, lab results and
+catalog rows (all tagged "hotq-"), then times each query twice: once inside
+a transaction that drops the composite/partial indexes from migration
+c5f8a2d1e7b4 (rolled back afterwards) and once with them in place.
+Dropping an index takes an exclusive lock on its table: run this against a
+scratch database, never production. Requires a migrated DATABASE_URL.
+"""
+import argparse
+import os
+from pathlib import Path
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+import psycopg
+
+from app.boot import libpq_url
+
+TAG = "hotq-"
+NEW_INDEXES = [
+    "ix_consultations_patient_created",
+    "ix_medications_consultation_sort",
+    "ix_consulta_labs_consulta_creado",
+    "ix_catalogo_labs_activo_orden",
+]
+QUERIES = [
+    (
+        "consultations page",
+        "select * from consultations where patient_id = %s order by created_at desc, id desc limit 51",
+        "patient",
+    ),
+    (
+        "latest consultation",
+        "select * from consultations where patient_id = %s order by created_at desc limit 1",
+        "patient",
+    ),
+    (
+        "medications by consultation",
+        "select * from medications where consultation_id = %s order by sort_order, created_at",
+        "consultation",
+    ),
+    (
+        "labs by consulta",
+        "select * from consulta_labs where consulta_id = %s order by creado_en",
+        "consultation",
+    ),
+    (
+        "active lab catalog",
+        "select id, nombre, unidad, rango_ref_min, rango_ref_max, activo, categoria, orden"
+        " from catalogo_labs where activo = true order by orden, nombre",
+        None,
+    ),
+]
+
+
+def copy_rows(conn: psycopg.Connection, sql: str, rows) -> None:
+    with conn.cursor() as cur:
+        with cur.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
+        # Fresh statistics before the next table's foreign-key checks are
+        # planned; otherwise they may seq-scan the parent for every row.
+        cur.execute(f"ANALYZE {sql.split()[1]}")
+    conn.commit()
+
+
+def seed(conn: psycopg.Connection, patients: int, per_patient: int, children: int, catalog: int) -> None:
+    rng = random.Random(7)
+    epoch = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    started = time.perf_counter()
+    lab_ids = [uuid.uuid4() for _ in range(catalog)]
+    consultation_rows = []
+    patient_ids = [uuid.uuid4() for _ in range(patients)]
+    copy_rows(
+        conn,
+        "COPY catalogo_labs (id, nombre, orden, activo) FROM STDIN",
+        ((lab_id, f"{TAG}lab-{n:05d}", rng.randrange(50), n % 3 != 0) for n, lab_id in enumerate(lab_ids)),
+    )
+    copy_rows(
+        conn,
+        "COPY patients (id, cedula, apellidos, nombres, fecha_nacimiento, activo, password_hash) FROM STDIN",
+        ((patient_id, f"{TAG}{n:07d}", "Bench", "Hot", "1970-01-01", True, "x") for n, patient_id in enumerate(patient_ids)),
+    )
+    for patient_id in patient_ids:
+        for _ in range(per_patient):
+            consultation_rows.append(
+                (uuid.uuid4(), patient_id, "dx", epoch + timedelta(minutes=rng.randrange(5 * 525600)))
+            )
+    copy_rows(conn, "COPY consultations (id, patient_id, diagnosis, created_at) FROM STDIN", consultation_rows)
+    copy_rows(
+        conn,
+        "COPY medications (id, consultation_id, drug_name, sort_order, created_at, updated_at) FROM STDIN",
+        (
+            (uuid.uuid4(), consultation_id, f"med{order}", order, created_at, created_at)
+            for consultation_id, _, _, created_at in consultation_rows
+            for order in range(children)
+        ),
+    )
+    copy_rows(
+        conn,
+        "COPY consulta_labs (id, consulta_id, lab_id, valor_num, creado_en) FROM STDIN",
+        (
+            (uuid.uuid4(), consultation_id, rng.choice(lab_ids), order, created_at + timedelta(seconds=order))
+            for consultation_id, _, _, created_at in consultation_rows
+            for order in range(children)
+        ),
+    )
+    total = len(consultation_rows)
+    print(
+        f"seeded {patients} patients, {total} consultations, {total * children} medications, "
+        f"{total * children} lab rows, {catalog} catalog labs in {time.perf_counter() - started:.1f} s"
+    )
+
+
+def cleanup(conn: psycopg.Connection) -> None:
+    consultations = (
+        "select c.id from consultations c join patients p on p.id = c.patient_id where p.cedula like %(tag)s"
+    )
+    params = {"tag": f"{TAG}%"}
+    conn.execute(f"delete from consulta_labs where consulta_id in ({consultations})", params)
+    conn.execute(f"delete from medications where consultation_id in ({consultations})", params)
+    conn.execute(
+        "delete from consultations where patient_id in (select id from patients where cedula like %(tag)s)", params
+    )
+    conn.execute("delete from patients where cedula like %(tag)s", params)
+    conn.execute("delete from catalogo_labs where nombre like %(tag)s", params)
+    conn.commit()
+
+
+def sample_keys(conn: psycopg.Connection, count: int) -> dict[str, list]:
+    rows = conn.execute(
+        "select c.patient_id, c.id from consultations c join patients p on p.id = c.patient_id"
+        " where p.cedula like %s order by random() limit %s",
+        (f"{TAG}%", count),
+    ).fetchall()
+    conn.commit()
+    return {"patient": [row[0] for row in rows], "consultation": [row[1] for row in rows]}
+
+
+def time_queries(conn: psycopg.Connection, keys: dict[str, list]) -> dict[str, tuple[float, float, str]]:
+    results = {}
+    for label, sql, key in QUERIES:
+        params_list = [(value,) for value in keys[key]] if key else [()] * len(keys["patient"])
+        plan = conn.execute("explain " + sql, params_list[0]).fetchall()
+        top_scan = next((line[0].strip(" ->") for line in plan if "Scan" in line[0]), plan[0][0])
+        conn.execute(sql, params_list[0]).fetchall()
+        timings = []
+        for params in params_list:
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        results[label] = (statistics.median(timings), timings[int(len(timings) * 0.95) - 1], top_scan.split("  ")[0])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hot query latency with and without composite indexes.")
+    parser.add_argument("--patients", type=int, default=20_000)
+    parser.add_argument("--consultations-per-patient", type=int, default=10)
+    parser.add_argument("--children", type=int, default=4, help="medications and lab rows per consultation")
+    parser.add_argument("--catalog", type=int, default=300)
+    parser.add_argument("--samples", type=int, default=300)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse rows from a previous --keep run")
+    args = parser.parse_args()
+
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is not set")
+    with psycopg.connect(libpq_url(database_url)) as conn:
+        if not args.skip_seed:
+            cleanup(conn)
+            seed(conn, args.patients, args.consultations_per_patient, args.children, args.catalog)
+        try:
+            keys = sample_keys(conn, args.samples)
+            for name in NEW_INDEXES:
+                conn.execute(f"drop index if exists {name}")
+            before = time_queries(conn, keys)
+            conn.rollback()
+            after = time_queries(conn, keys)
+            conn.rollback()
+        finally:
+            if not args.keep:
+                cleanup(conn)
+
+    print(f"{'query':<28} {'before p50/p95 ms':>18} {'after p50/p95 ms':>18}  plan before -> after")
+    for label, _, _ in QUERIES:
+        b50, b95, bplan = before[label]
+        a50, a95, aplan = after[label]
+        print(f"{label:<28} {b50:8.3f}/{b95:<8.3f} {a50:8.3f}/{a95:<8.3f}  {bplan} -> {aplan}")
+
+
+if __name__ == "__main__":
+    main()
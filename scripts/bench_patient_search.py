@@ -0,0 +1,130 @@
+"""Latency of /admin/patients/search queries against a seeded patients table.
+
+Seeds --patients synthetic rows (cedula prefix "bench-"), runs a fixed query
+mix through crud.patients.search_async and removes the rows afterwards
+unless --keep is given. Requires a migrated DATABASE_URL.
+"""
+import argparse
+import asyncio
+import os
+from pathlib import Path
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+
+import psycopg
+
+from app.boot import libpq_url
+from app.core.database import AsyncSessionLocal, dispose_engines
+from app.crud import patients as patient_crud
+
+CEDULA_PREFIX = "bench-"
+APELLIDOS = [
+    "García", "Rodríguez", "Martínez", "López", "González", "Pérez", "Sánchez", "Ramírez", "Torres", "Flores",
+    "Rivera", "Gómez", "Díaz", "Cruz", "Morales", "Reyes", "Gutiérrez", "Ortiz", "Chávez", "Ruiz",
+    "Jiménez", "Hernández", "Vásquez", "Castillo", "Romero", "Muñoz", "Álvarez", "Mendoza", "Guzmán", "Salazar",
+    "Zambrano", "Cedeño", "Intriago", "Macías", "Vélez", "Andrade", "Espinoza", "Bravo", "Loor", "Ponce",
+]
+NOMBRES = [
+    "María", "José", "Luis", "Ana", "Carlos", "Lucía", "Jorge", "Sofía", "Andrés", "Valentina",
+    "Miguel", "Camila", "Juan", "Daniela", "Pedro", "Gabriela", "Ángel", "Paola", "Raúl", "Inés",
+]
+QUERIES = [
+    ("cedula exact", lambda n: f"{CEDULA_PREFIX}{n // 2:07d}"),
+    ("cedula prefix", lambda n: f"{CEDULA_PREFIX}00012"),
+    ("surname prefix", lambda n: "Zamb"),
+    ("accented surname", lambda n: "MUÑOZ"),
+    ("surname + name", lambda n: "gutierrez ortiz ma"),
+    ("short", lambda n: "ro"),
+    ("no match", lambda n: "xyzzy"),
+]
+
+
+def seed(conn: psycopg.Connection, count: int) -> None:
+    rng = random.Random(42)
+    started = time.perf_counter()
+    with conn.cursor() as cur:
+        with cur.copy(
+            "COPY patients (id, cedula, apellidos, nombres, fecha_nacimiento, activo, password_hash, search_name)"
+            " FROM STDIN"
+        ) as copy:
+            for n in range(count):
+                apellidos = f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+                nombres = f"{rng.choice(NOMBRES)} {rng.choice(NOMBRES)}"
+                copy.write_row(
+                    (
+                        f"00000000-0000-4000-8000-{n:012d}",
+                        f"{CEDULA_PREFIX}{n:07d}",
+                        apellidos,
+                        nombres,
+                        date(1940, 1, 1) + timedelta(days=rng.randrange(25000)),
+                        True,
+                        "x",
+                        patient_crud.search_name_for(apellidos, nombres),
+                    )
+                )
+        cur.execute("ANALYZE patients")
+    conn.commit()
+    print(f"seeded {count} patients in {time.perf_counter() - started:.1f} s")
+
+
+def cleanup(conn: psycopg.Connection) -> None:
+    conn.execute("DELETE FROM patients WHERE cedula LIKE %s", (f"{CEDULA_PREFIX}%",))
+    conn.commit()
+
+
+async def run(count: int, iterations: int, limit: int) -> None:
+    async with AsyncSessionLocal() as db:
+        print(f"trigram index: {'yes' if await patient_crud._trigram_available(db) else 'no (prefix matching only)'}")
+        print(f"{'query':<20} {'rows':>4} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+        worst = 0.0
+        for label, build in QUERIES:
+            query = build(count)
+            rows = await patient_crud.search_async(db, query, limit)
+            timings = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                await patient_crud.search_async(db, query, limit)
+                timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[int(len(timings) * 0.95) - 1]
+            worst = max(worst, p95)
+            print(f"{label:<20} {len(rows):>4} {statistics.median(timings):8.2f} {p95:8.2f} {timings[-1]:8.2f}")
+        print(f"worst p95: {worst:.2f} ms")
+    await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Patient search latency at scale.")
+    parser.add_argument("--patients", type=int, default=200_000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="leave the seeded rows in place")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse rows from a previous --keep run")
+    args = parser.parse_args()
+
+    database_url = os.environ.get("DATABASE_URL")
+    if not database_url:
+        raise SystemExit("DATABASE_URL is not set")
+    with psycopg.connect(libpq_url(database_url)) as conn:
+        if not args.skip_seed:
+            cleanup(conn)
+            seed(conn, args.patients)
+        try:
+            asyncio.run(run(args.patients, args.iterations, args.limit))
+        finally:
+            if not args.keep:
+                cleanup(conn)
+
+
+if __name__ == "__main__":
+    main()
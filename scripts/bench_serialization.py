@@ -0,0 +1,130 @@
+"""Serialization time per 100 consultations: response_model path vs single pass.
+
+"before" is what FastAPI did for the hot consultation endpoints: validate the
+ORM rows against response_model, dump them in JSON mode and encode with
+json.dumps. "after" is app.core.serialization: validate once, encode
+with orjson (and msgpack, when installed). Both paths are timed end to end
+and then encode-only, since validating ORM rows costs the same either way.
+Uses transient ORM objects, so no database is needed.
+"""
+import argparse
+import asyncio
+import os
+from pathlib import Path
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+os.environ.setdefault("DATABASE_URL", "postgresql://bench@localhost/bench")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.serialization import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, encode, msgpack
+from app.models.consultation import Consultation
+from app.models.consultation_medication import Medication
+from app.schemas.consultation import ConsultationOut
+
+DRUGS = ["Metformina", "Glibenclamida", "Insulina NPH", "Losartan", "Atorvastatina", "Sitagliptina"]
+
+
+def consultations(count: int, medications: int) -> list[Consultation]:
+    started = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    rows = []
+    for n in range(count):
+        consultation_id = uuid.uuid4()
+        rows.append(
+            Consultation(
+                id=consultation_id,
+                created_at=started + timedelta(days=30 * n),
+                diagnosis="Diabetes mellitus tipo 2 con control metabolico parcial",
+                notes=f"Control numero {n}. Paciente refiere adherencia irregular a la dieta.",
+                indications="Dieta hipocalorica, caminar 30 minutos diarios, control en 3 meses",
+                medications=[
+                    Medication(
+                        id=uuid.uuid4(),
+                        consultation_id=consultation_id,
+                        drug_name=DRUGS[(n + m) % len(DRUGS)],
+                        dose="30",
+                        duration="30",
+                        indications="1 tableta cada 12 horas despues de las comidas",
+                        sort_order=m,
+                        created_at=started,
+                        updated_at=started,
+                    )
+                    for m in range(medications)
+                ],
+            )
+        )
+    return rows
+
+
+def measure(run, iterations: int) -> tuple[int, float]:
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        size = len(run())
+        timings.append((time.perf_counter() - started) * 1000)
+    return size, statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serialization time per 100 consultations, before and after.")
+    parser.add_argument("--consultations", type=int, default=100)
+    parser.add_argument("--medications", type=int, default=3)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = consultations(args.consultations, args.medications)
+    models = [ConsultationOut.model_validate(row) for row in rows]
+    field = create_model_field(name="Response", type_=list[ConsultationOut], mode="serialization")
+
+    def before(content) -> bytes:
+        content = asyncio.run(serialize_response(field=field, response_content=content, is_coroutine=True))
+        return JSONResponse(content).body
+
+    def after(media_type: str) -> bytes:
+        return encode([ConsultationOut.model_validate(row) for row in rows], media_type)
+
+    def before_encode() -> bytes:
+        return JSONResponse(field.serialize(models, mode="json")).body
+
+    sections = {
+        "end to end (ORM rows in)": [
+            ("response_model + json", lambda: before(rows)),
+            ("single pass orjson", lambda: after(JSON_MEDIA_TYPE)),
+        ],
+        "encode only (validated models in)": [
+            ("pydantic dump + json", before_encode),
+            ("orjson", lambda: encode(models, JSON_MEDIA_TYPE)),
+        ],
+    }
+    if msgpack is not None:
+        sections["end to end (ORM rows in)"].append(("single pass msgpack", lambda: after(MSGPACK_MEDIA_TYPE)))
+        sections["encode only (validated models in)"].append(("msgpack", lambda: encode(models, MSGPACK_MEDIA_TYPE)))
+    else:
+        print("msgpack not installed; JSON only")
+
+    per = 100 / args.consultations
+    print(f"{args.consultations} consultations x {args.medications} medications, median of {args.iterations}")
+    for title, paths in sections.items():
+        print(f"\n{title}")
+        print(f"{'path':<24} {'bytes':>8} {'ms':>8} {'ms/100':>8} {'speedup':>8}")
+        baseline = None
+        for name, run in paths:
+            size, ms = measure(run, args.iterations)
+            baseline = baseline or ms
+            print(f"{name:<24} {size:>8} {ms:8.3f} {ms * per:8.3f} {baseline / ms:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
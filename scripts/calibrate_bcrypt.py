@@ -0,0 +1,37 @@
+import argparse
+from pathlib import Path
+import sys
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.core.security import MAX_BCRYPT_ROUNDS, MIN_BCRYPT_ROUNDS, calibrate_bcrypt_rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Pick the highest bcrypt cost whose verify latency stays under a target on this CPU."
+    )
+    parser.add_argument("--target-ms", type=float, default=250.0)
+    parser.add_argument("--min-rounds", type=int, default=MIN_BCRYPT_ROUNDS)
+    parser.add_argument("--max-rounds", type=int, default=MAX_BCRYPT_ROUNDS)
+    parser.add_argument("--samples", type=int, default=3)
+    args = parser.parse_args()
+
+    rounds, timings = calibrate_bcrypt_rounds(
+        args.target_ms,
+        min_rounds=args.min_rounds,
+        max_rounds=args.max_rounds,
+        samples=args.samples,
+    )
+    for cost, elapsed in timings.items():
+        marker = "  <- selected" if cost == rounds else ""
+        print(f"rounds={cost:>2}  verify={elapsed:8.1f} ms{marker}")
+    if timings.get(rounds, 0) > args.target_ms:
+        print(f"Warning: even rounds={rounds} exceeds the {args.target_ms:.0f} ms target on this CPU")
+    print(f"BCRYPT_ROUNDS={rounds}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""Delete expired refresh tokens and revoked ones whose family is dead.
+
+Nothing else removes refresh_tokens rows; run this daily, e.g. from the
+platform scheduler.
+"""
+from pathlib import Path
+import sys
+import time
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.core.database import SessionLocal
+from app.crud import refresh_tokens as refresh_token_crud
+
+
+def main() -> None:
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        rows = refresh_token_crud.prune(db)
+    finally:
+        db.close()
+    print(f"refresh_tokens: {rows} rows deleted in {time.perf_counter() - started:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
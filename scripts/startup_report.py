@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import json
+import os
+from pathlib import Path
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+os.environ.setdefault("DATABASE_URL", "")
+os.environ.setdefault("SECRET_KEY", "startup-report")
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+
+
+def _import_profile() -> tuple[float, list[tuple[str, int, int]]]:
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BASE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        if self_us.isdigit():
+            modules.append((name, int(self_us), int(cumulative_us)))
+    return wall_ms, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time and startup report for app.main.")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail when import + startup exceed this")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    wall_ms, modules = _import_profile()
+    by_package: dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        by_package[name.split(".")[0]] += self_us
+    app_main_ms = next((cumulative / 1000 for name, _, cumulative in modules if name == "app.main"), None)
+
+    from app.main import app
+    from app.core.startup import startup_report
+
+    async def _run_lifespan() -> None:
+        async with app.router.lifespan_context(app):
+            pass
+
+    asyncio.run(_run_lifespan())
+    report = startup_report.snapshot()
+    startup_ms = sum(ms for name, ms in report["phases_ms"].items() if name != "import_app")
+    total_ms = (app_main_ms or 0) + startup_ms
+
+    result = {
+        "interpreter_wall_ms": round(wall_ms, 1),
+        "import_app_main_ms": round(app_main_ms or 0, 1),
+        "startup_phases_ms": {k: v for k, v in report["phases_ms"].items() if k != "import_app"},
+        "startup_errors": report["errors"],
+        "total_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "packages_ms": {
+            name: round(us / 1000, 1)
+            for name, us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[: args.top]
+        },
+        "slowest_modules_ms": [
+            {"module": name, "self": round(self_us / 1000, 1), "cumulative": round(cumulative / 1000, 1)}
+            for name, self_us, cumulative in sorted(modules, key=lambda item: item[1], reverse=True)[: args.top]
+        ],
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"python -c 'import app.main' wall: {result['interpreter_wall_ms']:.1f} ms")
+        print(f"import app.main:                {result['import_app_main_ms']:.1f} ms")
+        for name, ms in result["startup_phases_ms"].items():
+            print(f"  lifespan {name:<26} {ms:8.1f} ms")
+        for name, error in result["startup_errors"].items():
+            print(f"  ! {name}: {error}")
+        print(f"total (import + startup):       {result['total_ms']:.1f} ms")
+        print("\nSelf import time by top-level package:")
+        for name, ms in result["packages_ms"].items():
+            print(f"  {name:<32} {ms:8.1f} ms")
+        print("\nSlowest modules (self / cumulative):")
+        for row in result["slowest_modules_ms"]:
+            print(f"  {row['module']:<48} {row['self']:8.1f} {row['cumulative']:8.1f} ms")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nStartup budget exceeded: {total_ms:.1f} ms > {args.budget_ms:.0f} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Shared helpers for the integration tests, which run against DATABASE_URL.
+
+Mark database tests with ``@pytest.mark.requires_db`` (or a module-level
+``pytestmark``); they are skipped when DATABASE_URL is not set. Rows made
+through the factories below are deleted again after each test.
+"""
+import os
+import uuid
+from datetime import date
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.core.security import create_access_token
+from app.models import ConsultaLab, Consultation, Medication, Patient, PrescriptionItem, User, Visit
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "requires_db: needs a migrated database at DATABASE_URL")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.getenv("DATABASE_URL"):
+        return
+    skip = pytest.mark.skip(reason="DATABASE_URL not set for integration tests")
+    for item in items:
+        if "requires_db" in item.keywords:
+            item.add_marker(skip)
+
+
+def _bearer(user_id, role: str = "PATIENT", patient_id=None) -> dict:
+    claims = {"sub": str(user_id), "role": role}
+    if patient_id is not None:
+        claims["patient_id"] = str(patient_id)
+    return {"Authorization": f"Bearer {create_access_token(claims)}"}
+
+
+@pytest.fixture()
+def auth_headers():
+    """``auth_headers(user_id, role="PATIENT", patient_id=None)`` -> Authorization header."""
+    return _bearer
+
+
+@pytest.fixture()
+def patient_headers():
+    """Headers for a patient token whose subject is the patient row itself."""
+    return lambda patient: _bearer(patient.id, "PATIENT", patient.id)
+
+
+@pytest.fixture()
+def primary_reads(monkeypatch):
+    # Rows are seeded on the primary only; keep reads there when a replica is configured.
+    monkeypatch.setattr("app.api.deps.replica_configured", lambda: False)
+
+
+@pytest.fixture()
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture()
+def make_patient(db, primary_reads):
+    """``make_patient(prefix="t", **fields)``: a committed patient, removed with its rows."""
+    created = []
+
+    def make(prefix: str = "t", **fields) -> Patient:
+        values = {
+            "cedula": f"{prefix}-{uuid.uuid4().hex[:8]}",
+            "apellidos": "Test",
+            "nombres": "Patient",
+            "fecha_nacimiento": date(1990, 1, 1),
+            "activo": True,
+            "password_hash": "x",
+            **fields,
+        }
+        patient = Patient(**values)
+        db.add(patient)
+        db.commit()
+        created.append(patient.id)
+        return patient
+
+    yield make
+
+    db.rollback()
+    consultation_ids = db.query(Consultation.id).filter(Consultation.patient_id.in_(created))
+    visit_ids = db.query(Visit.id).filter(Visit.patient_id.in_(created))
+    db.query(ConsultaLab).filter(ConsultaLab.consulta_id.in_(consultation_ids)).delete(synchronize_session=False)
+    db.query(Medication).filter(Medication.consultation_id.in_(consultation_ids)).delete(synchronize_session=False)
+    db.query(PrescriptionItem).filter(PrescriptionItem.visit_id.in_(visit_ids)).delete(synchronize_session=False)
+    db.query(Consultation).filter(Consultation.patient_id.in_(created)).delete(synchronize_session=False)
+    db.query(Visit).filter(Visit.patient_id.in_(created)).delete(synchronize_session=False)
+    db.query(Patient).filter(Patient.id.in_(created)).delete(synchronize_session=False)
+    db.commit()
+
+
+@pytest.fixture()
+def make_consultation(db):
+    """``make_consultation(patient, medications=0, **fields)``; cleaned up with the patient."""
+
+    def make(patient: Patient, medications: int = 0, **fields) -> Consultation:
+        consultation = Consultation(patient_id=patient.id, **{"diagnosis": "dx", **fields})
+        db.add(consultation)
+        db.flush()
+        db.add_all(
+            Medication(consultation_id=consultation.id, drug_name=f"Metformina {n}", sort_order=n)
+            for n in range(medications)
+        )
+        db.commit()
+        return consultation
+
+    return make
+
+
+@pytest.fixture()
+def make_user(db):
+    """``make_user(role="patient", **fields)``: a committed user; refresh tokens go with it."""
+    created = []
+
+    def make(role: str = "patient", **fields) -> User:
+        values = {"username": f"{role}-{uuid.uuid4().hex[:8]}", "password_hash": "x", "role": role, "activo": True}
+        user = User(**{**values, **fields})
+        db.add(user)
+        db.commit()
+        created.append(user.id)
+        return user
+
+    yield make
+
+    db.rollback()
+    db.query(User).filter(User.id.in_(created)).delete(synchronize_session=False)
+    db.commit()
+
+
+@pytest.fixture()
+def admin_headers(make_user, auth_headers):
+    return auth_headers(make_user("admin").id, "ADMIN")
@@ -6,7 +6,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from app.core.database import SessionLocal
-from app.core.dependencies import require_admin
+from app.core.dependencies import require_admin_async
 from app.core.security import get_password_hash
 from app.main import app
 from app.models.consultation import Consultation
@@ -30,7 +30,7 @@ class DummyAdmin:
 
 @pytest.fixture()
 def client():
-    app.dependency_overrides[require_admin] = lambda: DummyAdmin()
+    app.dependency_overrides[require_admin_async] = lambda: DummyAdmin()
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -0,0 +1,28 @@
+import os
+from pathlib import Path
+
+import pytest
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+from app.boot import ensure_schema, libpq_url
+from app.core.schema import SCHEMA_HEAD
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_packaged_head_matches_migrations():
+    config = Config(str(BASE_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BASE_DIR / "alembic"))
+    assert ScriptDirectory.from_config(config).get_heads() == [SCHEMA_HEAD]
+
+
+def test_libpq_url_strips_driver():
+    assert libpq_url("postgresql+psycopg2://u:p@h:5432/db") == "postgresql://u:p@h:5432/db"
+    assert libpq_url("postgresql+psycopg://u@/db?host=/tmp") == "postgresql://u@/db?host=/tmp"
+    assert libpq_url("postgres://u@h/db") == "postgresql://u@h/db"
+
+
+@pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set for integration tests")
+def test_current_schema_skips_migration():
+    assert ensure_schema(os.environ["DATABASE_URL"]) is False
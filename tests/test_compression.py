@@ -0,0 +1,102 @@
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, compression_metrics, negotiate
+
+PAYLOAD = [{"drug_name": f"Metformina {n}", "description": "1 tableta cada 8 horas"} for n in range(200)]
+
+
+@pytest.fixture()
+def client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/large")
+    def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/tagged")
+    def tagged():
+        return Response(json.dumps(PAYLOAD), media_type="application/json", headers={"ETag": '"abc"'})
+
+    @app.get("/binary")
+    def binary():
+        return Response(b"%PDF" + b"0" * 5000, media_type="application/pdf")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((json.dumps(item) + "\n" for item in PAYLOAD), media_type="text/plain")
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _get(client, path, accept="gzip"):
+    # httpx decodes bodies on its own; stream the raw bytes instead.
+    with client.stream("GET", path, headers={"Accept-Encoding": accept}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_negotiation_honours_quality_values():
+    assert negotiate("gzip, deflate, br", brotli_available=False) == "gzip"
+    assert negotiate("gzip, deflate, br", brotli_available=True) == "br"
+    assert negotiate("br;q=0.5, gzip", brotli_available=True) == "gzip"
+    assert negotiate("gzip;q=0, identity") is None
+    assert negotiate("*", brotli_available=False) == "gzip"
+    assert negotiate("identity") is None
+
+
+def test_large_json_is_gzipped_and_counted(client):
+    before = compression_metrics.snapshot()
+    response, raw = _get(client, "/large")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(raw)
+    assert json.loads(gzip.decompress(raw)) == PAYLOAD
+    after = compression_metrics.snapshot()
+    assert after["compressed"]["gzip"] == before["compressed"]["gzip"] + 1
+    assert after["bytes_saved"] - before["bytes_saved"] > 0
+    assert after["compress_cpu_ms"]["count"] == before["compress_cpu_ms"]["count"] + 1
+
+
+def test_small_identity_and_non_text_bodies_pass_through(client):
+    response, raw = _get(client, "/small")
+    assert "content-encoding" not in response.headers
+    assert json.loads(raw) == {"ok": True}
+
+    response, raw = _get(client, "/large", accept="identity")
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    response, raw = _get(client, "/binary")
+    assert "content-encoding" not in response.headers
+    assert raw.startswith(b"%PDF")
+
+
+def test_strong_etag_weakened_when_encoded(client):
+    response, _ = _get(client, "/tagged")
+    assert response.headers["etag"] == 'W/"abc"'
+
+
+def test_streaming_response_compressed_incrementally(client):
+    response, raw = _get(client, "/stream")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert [json.loads(line) for line in lines] == PAYLOAD
+
+
+def test_brotli_when_available(client):
+    brotli = pytest.importorskip("brotli")
+    response, raw = _get(client, "/large", accept="br, gzip")
+    assert response.headers["content-encoding"] == "br"
+    assert json.loads(brotli.decompress(raw)) == PAYLOAD
@@ -0,0 +1,88 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.core.http_cache import http_date, is_not_modified
+from app.core.sql_stats import capture_queries
+from app.crud import consultation_medications as med_crud
+from app.crud import patients as patient_crud
+from app.schemas.consultation_medication import MedicationUpdate
+from app.schemas.patient import PatientUpdate
+
+
+def _request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    changed = datetime(2025, 5, 1, 12, 0, 0, 250000, tzinfo=timezone.utc)
+    since = http_date(changed)
+    assert is_not_modified(_request(if_modified_since=since), 'W/"a"', changed)
+    assert not is_not_modified(_request(if_modified_since="Thu, 01 May 2025 11:59:59 GMT"), 'W/"a"', changed)
+    assert not is_not_modified(_request(if_none_match='W/"b"', if_modified_since=since), 'W/"a"', changed)
+    assert not is_not_modified(_request(if_modified_since="yesterday"), 'W/"a"', changed)
+
+
+@pytest.fixture()
+def consultation(db, make_patient, make_consultation, patient_headers):
+    patient = make_patient("cg", apellidos="Conditional", nombres="Get")
+    consultation = make_consultation(patient, medications=1)
+    return {
+        "db": db,
+        "patient": patient,
+        "id": str(consultation.id),
+        "medication": consultation.medications[0],
+        "headers": patient_headers(patient),
+    }
+
+
+@pytest.mark.requires_db
+def test_unchanged_consultation_answers_304_from_one_query(consultation, auth_headers):
+    from app.main import app
+
+    paths = [
+        "/patient/consultations",
+        "/patient/consultations?limit=1",
+        f"/patient/consultations/{consultation['id']}",
+        f"/consultations/{consultation['id']}/print",
+    ]
+    with TestClient(app) as client:
+        etags = {}
+        for path in paths:
+            first = client.get(path, headers=consultation["headers"])
+            assert first.status_code == 200, first.text
+            assert first.headers["etag"].startswith('W/"')
+            assert first.headers["cache-control"] == "private, no-cache"
+            etags[path] = first.headers["etag"]
+
+            conditional = {**consultation["headers"], "If-None-Match": first.headers["etag"]}
+            with capture_queries() as stats:
+                revalidated = client.get(path, headers=conditional)
+            assert revalidated.status_code == 304, path
+            assert revalidated.content == b""
+            assert stats.count == 1, path
+
+            since = {**consultation["headers"], "If-Modified-Since": first.headers["last-modified"]}
+            assert client.get(path, headers=since).status_code == 304, path
+
+        other = auth_headers(uuid.uuid4(), "PATIENT", uuid.uuid4())
+        forbidden = client.get(f"/patient/consultations/{consultation['id']}", headers={**other, "If-None-Match": "*"})
+        assert forbidden.status_code in (401, 403)
+
+        med_crud.update(consultation["db"], consultation["medication"], MedicationUpdate(drug_name="Insulina"))
+        for path in paths:
+            changed = client.get(path, headers={**consultation["headers"], "If-None-Match": etags[path]})
+            assert changed.status_code == 200, path
+            assert changed.headers["etag"] != etags[path]
+            etags[path] = changed.headers["etag"]
+
+        # The print view shows patient data, so a patient edit invalidates it.
+        patient_crud.update(consultation["db"], consultation["patient"], PatientUpdate(nombres="Renamed"))
+        print_path = f"/consultations/{consultation['id']}/print"
+        reprinted = client.get(print_path, headers={**consultation["headers"], "If-None-Match": etags[print_path]})
+        assert reprinted.status_code == 200
+        assert reprinted.json()["patient"]["nombres"] == "Renamed"
@@ -0,0 +1,68 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import BrokenExecutor
+
+import pytest
+
+from app.core.executor import BoundedExecutor, ExecutorBusyError
+
+
+def test_executor_runs_and_records_latency():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    try:
+        assert executor.run(pow, 2, 10) == 1024
+        stats = executor.stats()
+        assert stats["completed"] == 1
+        assert stats["run_ms"]["count"] == 1
+    finally:
+        executor.shutdown()
+
+
+def test_executor_rejects_when_saturated():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        first = executor.submit(release.wait)
+        second = executor.submit(release.wait)
+        with pytest.raises(ExecutorBusyError):
+            executor.submit(release.wait)
+        assert executor.stats()["queue_depth"] == 1
+        release.set()
+        first.result(timeout=5)
+        second.result(timeout=5)
+        assert executor.stats()["rejected"] == 1
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_process_executor_replaces_a_broken_pool():
+    executor = BoundedExecutor("test", kind="process", max_workers=1, max_queue=1)
+    try:
+        with pytest.raises(BrokenExecutor):
+            executor.run(os._exit, 1)
+        assert executor.run(pow, 2, 10) == 1024
+        assert executor.stats()["restarts"] == 1
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_timed_out_call_is_counted_and_its_late_result_dropped(use_async, caplog):
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1, timeout=0.1)
+    release = threading.Event()
+    try:
+        with caplog.at_level("ERROR"), pytest.raises(ExecutorBusyError):
+            if use_async:
+                asyncio.run(executor.run_async(release.wait, 5))
+            else:
+                executor.run(release.wait, 5)
+        release.set()  # the job now finishes after its caller gave up
+        executor.shutdown()
+        stats = executor.stats()
+        assert (stats["timed_out"], stats["completed"], stats["failed"], stats["in_flight"]) == (1, 0, 0, 0)
+        assert not [record for record in caplog.records if "exception calling callback" in record.getMessage()]
+    finally:
+        release.set()
+        executor.shutdown()
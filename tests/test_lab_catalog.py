@@ -0,0 +1,83 @@
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.core.http_cache import etag_matches
+from app.core.sql_stats import capture_queries
+from app.crud import lab_catalog as lab_catalog_crud
+from app.models import CatalogLab
+from app.schemas.lab_catalog import CatalogLabCreate
+
+
+def _row(nombre, orden=0, activo=True, **extra):
+    fields = {"unidad": None, "rango_ref_min": None, "rango_ref_max": None, "categoria": "general", **extra}
+    return SimpleNamespace(id=uuid.uuid4(), nombre=nombre, orden=orden, activo=activo, **fields)
+
+
+def _request(if_none_match: str | None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "headers": headers})
+
+
+def test_snapshot_lists_active_labs_and_indexes_all():
+    # Rows arrive ordered by nombre, as the snapshot query returns them.
+    rows = [_row("Colesterol", orden=2), _row("Glucosa", orden=1), _row("HbA1c", orden=2), _row("Urea", activo=False)]
+    snapshot = lab_catalog_crud.build_snapshot(rows)
+
+    assert [item["nombre"] for item in json.loads(snapshot.body)] == ["Glucosa", "Colesterol", "HbA1c"]
+    assert list(json.loads(snapshot.legacy_body)[0]) == [
+        "id", "nombre", "unidad", "rango_ref_min", "rango_ref_max", "categoria", "orden", "activo",
+    ]
+    # Saving results may still reference inactive labs.
+    assert snapshot.index.resolve(" urea ").nombre == "Urea"
+    assert snapshot.index.resolve("lesterol").nombre == "Colesterol"
+    assert lab_catalog_crud.build_snapshot(rows).etag == snapshot.etag
+    assert snapshot.etag != snapshot.legacy_etag
+
+
+def test_etag_matches_lists_and_weak_validators():
+    assert etag_matches(_request('"a", W/"b"'), '"b"')
+    assert etag_matches(_request("*"), '"b"')
+    assert not etag_matches(_request('"a"'), '"b"')
+    assert not etag_matches(_request(None), '"b"')
+
+
+@pytest.mark.requires_db
+def test_catalog_served_from_snapshot_until_a_write(db, admin_headers, primary_reads):
+    from app.main import app
+
+    tag = uuid.uuid4().hex[:8]
+    headers = admin_headers
+    lab_catalog_crud.invalidate_snapshot()
+    try:
+        with TestClient(app) as client:
+            first = client.get("/lab-catalog", headers=headers)
+            assert first.status_code == 200
+            assert first.headers["cache-control"] == "private, no-cache"
+            etag = first.headers["etag"]
+
+            with capture_queries() as stats:
+                cached = client.get("/labs/catalog", headers=headers)
+                revalidated = client.get("/lab-catalog", headers={**headers, "If-None-Match": etag})
+            assert stats.count == 0
+            assert cached.content == first.content
+            assert revalidated.status_code == 304 and revalidated.content == b""
+            assert revalidated.headers["etag"] == etag
+
+            lab_catalog_crud.create(db, CatalogLabCreate(nombre=f"Snapshot {tag}"))
+            after = client.get("/lab-catalog", headers={**headers, "If-None-Match": etag})
+            assert after.status_code == 200
+            assert f"Snapshot {tag}" in [item["nombre"] for item in after.json()]
+
+            legacy = client.get("/labs/catalogo")
+            assert legacy.json()[0].keys() >= {"id", "nombre", "activo"}
+            assert client.get("/labs/catalogo", headers={"If-None-Match": legacy.headers["etag"]}).status_code == 304
+    finally:
+        db.rollback()
+        db.query(CatalogLab).filter(CatalogLab.nombre == f"Snapshot {tag}").delete()
+        db.commit()
+        lab_catalog_crud.invalidate_snapshot()
@@ -0,0 +1,137 @@
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.api.routers.auth import client_ip
+from app.core.config import settings
+from app.core.rate_limit import LoginThrottle, MemoryBackend
+
+
+def _throttle(**kwargs) -> LoginThrottle:
+    options = {"window_seconds": 60, "max_per_identifier": 2, "max_per_ip": 3}
+    options.update(kwargs)
+    return LoginThrottle(MemoryBackend(), **options)
+
+
+def test_identifier_is_blocked_after_failures():
+    throttle = _throttle()
+    for _ in range(2):
+        throttle.check("0999", "10.0.0.1")
+        throttle.record_failure("0999", "10.0.0.1")
+    with pytest.raises(HTTPException) as exc_info:
+        throttle.check("0999", "10.0.0.2")
+    assert exc_info.value.status_code == 429
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+    assert throttle.stats()["verifications_avoided"] == 1
+
+
+def test_ip_is_blocked_across_identifiers():
+    throttle = _throttle()
+    for identifier in ("a", "b", "c"):
+        throttle.check(identifier, "10.0.0.1")
+    with pytest.raises(HTTPException):
+        throttle.check("d", "10.0.0.1")
+    throttle.check("d", "10.0.0.2")
+
+
+def test_success_resets_identifier_and_returns_the_ip_slot():
+    throttle = _throttle(max_per_ip=2)
+    throttle.check("0999", "10.0.0.1")
+    attempt = throttle.check("0999", "10.0.0.1")
+    throttle.record_success("0999", "10.0.0.1", attempt)
+    # One counted failure is left on the IP, none on the identifier.
+    throttle.check("0999", "10.0.0.1")
+    with pytest.raises(HTTPException):
+        throttle.check("other", "10.0.0.1")
+
+
+def test_parallel_attempts_stop_at_the_limit():
+    throttle = _throttle(max_per_identifier=3, max_per_ip=100)
+    start = threading.Barrier(12)
+
+    def attempt(_) -> int:
+        start.wait()
+        try:
+            throttle.check("0999", "10.0.0.1")
+        except HTTPException as exc:
+            return exc.status_code
+        return 200
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        statuses = list(pool.map(attempt, range(12)))
+    assert sorted(statuses) == [200] * 3 + [429] * 9
+
+
+def test_memory_backend_sweeps_expired_keys_then_drops_least_recent(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.time", lambda: now[0])
+    backend = MemoryBackend(max_keys=3)
+    backend.acquire([("old", 5)], 60)
+    now[0] += 120
+    for key in ("a", "b", "c"):
+        backend.acquire([(key, 5)], 60)
+    assert backend.stats() == {"keys": 3, "keys_evicted": 0}  # "old" had expired
+
+    backend.acquire([("a", 5)], 60)  # refreshes "a", so "b" is now the least recent
+    backend.acquire([("d", 5)], 60)
+    assert backend.stats() == {"keys": 3, "keys_evicted": 1}
+    assert backend.acquire([("b", 1)], 60)[0] is not None  # its count was dropped
+    assert backend.acquire([("a", 2)], 60) == (None, 60)
+
+
+def _request(peer: str, forwarded: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (peer, 443)})
+
+
+def test_client_ip_uses_the_entry_the_trusted_proxy_appended(monkeypatch):
+    monkeypatch.setattr(settings, "WEB_TRUSTED_PROXY_HOPS", 1)
+    assert client_ip(_request("10.1.0.7", "203.0.113.5")) == "203.0.113.5"
+    # A client-supplied entry sits left of the one the proxy appended.
+    assert client_ip(_request("10.1.0.7", "1.2.3.4, 203.0.113.5")) == "203.0.113.5"
+    assert client_ip(_request("10.1.0.7")) == "10.1.0.7"
+
+    monkeypatch.setattr(settings, "WEB_TRUSTED_PROXY_HOPS", 0)
+    assert client_ip(_request("10.1.0.7", "203.0.113.5")) == "10.1.0.7"
+
+
+@pytest.mark.requires_db
+def test_forwarded_clients_are_throttled_separately(monkeypatch):
+    from app.main import app
+
+    throttle = _throttle(max_per_identifier=100)
+    monkeypatch.setattr("app.api.routers.auth.get_login_throttle", lambda: throttle)
+    monkeypatch.setattr(settings, "WEB_TRUSTED_PROXY_HOPS", 1)
+
+    def login(forwarded: str) -> int:
+        body = {"username": f"nobody-{uuid.uuid4().hex[:8]}", "password": "wrong-password"}
+        return client.post("/auth/admin/login", json=body, headers={"X-Forwarded-For": forwarded}).status_code
+
+    with TestClient(app) as client:
+        assert [login("203.0.113.5") for _ in range(4)] == [401, 401, 401, 429]
+        assert login("198.51.100.9") == 401
+
+
+@pytest.mark.requires_db
+def test_parallel_wrong_passwords_are_cut_off_before_bcrypt(monkeypatch, make_user):
+    from app.core.security import get_password_hash
+    from app.main import app
+
+    user = make_user("admin", password_hash=get_password_hash("right-password"))
+    throttle = _throttle(max_per_identifier=2, max_per_ip=100)
+    monkeypatch.setattr("app.api.routers.auth.get_login_throttle", lambda: throttle)
+    start = threading.Barrier(8)
+
+    def login(_) -> int:
+        start.wait()
+        body = {"username": user.username, "password": "wrong-password"}
+        return client.post("/auth/admin/login", json=body).status_code
+
+    with TestClient(app) as client, ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(login, range(8)))
+    assert sorted(statuses) == [401] * 2 + [429] * 6
@@ -0,0 +1,130 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, DateTime, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from app.core.config import settings
+from app.core.pagination import InvalidCursor, Keyset, clamp_limit, encode_cursor
+from app.models.consultation import Consultation
+from app.models.patient import Patient
+
+LocalBase = declarative_base()
+
+
+class Row(LocalBase):
+    __tablename__ = "rows"
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine("sqlite://")
+    LocalBase.metadata.create_all(engine)
+    start = datetime(2025, 1, 1)
+    with Session(engine) as db:
+        # Duplicate leading keys on purpose: the id tiebreaker must keep pages disjoint.
+        db.add_all(
+            Row(id=n, name=f"n{n // 3}", created_at=start + timedelta(days=n // 2)) for n in range(1, 11)
+        )
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def _walk(db: Session, keyset: Keyset, limit: int) -> list[list[int]]:
+    pages, cursor = [], None
+    while True:
+        page = keyset.page(keyset.apply(db.query(Row), cursor, limit).all(), limit)
+        pages.append([row.id for row in page.items])
+        if page.next_cursor is None:
+            return pages
+        cursor = page.next_cursor
+
+
+def test_keyset_pages_ascending_without_gaps_or_repeats(session):
+    pages = _walk(session, Keyset(Row.name, Row.id), limit=4)
+    assert pages == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
+
+
+def test_keyset_pages_descending_on_timestamp(session):
+    pages = _walk(session, Keyset(Row.created_at, Row.id, descending=True), limit=3)
+    assert pages == [[10, 9, 8], [7, 6, 5], [4, 3, 2], [1]]
+
+
+def test_exact_multiple_has_no_trailing_cursor(session):
+    page = Keyset(Row.name, Row.id).page(session.query(Row).order_by(Row.id).limit(11).all(), 10)
+    assert len(page.items) == 10
+    assert page.next_cursor is None
+
+
+def test_cursor_roundtrips_typed_values():
+    keyset = Keyset(Consultation.created_at, Consultation.id)
+    created_at = datetime(2025, 3, 1, 8, 30, 15, 123456, tzinfo=timezone.utc)
+    consultation_id = uuid.uuid4()
+    assert keyset.decode(encode_cursor([created_at, consultation_id])) == (created_at, consultation_id)
+
+
+@pytest.mark.parametrize("cursor", ["%%%", encode_cursor(["only-one"]), encode_cursor(["x", "not-a-uuid"]), "bnVsbA"])
+def test_invalid_cursor_rejected(cursor):
+    with pytest.raises(InvalidCursor):
+        Keyset(Patient.apellidos, Patient.id).decode(cursor)
+
+
+def test_clamp_limit_caps_client_values():
+    assert clamp_limit(None) == settings.PAGINATION_DEFAULT_LIMIT
+    assert clamp_limit(10**6) == settings.PAGINATION_MAX_LIMIT
+
+
+@pytest.mark.requires_db
+def test_patient_consultations_cursor_and_compat_modes(make_patient, make_consultation, patient_headers):
+    from app.main import app
+
+    patient = make_patient("pg", apellidos="Pagination")
+    created_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # Five consultations share a timestamp so the id tiebreaker is exercised.
+    for n in range(5):
+        make_consultation(patient, diagnosis=f"dx{n}", created_at=created_at)
+    headers = patient_headers(patient)
+    with TestClient(app) as client:
+        legacy = client.get("/patient/consultations", headers=headers)
+        assert legacy.status_code == 200
+        assert isinstance(legacy.json(), list) and len(legacy.json()) == 5
+        assert "x-next-cursor" not in legacy.headers
+
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            body = client.get("/patient/consultations", headers=headers, params=params).json()
+            seen.extend(item["id"] for item in body["items"])
+            cursor = body["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [item["id"] for item in legacy.json()]
+
+        bad = client.get("/patient/consultations", headers=headers, params={"cursor": "garbage"})
+        assert bad.status_code == 400
+
+
+@pytest.mark.requires_db
+def test_legacy_list_over_the_limit_is_flagged(monkeypatch, caplog, make_patient, make_consultation, patient_headers):
+    from app.main import app
+
+    monkeypatch.setattr(settings, "PAGINATION_LEGACY_LIMIT", 3)
+    patient = make_patient("pg", apellidos="Legacy")
+    for n in range(5):
+        make_consultation(patient, diagnosis=f"dx{n}")
+    headers = patient_headers(patient)
+    with TestClient(app) as client, caplog.at_level("WARNING", logger="app.api.deps"):
+        legacy = client.get("/patient/consultations", headers=headers)
+        rest = client.get("/patient/consultations", headers=headers, params={"cursor": legacy.headers["x-next-cursor"]})
+
+    assert len(legacy.json()) == 3
+    assert legacy.headers["deprecation"] == "true"
+    assert legacy.headers["warning"].startswith('299 - "Truncated to 3 items')
+    assert any("/patient/consultations truncated to 3 items" in record.getMessage() for record in caplog.records)
+    assert len(rest.json()["items"]) == 2
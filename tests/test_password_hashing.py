@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import security
+from app.core.config import settings
+
+
+class _FakeContext:
+    """Verify cost doubles per round, as with bcrypt: 10 ms at 10 rounds."""
+
+    def __init__(self, clock: list[float], rounds: int) -> None:
+        self.clock = clock
+        self.rounds = rounds
+
+    def hash(self, password: str) -> str:
+        return f"fake-{self.rounds}"
+
+    def verify(self, password: str, hashed: str) -> bool:
+        self.clock[0] += 0.010 * 2 ** (self.rounds - 10)
+        return True
+
+
+def test_calibration_stops_at_the_first_round_over_target(monkeypatch):
+    clock = [0.0]
+    built = []
+
+    def build(rounds: int) -> _FakeContext:
+        built.append(rounds)
+        return _FakeContext(clock, rounds)
+
+    monkeypatch.setattr(security, "_build_pwd_context", build)
+    monkeypatch.setattr(security, "time", SimpleNamespace(perf_counter=lambda: clock[0]))
+    chosen, timings = security.calibrate_bcrypt_rounds(35, min_rounds=10, max_rounds=16, samples=1)
+    assert chosen == 11
+    assert built == [10, 11, 12]
+    assert timings == pytest.approx({10: 10.0, 11: 20.0, 12: 40.0})
+
+
+@pytest.fixture()
+def bcrypt_rounds(monkeypatch):
+    monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+    security.get_pwd_context.cache_clear()
+    yield 5
+    security.get_pwd_context.cache_clear()
+
+
+def _rounds(hashed: str) -> int:
+    return security._build_pwd_context().handler("bcrypt_sha256").from_string(hashed).rounds
+
+
+def test_configured_cost_pins_both_bounds(bcrypt_rounds):
+    context = security.get_pwd_context()
+    assert context.needs_update(security._build_pwd_context(4).hash("clave-segura"))
+    assert context.needs_update(security._build_pwd_context(6).hash("clave-segura"))
+    assert not context.needs_update(context.hash("clave-segura"))
+
+
+@pytest.mark.requires_db
+@pytest.mark.parametrize("stored_rounds", [4, 6])
+def test_login_rehashes_to_the_configured_cost(stored_rounds, bcrypt_rounds, db, make_user):
+    from app.main import app
+
+    admin = make_user("admin", password_hash=security._build_pwd_context(stored_rounds).hash("clave-segura"))
+    with TestClient(app) as client:
+        response = client.post("/auth/admin/login", json={"username": admin.username, "password": "clave-segura"})
+    assert response.status_code == 200, response.text
+    db.refresh(admin)
+    assert _rounds(admin.password_hash) == bcrypt_rounds
+    assert security._build_pwd_context().verify("clave-segura", admin.password_hash)
@@ -0,0 +1,27 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.executor import ExecutorBusyError
+
+
+pytestmark = pytest.mark.requires_db
+
+
+def test_reset_password_reports_busy_hashing_pool_as_503(monkeypatch, db, make_patient, admin_headers):
+    from app.main import app
+
+    def busy(password: str) -> str:
+        raise ExecutorBusyError("hashing executor is saturated")
+
+    monkeypatch.setattr("app.api.routers.admin.get_password_hash", busy)
+    patient = make_patient("rp")
+    with TestClient(app) as client:
+        response = client.post(
+            f"/admin/patients/{patient.id}/reset-password",
+            json={"new_password": "nueva-clave-1"},
+            headers=admin_headers,
+        )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    db.refresh(patient)
+    assert patient.password_hash == "x"
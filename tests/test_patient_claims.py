@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import _patient_id_claim, decode_token, principal_cache
+from app.core.security import get_password_hash
+
+
+@pytest.fixture()
+def client():
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def test_patient_id_claim_ignores_missing_and_malformed_values():
+    patient_id = uuid.uuid4()
+    assert _patient_id_claim({"patient_id": str(patient_id)}) == patient_id
+    for payload in ({}, {"patient_id": None}, {"patient_id": ""}, {"patient_id": "not-a-uuid"}, {"patient_id": 42}):
+        assert _patient_id_claim(payload) is None
+
+
+@pytest.mark.requires_db
+def test_patient_token_carries_the_patient_id(client, make_patient, make_user):
+    patient = make_patient("pid")
+    make_user("patient", username=patient.cedula, password_hash=get_password_hash("clave-1"))
+    res = client.post("/auth/patient/login", json={"cedula": patient.cedula, "password": "clave-1"})
+    assert res.status_code == 200, res.text
+    assert decode_token(res.json()["access_token"])["patient_id"] == str(patient.id)
+
+
+@pytest.mark.requires_db
+@pytest.mark.parametrize("claim", [None, "not-a-uuid"])
+def test_token_without_a_usable_claim_resolves_the_patient(
+    claim, client, make_patient, make_consultation, make_user, auth_headers
+):
+    patient = make_patient("pid")
+    consultation = make_consultation(patient)
+    user = make_user("patient", username=patient.cedula)
+    principal_cache.discard(str(user.id))
+
+    res = client.get("/patient/consultations", params={"limit": 10}, headers=auth_headers(user.id, "PATIENT", claim))
+    assert res.status_code == 200, res.text
+    assert [item["id"] for item in res.json()["items"]] == [str(consultation.id)]
+    assert principal_cache.get(str(user.id)).patient_id == patient.id
+
+
+@pytest.mark.requires_db
+def test_patients_cannot_reach_each_others_records(client, make_patient, make_consultation, patient_headers):
+    own, other = make_patient("own"), make_patient("other")
+    own_consultation = make_consultation(own, medications=1)
+    other_consultation = make_consultation(other, medications=1)
+    headers = patient_headers(own)
+
+    def status_of(path: str) -> int:
+        return client.get(path, headers=headers).status_code
+
+    assert status_of(f"/patient/consultations/{own_consultation.id}") == 200
+    assert status_of(f"/patient/consultations/{other_consultation.id}") == 403
+    assert status_of(f"/consultations/{own_consultation.id}/print") == 200
+    assert status_of(f"/consultations/{other_consultation.id}/print") == 403
+    assert status_of(f"/consultas/{own_consultation.id}/labs") == 200
+    assert status_of(f"/consultas/{other_consultation.id}/labs") == 403
+    assert status_of(f"/patients/{own.id}/consultations/{own_consultation.id}/medications") == 200
+    assert status_of(f"/patients/{other.id}/consultations/{other_consultation.id}/medications") == 403
+    # Another patient's consultation under one's own id is simply not there.
+    assert status_of(f"/patients/{own.id}/consultations/{other_consultation.id}/medications") == 404
+    assert status_of(f"/patients/{own.id}/current-medications") == 200
+    assert status_of(f"/patients/{other.id}/current-medications") == 403
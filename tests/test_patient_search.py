@@ -0,0 +1,69 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.crud import patients as patient_crud
+
+
+def test_search_text_folds_accents_case_and_spacing():
+    assert patient_crud.normalize_search_text("  MUÑOZ   Álvarez ") == "munoz alvarez"
+    assert patient_crud.search_name_for("Cedeño Vélez", "José Ángel") == "cedeno velez jose angel"
+
+
+
+class _ProbeSession:
+    def __init__(self, present: bool) -> None:
+        self.present = present
+        self.probes = 0
+
+    async def scalar(self, statement, params=None):
+        self.probes += 1
+        return self.present
+
+
+def test_trigram_probe_is_repeated_after_its_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.core.cache.time.monotonic", lambda: now[0])
+    patient_crud.trigram_probe_cache.clear()
+    db = _ProbeSession(present=False)
+    try:
+        assert not asyncio.run(patient_crud._trigram_available(db))
+        assert not asyncio.run(patient_crud._trigram_available(db))
+        assert db.probes == 1
+
+        db.present = True  # the index was built after startup
+        now[0] += patient_crud.trigram_probe_cache.ttl
+        assert asyncio.run(patient_crud._trigram_available(db))
+        assert db.probes == 2
+    finally:
+        patient_crud.trigram_probe_cache.clear()
+
+
+@pytest.mark.requires_db
+def test_search_ranks_cedula_then_name_prefix(make_patient, admin_headers):
+    from app.main import app
+
+    tag = uuid.uuid4().hex[:6]
+    people = [
+        (f"{tag}01", f"Zz{tag} Muñoz", "Ana"),
+        (f"{tag}02", f"Zz{tag} Munoz", "Luis"),
+        (f"x{tag}", f"Other{tag}", "Pedro"),
+    ]
+    for cedula, apellidos, nombres in people:
+        search_name = patient_crud.search_name_for(apellidos, nombres)
+        make_patient(cedula=cedula, apellidos=apellidos, nombres=nombres, search_name=search_name)
+    headers = admin_headers
+    with TestClient(app) as client:
+        by_name = client.get("/admin/patients/search", headers=headers, params={"q": f"ZZ{tag} MUÑ"})
+        assert by_name.status_code == 200
+        assert [row["nombres"] for row in by_name.json()] == ["Ana", "Luis"]
+
+        by_cedula = client.get("/admin/patients/search", headers=headers, params={"q": f"{tag}02"})
+        assert [row["cedula"] for row in by_cedula.json()] == [f"{tag}02"]
+
+        limited = client.get("/admin/patients/search", headers=headers, params={"q": tag, "limit": 1})
+        assert [row["cedula"] for row in limited.json()] == [f"{tag}01"]
+
+        assert client.get("/admin/patients/search", headers=headers, params={"q": "a"}).status_code == 422
@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.crud import consultations as consultation_crud
+from app.crud import patient_summaries as patient_summary_crud
+from app.models.consultation import Consultation
+from app.models.patient_summary import PatientSummary
+from app.schemas.consultation import ConsultationCreate
+
+
+pytestmark = pytest.mark.requires_db
+
+
+@pytest.fixture()
+def db_patient(db, make_patient):
+    return db, make_patient("ps", apellidos="Summary")
+
+
+def _create(db, patient, fecha: datetime, diagnosis: str) -> Consultation:
+    data = ConsultationCreate(
+        cedula=patient.cedula,
+        fecha=fecha,
+        diagnosis=diagnosis,
+        medications=[{"drug_name": "Metformina", "quantity": 30}],
+    )
+    return consultation_crud.create(db, patient.id, data)
+
+
+def _summary(db, patient_id) -> tuple:
+    db.expire_all()
+    summary = db.get(PatientSummary, patient_id)
+    return summary.latest_consultation_id, summary.consultation_count
+
+
+def test_create_maintains_latest_and_count(db_patient):
+    db, patient = db_patient
+    newest = _create(db, patient, datetime(2025, 3, 1, tzinfo=timezone.utc), "newest")
+    assert _summary(db, patient.id) == (newest.id, 1)
+
+    # A back-dated consultation bumps the count but is not the latest.
+    _create(db, patient, datetime(2024, 1, 1, tzinfo=timezone.utc), "older")
+    assert _summary(db, patient.id) == (newest.id, 2)
+    assert consultation_crud.get_latest_by_patient(db, patient.id).diagnosis == "newest"
+
+    db.query(PatientSummary).filter(PatientSummary.patient_id == patient.id).update({"consultation_count": 99})
+    db.commit()
+    patient_summary_crud.refresh(db, patient.id)
+    db.commit()
+    assert _summary(db, patient.id) == (newest.id, 2)
+
+
+def test_summary_rolls_back_with_consultation(db_patient):
+    db, patient = db_patient
+    consultation = Consultation(patient_id=patient.id, diagnosis="uncommitted")
+    db.add(consultation)
+    db.flush()
+    patient_summary_crud.record_consultation(db, consultation.id)
+    db.rollback()
+    assert db.get(PatientSummary, patient.id) is None
+    assert consultation_crud.get_latest_by_patient(db, patient.id) is None
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import principal_cache
+from app.core.cache import TTLCache
+from app.core.sql_stats import capture_queries
+
+
+def test_cache_hit_and_miss_counters():
+    cache = TTLCache(maxsize=4, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_expires_entries():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_cache_invalidation():
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("a", {"username": "x"})
+    cache.set("b", {"username": "y"})
+    cache.discard("a")
+    cache.discard_where(lambda value: value["username"] == "y")
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.stats()["invalidations"] == 2
+
+
+@pytest.mark.requires_db
+def test_async_routes_load_the_principal_without_the_sync_session(
+    monkeypatch, primary_reads, make_patient, patient_headers
+):
+    from app.main import app
+
+    def no_sync_session():
+        raise AssertionError("async route opened a sync session")
+
+    patient = make_patient("pc")
+    principal_cache.clear()
+    monkeypatch.setattr("app.api.deps.SessionLocal", no_sync_session)
+    with TestClient(app) as client:
+        response = client.get("/patient/me/visits", headers=patient_headers(patient))
+    assert response.status_code == 200, response.text
+    assert principal_cache.get(str(patient.id)).patient_id == patient.id
+
+
+@pytest.fixture()
+def client():
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.mark.requires_db
+def test_cached_principal_is_served_without_a_query(client, admin_headers):
+    assert client.get("/auth/me", headers=admin_headers).status_code == 200
+    with capture_queries() as stats:
+        res = client.get("/auth/me", headers=admin_headers)
+    assert res.status_code == 200
+    assert stats.count == 0
+
+
+@pytest.mark.requires_db
+@pytest.mark.parametrize(
+    "method, body",
+    [("delete", None), ("put", {"activo": False})],
+)
+def test_deactivating_a_patient_applies_to_the_next_request(
+    method, body, client, make_patient, patient_headers, admin_headers
+):
+    patient = make_patient("pc")
+    headers = patient_headers(patient)
+    assert client.get("/auth/me", headers=headers).status_code == 200
+
+    res = client.request(method, f"/admin/patients/{patient.id}", json=body, headers=admin_headers)
+    assert res.status_code == 200, res.text
+    assert client.get("/auth/me", headers=headers).status_code == 403
+
+
+@pytest.mark.requires_db
+def test_password_reset_reactivates_on_the_next_request(client, make_patient, make_user, auth_headers, admin_headers):
+    patient = make_patient("pc")
+    user = make_user("patient", username=patient.cedula, activo=False)
+    headers = auth_headers(user.id, "PATIENT", patient.id)
+    assert client.get("/auth/me", headers=headers).status_code == 403
+
+    res = client.post(
+        f"/admin/patients/{patient.id}/reset-password",
+        json={"new_password": "nueva-clave-1"},
+        headers=admin_headers,
+    )
+    assert res.status_code == 200, res.text
+    assert client.get("/auth/me", headers=headers).status_code == 200
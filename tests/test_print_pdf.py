@@ -0,0 +1,136 @@
+import os
+import re
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import pdf_cache
+from app.core.pdf import CONTENT_WIDTH, render_consultation, text_width, wrap
+from app.core.pdf_cache import PdfCache, payload_key
+
+
+def _payload(medications: int = 2) -> dict:
+    return {
+        "patient": {"nombres": "José", "apellidos": "Ñandú (Pérez)", "cedula": "0102030405", "fecha_nacimiento": "1980-02-03"},
+        "consultation": {
+            "created_at": "2025-01-02T08:30:15Z",
+            "diagnosis": "Diabetes mellitus tipo 2 con control metabolico parcial",
+            "notes": None,
+            "indications": "Dieta, caminar 30 minutos diarios \\ control en 3 meses",
+        },
+        "medications": [
+            {"drug_name": f"Metformina {n}", "quantity": 30, "description": "1 tableta cada 12 horas", "duration_days": 30}
+            for n in range(medications)
+        ],
+        "labs": [
+            {"lab_nombre": "Glucosa", "valor_num": 110.0, "valor_texto": None, "unidad_snapshot": "mg/dL", "rango_ref_snapshot": "70 - 100"}
+        ],
+    }
+
+
+def _content(document: bytes) -> list[bytes]:
+    """Check the xref table against the file and return each page's operators."""
+    xref = int(document.rsplit(b"startxref\n", 1)[1].split(b"\n")[0])
+    assert document[xref:].startswith(b"xref")
+    for number, offset in enumerate(re.findall(rb"(\d{10}) 00000 n ", document[xref:]), start=1):
+        assert document[int(offset):].startswith(b"%d 0 obj" % number)
+    streams = []
+    for match in re.finditer(rb"<< /Length (\d+) /Filter /FlateDecode >>\nstream\n", document):
+        data = document[match.end():match.end() + int(match.group(1))]
+        assert document[match.end() + len(data):].startswith(b"\nendstream")
+        streams.append(zlib.decompress(data))
+    return streams
+
+
+def test_consultation_pdf_is_well_formed_and_deterministic():
+    document = render_consultation(_payload())
+    assert document.startswith(b"%PDF-1.4") and document.endswith(b"%%EOF\n")
+    assert document == render_consultation(_payload())
+    [page] = _content(document)
+    assert b"(Jos\xe9 \xd1and\xfa \\(P\xe9rez\\) - Cedula: 0102030405) Tj" in page
+    assert b"\\\\ control" in page
+    assert b"(110) Tj" in page
+
+
+def test_long_medication_lists_break_pages_and_repeat_the_header():
+    pages = _content(render_consultation(_payload(medications=80)))
+    assert len(pages) > 1
+    assert b"/Count %d" % len(pages) in render_consultation(_payload(medications=80))
+    assert all(b"(Medicamento) Tj" in page for page in pages[1:])
+
+
+def test_wrap_keeps_lines_within_width():
+    lines = wrap("Diabetes " * 40 + "x" * 300, CONTENT_WIDTH, 10)
+    assert len(lines) > 2
+    assert all(text_width(line, 10) <= CONTENT_WIDTH for line in lines)
+    assert wrap("", CONTENT_WIDTH, 10) == [""]
+
+
+def test_payload_key_ignores_key_order_and_tracks_content():
+    payload = _payload()
+    reordered = dict(reversed(list(_payload().items())))
+    assert payload_key(payload) == payload_key(reordered)
+    payload["consultation"]["notes"] = "nota"
+    assert payload_key(payload) != payload_key(reordered)
+
+
+def test_disk_cache_round_trip_and_prune(tmp_path):
+    cache = PdfCache(tmp_path, max_entries=100)
+    assert cache.get("ab" * 32) is None
+    for n in range(5):
+        key = f"{n:02d}" * 32
+        cache.put(key, b"%PDF-" + bytes([48 + n]))
+        os.utime(cache.path(key), (n, n))
+    assert cache.get("00" * 32) == b"%PDF-0"  # a hit makes it the most recent
+    cache.max_entries = 3
+    assert cache.prune() == 2
+    assert sorted(path.name[:2] for path in tmp_path.glob("*/*.pdf")) == ["00", "03", "04"]
+    assert not list(tmp_path.glob("*/*.tmp"))
+    assert (cache.stats()["hits"], cache.stats()["misses"], cache.stats()["evicted"]) == (1, 1, 2)
+
+
+def test_disk_cache_prunes_on_write(tmp_path):
+    cache = PdfCache(tmp_path, max_entries=1)
+    cache.put("aa" * 32, b"%PDF-a")
+    cache.put("bb" * 32, b"%PDF-b")
+    assert len(list(tmp_path.glob("*/*.pdf"))) == 1
+
+
+@pytest.fixture()
+def consultation(monkeypatch, tmp_path, make_patient, make_consultation, patient_headers):
+    monkeypatch.setattr(pdf_cache, "_pdf_cache", PdfCache(tmp_path))
+    patient = make_patient("pdf", apellidos="Print", nombres="Pdf")
+    other = make_patient("pdf", apellidos="Print", nombres="Other")
+    consultation = make_consultation(patient, medications=1)
+    try:
+        yield {"id": str(consultation.id), "headers": patient_headers(patient), "other_headers": patient_headers(other)}
+    finally:
+        pdf_cache.shutdown_pdf_executor()
+
+
+@pytest.mark.requires_db
+def test_print_pdf_renders_once_then_serves_from_disk(consultation, monkeypatch):
+    from app.api.routers import consultations as consultations_router
+    from app.main import app
+
+    path = f"/consultations/{consultation['id']}/print.pdf"
+    with TestClient(app) as client:
+        first = client.get(path, headers=consultation["headers"])
+        second = client.get(path, headers=consultation["headers"])
+        revalidated = client.get(path, headers={**consultation["headers"], "If-None-Match": first.headers["etag"]})
+        forbidden = client.get(path, headers=consultation["other_headers"])
+        stats = pdf_cache.pdf_stats()
+        monkeypatch.setattr(consultations_router, "LAYOUT_VERSION", consultations_router.LAYOUT_VERSION + 1)
+        relayout = client.get(path, headers={**consultation["headers"], "If-None-Match": first.headers["etag"]})
+
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "application/pdf"
+    assert first.headers["content-disposition"] == f'inline; filename="consulta-{consultation["id"]}.pdf"'
+    assert first.content.startswith(b"%PDF-")
+    assert second.content == first.content
+    assert revalidated.status_code == 304
+    assert relayout.status_code == 200 and relayout.headers["etag"] != first.headers["etag"]
+    assert forbidden.status_code == 403
+    assert stats["executor"]["completed"] == 1
+    assert (stats["cache"]["misses"], stats["cache"]["hits"], stats["cache"]["writes"]) == (1, 1, 1)
@@ -0,0 +1,161 @@
+import uuid
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.core.sql_stats import capture_queries
+from app.crud import patient_summaries as patient_summary_crud
+from app.crud import visits as visit_crud
+from app.main import app
+from app.models import CatalogLab, ConsultaLab, Consultation, Medication, MedicationCatalog, PrescriptionItem, Visit
+
+
+pytestmark = pytest.mark.requires_db
+
+
+def _seed_patient(db, make_patient, size: int, catalog_labs: list[CatalogLab], catalog_meds: list[MedicationCatalog]) -> dict:
+    patient = make_patient("qb", apellidos="Budget", nombres="Query")
+    consultations = []
+    for index in range(size):
+        consultation = Consultation(patient_id=patient.id, diagnosis=f"dx{index}")
+        db.add(consultation)
+        db.flush()
+        consultations.append(consultation)
+        for order in range(size):
+            db.add(Medication(consultation_id=consultation.id, drug_name=f"med{order}", sort_order=order))
+            db.add(ConsultaLab(consulta_id=consultation.id, lab_id=catalog_labs[order].id, valor_num=order))
+        visit = Visit(patient_id=patient.id, fecha_consulta=date(2025, 1, index + 1), diagnostico=f"v{index}")
+        db.add(visit)
+        db.flush()
+        for order in range(size):
+            db.add(
+                PrescriptionItem(
+                    visit_id=visit.id,
+                    medication_id=catalog_meds[order].id,
+                    dosis="1",
+                    horario="8h",
+                    via="VO",
+                    duracion="7d",
+                )
+            )
+    # Rows are inserted directly, so build the summary the write path would have.
+    patient_summary_crud.refresh(db, patient.id)
+    db.commit()
+    return {
+        "patient": patient,
+        "consultation_id": str(consultations[-1].id),
+        "visit_id": str(visit.id),
+    }
+
+
+@pytest.fixture()
+def catalog(db):
+    # Distinct catalog rows per item, so lazy loads cannot hide behind the identity map.
+    labs = [CatalogLab(nombre=f"qb-lab-{uuid.uuid4().hex[:8]}", unidad="%", activo=True) for _ in range(5)]
+    meds = [MedicationCatalog(nombre_generico=f"Metformina {n}", activo=True) for n in range(5)]
+    db.add_all([*labs, *meds])
+    db.commit()
+    yield labs, meds
+    db.rollback()
+    db.query(CatalogLab).filter(CatalogLab.id.in_([lab.id for lab in labs])).delete(synchronize_session=False)
+    db.query(MedicationCatalog).filter(MedicationCatalog.id.in_([med.id for med in meds])).delete(synchronize_session=False)
+    db.commit()
+
+
+@pytest.fixture()
+def seeded(db, catalog, make_patient, patient_headers, admin_headers):
+    # catalog is set up before make_patient, so it is torn down after the rows referencing it.
+    catalog_labs, catalog_meds = catalog
+    small = _seed_patient(db, make_patient, 1, catalog_labs, catalog_meds)
+    large = _seed_patient(db, make_patient, 5, catalog_labs, catalog_meds)
+    for data in (small, large):
+        data["headers"] = patient_headers(data["patient"])
+    return {"small": small, "large": large, "catalog_labs": catalog_labs, "admin_headers": admin_headers}
+
+
+def _patient_paths(data: dict) -> dict[str, str]:
+    return {
+        "/patient/consultations": 2,
+        f"/patient/consultations/{data['consultation_id']}": 2,
+        "/patient/medication/current": 2,
+        f"/consultations/{data['consultation_id']}/print": 3,
+        f"/consultas/{data['consultation_id']}/labs": 2,
+    }
+
+
+def _admin_paths(data: dict) -> dict[str, str]:
+    cedula = data["patient"].cedula
+    return {
+        f"/admin/consultations?cedula={cedula}": 3,
+        f"/admin/patients/{cedula}/current-medications": 3,
+        f"/admin/consultations/{data['consultation_id']}/print": 3,
+    }
+
+
+def _count(client: TestClient, path: str, headers: dict) -> int:
+    # First call warms the principal cache so only the endpoint's own queries are measured.
+    assert client.get(path, headers=headers).status_code == 200, path
+    with capture_queries() as stats:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.text
+    return stats.count
+
+
+def test_read_paths_use_fixed_query_count(seeded):
+    counts, expected = {}, {}
+    with TestClient(app) as client:
+        for size in ("small", "large"):
+            data = seeded[size]
+            for path, budget in _patient_paths(data).items():
+                key = (size, path.split("?")[0].replace(data["consultation_id"], "{id}"))
+                counts[key] = _count(client, path, data["headers"])
+                expected[key] = budget
+            for path, budget in _admin_paths(data).items():
+                key = (size, path.split("?")[0].replace(data["consultation_id"], "{id}"))
+                counts[key] = _count(client, path, seeded["admin_headers"])
+                expected[key] = budget
+    assert counts == expected
+
+
+def test_visit_loader_options_cover_items_and_medications(seeded):
+    db = SessionLocal()
+    try:
+        counts = {}
+        for size in ("small", "large"):
+            db.expunge_all()
+            with capture_queries() as stats:
+                visit = visit_crud.get(db, seeded[size]["visit_id"])
+                names = [item.medication_nombre for item in visit.items]
+            assert names and all(name.startswith("Metformina") for name in names)
+            counts[size] = stats.count
+        assert counts == {"small": 3, "large": 3}
+    finally:
+        db.close()
+
+
+def test_lab_save_query_count_is_flat(seeded):
+    data = seeded["large"]
+    path = f"/consultas/{data['consultation_id']}/labs"
+    headers = seeded["admin_headers"]
+    labs = seeded["catalog_labs"]
+    # Identifiers by id, by spaced/uppercased name and by substring.
+    identifiers = [str(labs[0].id), f"  {labs[1].nombre.upper()} ", labs[2].nombre[7:], str(labs[3].id), labs[4].nombre]
+    counts = {}
+    with TestClient(app) as client:
+        # Catalog rows were inserted behind the crud layer; the first save
+        # refreshes the snapshot so both measured saves hit it.
+        assert client.post(path, json=[{"lab_id": identifiers[0], "valor_num": 1}], headers=headers).status_code == 200
+        for size in (1, 5):
+            payload = [{"lab_id": identifier, "valor_num": 1} for identifier in identifiers[:size]]
+            with capture_queries() as stats:
+                response = client.post(path, json=payload, headers=headers)
+            assert response.status_code == 200, response.text
+            assert [row["lab_nombre"] for row in response.json()] == [lab.nombre for lab in labs[:size]]
+            counts[size] = stats.count
+        assert counts[1] == counts[5]
+
+        unknown = client.post(path, json=[{"lab_id": str(uuid.uuid4()), "valor_num": 1}], headers=headers)
+        assert unknown.status_code == 400
+        assert len(client.get(path, headers=headers).json()) == 5
@@ -0,0 +1,139 @@
+import os
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.api.deps import (
+    AuthUser,
+    invalidate_principal,
+    invalidate_principal_username,
+    mark_recent_write,
+    principal_cache,
+    reads_pinned_to_primary,
+    recent_writers,
+)
+from app.core.database import Base, SessionLocal, get_replica_async_database_url
+from app.core.security import create_access_token, get_password_hash
+from app.models.consultation import Consultation
+from app.models.consultation_medication import Medication
+from app.models.patient import Patient
+from app.models.user import User
+
+
+# The integration test runs against two independent Postgres databases, e.g.
+# DATABASE_URL=postgresql://.../primary DATABASE_REPLICA_URL=postgresql://.../replica
+# Rows are seeded separately on each side so the response shows which one served it.
+requires_replica = pytest.mark.skipif(
+    not (os.getenv("DATABASE_URL") and os.getenv("DATABASE_REPLICA_URL")),
+    reason="DATABASE_URL and DATABASE_REPLICA_URL not set for integration tests",
+)
+
+
+def test_recent_write_pins_principal_until_expiry():
+    principal_id = uuid.uuid4()
+    assert not reads_pinned_to_primary(principal_id)
+    mark_recent_write(principal_id)
+    assert reads_pinned_to_primary(str(principal_id))
+    recent_writers.discard(str(principal_id))
+    assert not reads_pinned_to_primary(principal_id)
+
+
+def test_invalidated_principal_is_reloaded_from_the_primary():
+    by_id, by_username = uuid.uuid4(), uuid.uuid4()
+    principal_cache.set(str(by_username), AuthUser(by_username, "0999", "patient", True))
+    try:
+        invalidate_principal(by_id)
+        invalidate_principal_username("0999")
+        assert reads_pinned_to_primary(by_id)
+        assert reads_pinned_to_primary(by_username)
+    finally:
+        recent_writers.clear()
+
+
+def _seed(db: Session, patient_id, cedula: str, diagnosis: str) -> None:
+    db.add(
+        Patient(
+            id=patient_id,
+            cedula=cedula,
+            apellidos="Replica",
+            nombres="Test",
+            fecha_nacimiento=date(1990, 1, 1),
+            activo=True,
+            password_hash="x",
+        )
+    )
+    db.flush()
+    db.add(
+        Consultation(
+            patient_id=patient_id,
+            diagnosis=diagnosis,
+            created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        )
+    )
+    db.commit()
+
+
+def _cleanup(db: Session, patient_id) -> None:
+    consultation_ids = db.query(Consultation.id).filter(Consultation.patient_id == patient_id)
+    db.query(Medication).filter(Medication.consultation_id.in_(consultation_ids)).delete(synchronize_session=False)
+    db.query(Consultation).filter(Consultation.patient_id == patient_id).delete(synchronize_session=False)
+    db.query(Patient).filter(Patient.id == patient_id).delete(synchronize_session=False)
+    db.commit()
+
+
+@requires_replica
+def test_reads_go_to_replica_until_principal_writes():
+    from app.main import app
+
+    replica_engine = create_engine(get_replica_async_database_url())
+    Base.metadata.create_all(replica_engine)
+    primary = SessionLocal()
+    replica = Session(replica_engine)
+    patient_id = uuid.uuid4()
+    cedula = f"rr-{uuid.uuid4().hex[:8]}"
+    admin = User(
+        username=f"rr-admin-{uuid.uuid4().hex[:8]}",
+        password_hash=get_password_hash("x"),
+        role="admin",
+        activo=True,
+    )
+    try:
+        primary.add(admin)
+        primary.commit()
+        # The principal is looked up on the replica like the reads, so it needs the row too.
+        replica.add(User(id=admin.id, username=admin.username, password_hash="x", role="admin", activo=True))
+        replica.commit()
+        _seed(primary, patient_id, cedula, "primary")
+        _seed(replica, patient_id, cedula, "replica")
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': str(admin.id), 'role': 'ADMIN'})}"}
+
+        with TestClient(app) as client:
+            res = client.get("/admin/consultations", params={"cedula": cedula}, headers=headers)
+            assert res.status_code == 200, res.text
+            assert [item["diagnosis"] for item in res.json()] == ["replica"]
+
+            res = client.post(
+                "/admin/consultations",
+                json={"cedula": cedula, "diagnosis": "written", "medications": [{"drug_name": "Metformina", "quantity": 30}]},
+                headers=headers,
+            )
+            assert res.status_code == 201, res.text
+
+            res = client.get("/admin/consultations", params={"cedula": cedula}, headers=headers)
+            assert res.status_code == 200, res.text
+            assert sorted(item["diagnosis"] for item in res.json()) == ["primary", "written"]
+    finally:
+        _cleanup(replica, patient_id)
+        _cleanup(primary, patient_id)
+        replica.query(User).filter(User.id == admin.id).delete(synchronize_session=False)
+        replica.commit()
+        primary.delete(admin)
+        primary.commit()
+        primary.close()
+        replica.close()
+        replica_engine.dispose()
+        recent_writers.clear()
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.crud import refresh_tokens as refresh_token_crud
+from app.models import RefreshToken
+
+
+pytestmark = pytest.mark.requires_db
+
+
+@pytest.fixture()
+def client():
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _issue(db, user, **fields) -> str:
+    raw_token, token = refresh_token_crud.issue(db, user.id)
+    for name, value in fields.items():
+        setattr(token, name, value)
+    db.commit()
+    return raw_token
+
+
+def _refresh(client, raw_token: str):
+    return client.post("/auth/refresh", json={"refresh_token": raw_token})
+
+
+def _family(db, raw_token: str) -> list[RefreshToken]:
+    db.expire_all()
+    token = db.query(RefreshToken).filter(RefreshToken.token_hash == refresh_token_crud.hash_token(raw_token)).one()
+    return db.query(RefreshToken).filter(RefreshToken.family_id == token.family_id).all()
+
+
+def test_rotation_revokes_the_old_token_and_the_new_one_works(client, db, make_user):
+    first = _issue(db, make_user("admin"))
+    rotated = _refresh(client, first)
+    assert rotated.status_code == 200, rotated.text
+    second = rotated.json()["refresh_token"]
+    assert second != first and rotated.json()["access_token"]
+
+    third = _refresh(client, second)
+    assert third.status_code == 200
+    family = _family(db, first)
+    assert len(family) == 3
+    assert [token.revoked_at is None for token in family].count(True) == 1
+
+
+def test_reusing_a_rotated_token_revokes_the_family(client, db, make_user):
+    first = _issue(db, make_user("admin"))
+    second = _refresh(client, first).json()["refresh_token"]
+
+    assert _refresh(client, first).status_code == 401
+    assert _refresh(client, second).status_code == 401
+    assert all(token.revoked_at is not None for token in _family(db, first))
+
+
+def test_expired_token_is_rejected(client, db, make_user):
+    raw_token = _issue(db, make_user("admin"))
+    [token] = _family(db, raw_token)
+    token.expires_at = token.created_at - timedelta(seconds=1)
+    db.commit()
+    assert _refresh(client, raw_token).status_code == 401
+
+
+def test_inactive_user_cannot_refresh(client, db, make_user):
+    user = make_user("patient")
+    raw_token = _issue(db, user)
+    user.activo = False
+    db.commit()
+    assert _refresh(client, raw_token).status_code == 401
+    assert all(token.revoked_at is not None for token in _family(db, raw_token))
+
+
+def test_logout_revokes_the_family(client, db, make_user):
+    first = _issue(db, make_user("admin"))
+    second = _refresh(client, first).json()["refresh_token"]
+    assert client.post("/auth/logout", json={"refresh_token": second}).status_code == 200
+    assert _refresh(client, second).status_code == 401
+    assert all(token.revoked_at is not None for token in _family(db, first))
+
+
+def test_admin_password_reset_revokes_the_patients_tokens(client, db, make_patient, make_user, admin_headers):
+    patient = make_patient("rt")
+    raw_token = _issue(db, make_user("patient", username=patient.cedula))
+    reset = client.post(
+        f"/admin/patients/{patient.id}/reset-password",
+        json={"new_password": "nueva-clave-1"},
+        headers=admin_headers,
+    )
+    assert reset.status_code == 200, reset.text
+    assert _refresh(client, raw_token).status_code == 401
+
+
+def test_prune_keeps_only_what_reuse_detection_needs(client, db, make_user):
+    user = make_user("admin")
+    rotated = _issue(db, user)
+    live = _refresh(client, rotated).json()["refresh_token"]
+    logged_out = _issue(db, user)
+    client.post("/auth/logout", json={"refresh_token": logged_out})
+    expired = _issue(db, user)
+    [token] = _family(db, expired)
+    token.expires_at = token.created_at - timedelta(seconds=1)
+    db.commit()
+
+    assert refresh_token_crud.prune(db) >= 2
+    db.expire_all()
+    remaining = {token.token_hash for token in db.query(RefreshToken).filter(RefreshToken.user_id == user.id)}
+    assert remaining == {refresh_token_crud.hash_token(rotated), refresh_token_crud.hash_token(live)}
@@ -0,0 +1,64 @@
+import pytest
+
+from app.core.db_pool import ENGINES_PER_WORKER, pool_sizes_for_budget
+
+
+@pytest.mark.parametrize("budget,workers", [(12, 2), (40, 4), (97, 3), (100, 1)])
+def test_pool_sizes_stay_within_budget(budget, workers):
+    pool_size, max_overflow = pool_sizes_for_budget(budget, workers)
+    assert pool_size >= 1
+    assert max_overflow >= 0
+    assert workers * ENGINES_PER_WORKER * (pool_size + max_overflow) <= budget
+
+
+def test_pool_sizes_keep_one_connection_when_budget_is_tiny():
+    assert pool_sizes_for_budget(2, 8) == (1, 0)
+
+
+def test_runner_options_come_from_settings(monkeypatch):
+    from app.core.config import settings
+    from app.runner import apply_connection_budget, gunicorn_options
+
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", 40)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 5)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 10)
+    monkeypatch.setattr(settings, "DB_POOL_WARM_CONNECTIONS", settings.DB_POOL_WARM_CONNECTIONS)
+    monkeypatch.setenv("PORT", "9000")
+    apply_connection_budget(4)
+    assert (settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW) == (2, 3)
+
+    options = gunicorn_options(4)
+    assert options["bind"].endswith(":9000")
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert options["max_requests"] == settings.WEB_MAX_REQUESTS
+    assert options["preload_app"] == settings.WEB_PRELOAD
+
+
+def test_worker_count_is_capped_without_web_concurrency(monkeypatch):
+    from app import runner
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", None)
+    monkeypatch.setattr(runner, "usable_cpus", lambda: 64)
+    assert runner.worker_count() == runner.DEFAULT_MAX_WORKERS
+    monkeypatch.setattr(runner, "usable_cpus", lambda: 2)
+    assert runner.worker_count() == 2
+    monkeypatch.setattr(settings, "WEB_CONCURRENCY", 8)
+    assert runner.worker_count() == 8
+
+
+def test_missing_budget_is_logged_for_several_workers(monkeypatch, caplog):
+    from app.core.config import settings
+    from app.runner import apply_connection_budget
+
+    monkeypatch.setattr(settings, "DB_CONNECTION_BUDGET", None)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 5)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 10)
+    with caplog.at_level("WARNING", logger="app.runner"):
+        apply_connection_budget(1)
+        assert not caplog.records
+        apply_connection_budget(4)
+    [record] = caplog.records
+    assert "DB_CONNECTION_BUDGET is not set" in record.getMessage()
+    assert f"up to {4 * ENGINES_PER_WORKER * 15} database connections" in record.getMessage()
+    assert settings.DB_POOL_SIZE == 5
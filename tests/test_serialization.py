@@ -0,0 +1,116 @@
+import types
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+from starlette.requests import Request
+
+from app.api.deps import PageParams, get_page_params
+from app.core import serialization
+from app.core.pagination import Page
+from app.schemas.consultation import ConsultationOut
+from app.schemas.pagination import CursorPage
+
+
+def _consultation(n: int, created_at: datetime) -> ConsultationOut:
+    return ConsultationOut(
+        id=uuid.UUID(int=n),
+        created_at=created_at,
+        diagnosis=f"Diabetes tipo 2, control n.º {n}",
+        notes=None,
+        indications="Caminar 30 minutos",
+        medications=[
+            {
+                "id": uuid.UUID(int=1000 + n),
+                "consultation_id": uuid.UUID(int=n),
+                "drug_name": "Metformina",
+                "quantity": 30,
+                "description": "1 tableta cada 12 horas",
+                "duration_days": None,
+                "sort_order": 0,
+                "created_at": created_at,
+                "updated_at": created_at + timedelta(microseconds=250),
+            }
+        ],
+    )
+
+
+CONSULTATIONS = [
+    _consultation(1, datetime(2025, 1, 1, 8, 30, tzinfo=timezone.utc)),
+    _consultation(2, datetime(2025, 1, 2, 8, 30, 15, 123456, tzinfo=timezone(timedelta(hours=-5)))),
+    _consultation(3, datetime(2025, 1, 3, 8, 30)),
+]
+
+
+def _fastapi_body(field_type, value) -> bytes:
+    # What the response_model path produces: validate, dump, jsonable, JSONResponse.
+    adapter = TypeAdapter(field_type)
+    dumped = adapter.dump_python(adapter.validate_python(value), mode="json")
+    return JSONResponse(jsonable_encoder(dumped)).body
+
+
+def test_json_matches_response_model_output():
+    assert serialization.encode(CONSULTATIONS) == _fastapi_body(list[ConsultationOut], CONSULTATIONS)
+    page = {"items": CONSULTATIONS, "next_cursor": "abc"}
+    assert serialization.encode(page) == _fastapi_body(CursorPage[ConsultationOut], page)
+    assert serialization.encode(None) == b"null"
+
+
+def _request(accept: str | None):
+    headers = [] if accept is None else [(b"accept", accept.encode())]
+    return Request({"type": "http", "headers": headers})
+
+
+def test_json_is_served_without_msgpack(monkeypatch):
+    monkeypatch.setattr(serialization, "msgpack", None)
+    assert serialization.response_media_type(_request("application/msgpack")) == "application/json"
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, "application/json"),
+        ("*/*", "application/json"),
+        ("application/json", "application/json"),
+        ("application/msgpack", "application/msgpack"),
+        ("application/x-msgpack", "application/msgpack"),
+        ("application/msgpack, application/json", "application/json"),
+        ("application/msgpack, application/json;q=0.5", "application/msgpack"),
+        ("application/msgpack;q=0.9, */*;q=0.1", "application/msgpack"),
+        ("application/msgpack;q=0", "application/json"),
+    ],
+)
+def test_msgpack_negotiation(monkeypatch, accept, expected):
+    monkeypatch.setattr(serialization, "msgpack", types.SimpleNamespace())
+    assert serialization.response_media_type(_request(accept)) == expected
+
+
+def test_msgpack_round_trip():
+    msgpack = pytest.importorskip("msgpack")
+    body = serialization.encode(CONSULTATIONS[:1], serialization.MSGPACK_MEDIA_TYPE)
+    assert msgpack.unpackb(body) == [CONSULTATIONS[0].model_dump(mode="json")]
+
+
+def test_page_render_keeps_legacy_cursor_header():
+    app = FastAPI()
+
+    @app.get("/items")
+    def items(page: PageParams = Depends(get_page_params)):
+        return page.render(Page(items=CONSULTATIONS[:2], next_cursor="next"), ConsultationOut, headers={"ETag": '"t"'})
+
+    with TestClient(app) as client:
+        legacy = client.get("/items")
+        paged = client.get("/items", params={"limit": 2})
+
+    assert legacy.headers["x-next-cursor"] == "next"
+    assert legacy.headers["deprecation"] == "true"
+    assert legacy.headers["etag"] == '"t"'
+    assert legacy.headers["vary"] == "Accept"
+    assert legacy.content == serialization.encode(CONSULTATIONS[:2])
+    assert "x-next-cursor" not in paged.headers
+    assert paged.json()["next_cursor"] == "next"
@@ -0,0 +1,58 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.sql_stats import (
+    QueryBudgetExceeded,
+    assert_max_queries,
+    begin_request,
+    end_request,
+    instrument_queries,
+    redact_params,
+    server_timing,
+    sql_metrics,
+)
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine("sqlite://")
+    instrument_queries(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_redact_params_hides_values():
+    assert redact_params({"cedula": "0101", "id": 7}) == {"cedula": "<str>", "id": "<int>"}
+    assert redact_params(("secret",)) == ("<str>",)
+    assert redact_params([{"a": 1}, {"a": 2}]) == "<2 parameter sets>"
+
+
+def test_request_stats_flag_repeated_statements(engine, caplog):
+    before = sql_metrics.n_plus_one_requests
+    stats, token = begin_request()
+    with engine.connect() as conn:
+        for value in range(6):
+            conn.execute(text("select :value"), {"value": value})
+    with caplog.at_level(logging.WARNING, logger="app.core.sql_stats"):
+        end_request(stats, token, "GET /test")
+    assert stats.count == 6
+    assert server_timing(stats).startswith("db;dur=")
+    assert 'desc="queries=6"' in server_timing(stats)
+    assert sql_metrics.n_plus_one_requests == before + 1
+    assert "Possible N+1 in GET /test: 6 executions" in caplog.text
+
+
+def test_query_budget(engine):
+    with assert_max_queries(2) as stats:
+        with engine.connect() as conn:
+            conn.execute(text("select 1"))
+            conn.execute(text("select 2"))
+    assert stats.count == 2
+
+    with pytest.raises(QueryBudgetExceeded, match="3 queries executed, budget is 2"):
+        with assert_max_queries(2):
+            with engine.connect() as conn:
+                for _ in range(3):
+                    conn.execute(text("select 1"))
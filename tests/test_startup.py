@@ -0,0 +1,33 @@
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.core.database import dispose_engines
+from app.core.startup import StartupReport, warm_up
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+
+def test_boot_does_not_import_password_hashing():
+    code = "import sys, app.main; print(sorted(m for m in ('passlib', 'multiprocessing') if m in sys.modules))"
+    env = {**os.environ, "SECRET_KEY": "test", "ADMIN_USERNAME": "admin"}
+    env.setdefault("DATABASE_URL", "")
+    result = subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_warm_up_records_phases():
+    async def _run() -> StartupReport:
+        try:
+            return await warm_up(StartupReport())
+        finally:
+            await dispose_engines()
+
+    report = asyncio.run(_run())
+    snapshot = report.snapshot()
+    assert "configure_mappers" in snapshot["phases_ms"]
+    assert snapshot["ready"] is True
+    assert snapshot["errors"] == {}
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+import pytest
+from jose import JWTError
+
+from app.api import deps
+from app.core.config import settings
+from app.core.security import create_access_token
+
+
+@pytest.fixture(autouse=True)
+def _clear_token_cache():
+    deps.token_cache.clear()
+    yield
+    deps.token_cache.clear()
+
+
+def test_decode_token_is_cached():
+    token = create_access_token({"sub": "user-1", "role": "ADMIN"})
+    first = deps.decode_token(token)
+    second = deps.decode_token(token)
+    assert first == second
+    assert deps.token_cache.stats()["hits"] >= 1
+
+
+def test_expired_token_is_not_served_from_cache():
+    token = create_access_token({"sub": "user-1", "role": "ADMIN"}, expires_delta=timedelta(seconds=-1))
+    with pytest.raises(JWTError):
+        deps.decode_token(token)
+    assert deps.token_cache.stats()["size"] == 0
+
+
+def test_secret_rotation_invalidates_cached_tokens(monkeypatch):
+    token = create_access_token({"sub": "user-1", "role": "ADMIN"})
+    deps.decode_token(token)
+    monkeypatch.setattr(settings, "SECRET_KEY", settings.SECRET_KEY + "-rotated")
+    with pytest.raises(JWTError):
+        deps.decode_token(token)